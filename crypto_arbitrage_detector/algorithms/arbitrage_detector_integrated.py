@@ -9,9 +9,34 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from two_hop_arbitrage_algorithm import TwoHopArbitrage
 from triangle_arbitrage_algorithm import TriangleArbitrage
 from bellman_ford_algorithm import BellmanFordArbitrage
-from utils.data_structures import ArbitrageOpportunity
-from typing import List, Dict, Tuple, Optional, Set
+from hop_bounded_arbitrage_algorithm import HopBoundedArbitrage
+from minimum_mean_cycle_algorithm import MinimumMeanCycleArbitrage
+from floyd_warshall_algorithm import FloydWarshallArbitrage
+from branch_and_bound_algorithm import BranchAndBoundArbitrage
+from strategy_selector import StrategySelector, GraphStats
+from utils.data_structures import ArbitrageOpportunity, EdgePairs
+from utils.graph_structure import TokenGraphBuilder
+from utils.csr_graph import CSRGraph, as_csr_graph
+from utils.hot_cycle_cache import HotCycleCache
+from utils.opportunity_scoring import create_opportunities
+from utils.opportunity_ranker import TopNOpportunityRanker
+from utils.shared_graph import SharedCSRGraph, attach_csr_graph
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import List, Dict, Tuple, Optional, Set, AsyncIterator, Union
+import multiprocessing
 import networkx as nx
+import numpy as np
+import time
+
+
+def _run_algorithm_task(graph_handle: Dict, algorithm, source_token: str,
+                        kwargs: Dict) -> Tuple[List[ArbitrageOpportunity], float]:
+    """Worker process entry: attach the shared graph and run one algorithm"""
+    started = time.perf_counter()
+    graph = attach_csr_graph(graph_handle)
+    opportunities = algorithm.detect_opportunities(graph, source_token, **kwargs)
+    return opportunities, time.perf_counter() - started
 
 
 class IntegratedArbitrageDetector:
@@ -20,7 +45,10 @@ class IntegratedArbitrageDetector:
     def __init__(self,
                  min_profit_threshold: float = 0.01,  # Minimum profit threshold 1%
                  max_hops: int = 4,                   # Maximum hops
-                 base_amount: float = 1.0):           # Base trading amount (SOL)
+                 base_amount: float = 1.0,            # Base trading amount (SOL)
+                 max_workers: Optional[int] = None,   # Process pool size for parallel mode
+                 strategy_selector: Optional[StrategySelector] = None,
+                 hot_cycle_cache: Optional[HotCycleCache] = None):
         """
         Initialize Integrated Arbitrage Detector
 
@@ -28,10 +56,23 @@ class IntegratedArbitrageDetector:
             min_profit_threshold: Minimum profit threshold (0.01 = 1%)
             max_hops: Maximum allowed hops
             base_amount: Base trading amount (SOL)
+            max_workers: Worker processes used by detect_arbitrage(parallel=True),
+                defaults to the number of CPUs
+            strategy_selector: Cost model used by detect_arbitrage(adaptive=True),
+                a default StrategySelector is created if None
+            hot_cycle_cache: Recently profitable cycles, rescored first in deadline mode
+                and with detect_arbitrage(use_hot_cycles=True), cycles longer than
+                max_hops are not reported. A default HotCycleCache is created if None
         """
         self.min_profit_threshold = min_profit_threshold
         self.max_hops = max_hops
         self.base_amount = base_amount
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # algorithm name -> wall time (s) of the last detect_arbitrage call
+        self.last_timings: Dict[str, float] = {}
+        self.strategy_selector = strategy_selector or StrategySelector(max_hops=max_hops)
+        self.hot_cycle_cache = hot_cycle_cache if hot_cycle_cache is not None else HotCycleCache()
 
         self.bellman_ford = BellmanFordArbitrage(
             min_profit_threshold, max_hops, base_amount)
@@ -39,27 +80,76 @@ class IntegratedArbitrageDetector:
             min_profit_threshold, max_hops, base_amount)
         self.two_hop_arbitrage = TwoHopArbitrage(
             min_profit_threshold, max_hops, base_amount)
+        self.hop_bounded = HopBoundedArbitrage(
+            min_profit_threshold, max_hops, base_amount)
+        self.minimum_mean_cycle = MinimumMeanCycleArbitrage(
+            min_profit_threshold, max_hops, base_amount)
+        self.floyd_warshall = FloydWarshallArbitrage(
+            min_profit_threshold, max_hops, base_amount)
+        self.branch_and_bound = BranchAndBoundArbitrage(
+            min_profit_threshold, max_hops, base_amount)
 
         print(f"IntegratedArbitrageDetector initialized:")
         print(f"   Min profit threshold: {min_profit_threshold*100:.1f}%")
         print(f"   Max hops: {max_hops}")
         print(f"   Base amount: {base_amount} SOL")
-        print(f"   Available algorithms: Bellman-Ford, Triangle, Two-Hop")
+        print(f"   Available algorithms: Bellman-Ford, Triangle, Two-Hop, Hop-Bounded, Minimum Mean Cycle, Floyd-Warshall, Top-K Branch-and-Bound")
 
-    def detect_arbitrage(self, graph: nx.DiGraph,
+    def detect_arbitrage(self, graph: Union[nx.DiGraph, CSRGraph],
                          source_token: str = None,
                          enable_bellman_ford: bool = True,
                          enable_triangle: bool = True,
-                         enable_two_hop: bool = True) -> List[ArbitrageOpportunity]:
+                         enable_two_hop: bool = True,
+                         bellman_ford_virtual_source: bool = False,
+                         enable_hop_bounded: bool = False,
+                         enable_min_mean_cycle: bool = False,
+                         enable_floyd_warshall: bool = False,
+                         top_k: Optional[int] = None,
+                         parallel: bool = False,
+                         partition_scc: bool = False,
+                         adaptive: bool = False,
+                         latency_budget_ms: Optional[float] = None,
+                         changed_edges: Optional[int] = None,
+                         deadline_ms: Optional[float] = None,
+                         max_results: Optional[int] = None,
+                         use_hot_cycles: bool = False) -> List[ArbitrageOpportunity]:
         """
         Detect arbitrage opportunities in the token swap graph
 
         Args:
-            graph: Trading graph
+            graph: Trading graph, networkx graph or CSRGraph (e.g. TokenGraphBuilder.to_csr_graph())
             source_token: Starting token address, automatically selected if None
             enable_bellman_ford: Enable Bellman-Ford algorithm
             enable_triangle: Enable triangle arbitrage detection
             enable_two_hop: Enable two-hop arbitrage detection
+            bellman_ford_virtual_source: Run Bellman-Ford from a virtual source linked to
+                every node, reporting negative cycles anywhere in the graph in one run
+            enable_hop_bounded: Enable the min-plus bounded search for the best 2..max_hops hop cycles
+            enable_min_mean_cycle: Enable Howard's minimum mean cycle search (best profit per hop)
+            enable_floyd_warshall: Enable all-pairs Floyd-Warshall negative cycle detection,
+                O(V^3), meant for graphs of a few hundred tokens
+            top_k: Only search for the top_k best cycles with the branch-and-bound engine,
+                the enable_* switches are ignored. None runs the enabled algorithms
+            parallel: Run the enabled algorithms at the same time in the process pool,
+                workers read the graph from shared memory
+            partition_scc: Split the graph into strongly connected components first and
+                search each component with at least 2 tokens separately (in parallel
+                with parallel=True). source_token only applies to its own component
+            adaptive: Let the strategy selector choose the algorithms from graph statistics
+                and measured runtimes, the enable_* switches are ignored
+            latency_budget_ms: Adaptive mode budget, algorithms predicted to overrun it are skipped
+            changed_edges: Adaptive mode, number of edges changed since the previous tick
+                (None = unknown, treated as a full update)
+            deadline_ms: Anytime mode, run hot cycles, two-hop, triangle, then the deeper
+                searches while the deadline allows and return what was found. Each
+                opportunity carries the share of stages that finished (search_completeness).
+                The other algorithm switches are ignored
+            max_results: Keep only the best max_results opportunities. Results are ranked
+                as each algorithm finishes in a bounded heap, and once it is full later
+                algorithms run with its floor as their profit threshold
+            use_hot_cycles: Also report the cached hot cycles still profitable on this
+                graph, scored before the searches run. They may come from algorithms
+                that are not enabled in this call. Always on in deadline mode
 
         Returns:
             List[ArbitrageOpportunity]: List of detected arbitrage opportunities
@@ -68,90 +158,403 @@ class IntegratedArbitrageDetector:
             print("Warning: Graph is empty, cannot detect arbitrage")
             return []
 
-        opportunities = []
-
         print(f"\nStarting arbitrage detection...")
         print(
             f"Graph statistics: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
 
+        # Convert once, all algorithms share the array-backed graph
+        csr_graph = as_csr_graph(graph)
+
         # Automatically select starting token (highest degree node)
         if source_token is None:
-            source_token = self._select_best_source_token(graph)
+            source_token = self._select_best_source_token(csr_graph)
 
         print(f"Starting token: {source_token[:8]}...")
 
-        # Method 1: Bellman-Ford negative cycle detection
-        if enable_bellman_ford:
-            print("\nRunning Bellman-Ford negative cycle detection...")
-            bf_opportunities = self.bellman_ford.detect_opportunities(
-                graph, source_token)
-            opportunities.extend(bf_opportunities)
-            print(f"Bellman-Ford found {len(bf_opportunities)} opportunities")
-
-        # Method 2: Triangle arbitrage detection
-        if enable_triangle:
-            print("\nRunning triangle arbitrage detection...")
-            triangle_opportunities = self.triangle_arbitrage.detect_opportunities(
-                graph, source_token)
-            opportunities.extend(triangle_opportunities)
-            print(
-                f"Triangle arbitrage found {len(triangle_opportunities)} opportunities")
-
-        # Method 3: Two-hop arbitrage detection
-        if enable_two_hop:
-            print("\nRunning two-hop arbitrage detection...")
-            two_hop_opportunities = self.two_hop_arbitrage.detect_opportunities(
-                graph, source_token)
-            opportunities.extend(two_hop_opportunities)
-            print(
-                f"Two-hop arbitrage found {len(two_hop_opportunities)} opportunities")
-
-        # Deduplicate and rank
-        opportunities = self._deduplicate_and_rank(opportunities)
+        # Top-K mode: one bounded search replaces the full enumeration
+        if top_k is not None:
+            print(f"\nRunning branch-and-bound top-{top_k} search...")
+            top_opportunities = self.branch_and_bound.detect_opportunities(
+                csr_graph, source_token, top_k=top_k)
+            opportunities = self._deduplicate_and_rank(
+                top_opportunities, top_k if max_results is None else min(top_k, max_results))
+            print(f"\nTotal {len(opportunities)} arbitrage opportunities found")
+            return opportunities
+
+        if deadline_ms is not None:
+            opportunities = self._detect_with_deadline(csr_graph, source_token, deadline_ms, max_results)
+            self.hot_cycle_cache.update(opportunities)
+            print(f"\nTotal {len(opportunities)} arbitrage opportunities found")
+            return opportunities
+
+        tasks = self._algorithm_tasks(bellman_ford_virtual_source)
+        decision = None
+        if adaptive:
+            decision = self.strategy_selector.select(
+                GraphStats.from_graph(csr_graph, changed_edges), latency_budget_ms)
+            tasks = [task for task in tasks if task[0] in decision.selected]
+        else:
+            enabled = {
+                "Bellman-Ford": enable_bellman_ford,
+                "Triangle arbitrage": enable_triangle,
+                "Two-hop arbitrage": enable_two_hop,
+                "Hop-bounded search": enable_hop_bounded,
+                "Minimum mean cycle": enable_min_mean_cycle,
+                "Floyd-Warshall": enable_floyd_warshall,
+            }
+            tasks = [task for task in tasks if enabled[task[0]]]
+
+        self.last_timings = {}
+        started = time.perf_counter()
+        ranker = TopNOpportunityRanker(max_results)
+        # Cached hot cycles first, a good answer before any search runs (not when every search is off)
+        if use_hot_cycles and tasks:
+            ranker.extend(self._rescore_hot_cycles(csr_graph))
+            self.last_timings['Hot cycles'] = time.perf_counter() - started
+        if partition_scc:
+            components = self._partition_components(csr_graph, source_token)
+        else:
+            components = [(csr_graph, source_token)]
+
+        if parallel and len(tasks) * len(components) > 1:
+            timings = self._run_parallel(components, tasks, ranker)
+        else:
+            timings = self._run_sequential(components, tasks, ranker)
+        self.last_timings.update(timings)
+        self.last_timings['total'] = time.perf_counter() - started
+        self._print_timings()
+        if decision is not None:
+            self.strategy_selector.record(decision, self.last_timings)
+
+        # Deduplicated and ranked while streaming in
+        opportunities = ranker.ranked()
+        print(f"Deduplicated to {len(opportunities)} unique arbitrage opportunities "
+              f"({ranker.pushed} offered)")
+        self.hot_cycle_cache.update(opportunities)
 
         print(f"\nTotal {len(opportunities)} arbitrage opportunities found")
         return opportunities
 
-    def _select_best_source_token(self, graph: nx.DiGraph) -> str:
+    def detect_arbitrage_multi(self, graph: Union[nx.DiGraph, CSRGraph],
+                               profiles: List[Dict],
+                               **detect_kwargs) -> List[List[ArbitrageOpportunity]]:
+        """
+        Detect for several parameter sets with one search of the graph
+
+        The algorithms run once with the loosest settings (lowest threshold, most
+        hops, largest base amount, which has the smallest fee share), every cycle
+        that passes one profile passes them too. Each profile then filters and
+        rescores these candidates with its own settings. The shared search reads
+        a copy of the hot cycle cache, so cycles found at the loosest settings
+        are not cached for later single-profile calls.
+
+        Args:
+            graph: Trading graph, networkx graph or CSRGraph
+            profiles: Parameter sets with any of min_profit_threshold, max_hops and
+                base_amount, missing keys use the detector settings
+            **detect_kwargs: Forwarded to detect_arbitrage (algorithm switches, source_token, ...),
+                max_results limits every profile's list instead of the shared search
+
+        Returns:
+            One ranked opportunity list per profile, in profile order
+        """
+        if not profiles:
+            return []
+        settings = [(profile.get('min_profit_threshold', self.min_profit_threshold),
+                     profile.get('max_hops', self.max_hops),
+                     profile.get('base_amount', self.base_amount)) for profile in profiles]
+        loosest = (min(thr for thr, _, _ in settings),
+                   max(hops for _, hops, _ in settings),
+                   max(base for _, _, base in settings))
+
+        max_results = detect_kwargs.pop('max_results', None)
+        csr_graph = as_csr_graph(graph)
+        original = (self.min_profit_threshold, self.max_hops, self.base_amount)
+        hot_cycle_cache = self.hot_cycle_cache
+        print(f"\nMulti-profile detection: {len(profiles)} profiles, searching at "
+              f"{loosest[0]*100:.2f}% / {loosest[1]} hops / {loosest[2]} SOL")
+        self._configure(*loosest)
+        self.hot_cycle_cache = hot_cycle_cache.copy()
+        try:
+            candidates = self.detect_arbitrage(csr_graph, **detect_kwargs)
+        finally:
+            self.hot_cycle_cache = hot_cycle_cache
+            self._configure(*original)
+
+        completeness = min((opp.search_completeness for opp in candidates), default=1.0)
+        candidate_paths = [[csr_graph.node_index[token] for token in opp.path] for opp in candidates]
+        results = []
+        for index, (threshold, max_hops, base_amount) in enumerate(settings):
+            profile_paths = [path for path in candidate_paths if len(path) - 1 <= max_hops]
+            profile_opportunities = create_opportunities(csr_graph, profile_paths, threshold, base_amount)
+            for opp in profile_opportunities:
+                opp.search_completeness = completeness
+            profile_opportunities.sort(key=lambda x: (x.profit_ratio, x.confidence_score), reverse=True)
+            profile_opportunities = profile_opportunities[:max_results]
+            print(f"Profile {index + 1}: {len(profile_opportunities)} opportunities "
+                  f"({threshold*100:.2f}% / {max_hops} hops / {base_amount} SOL)")
+            results.append(profile_opportunities)
+        return results
+
+    def _configure(self, min_profit_threshold: float, max_hops: int, base_amount: float):
+        """Apply detection settings to the detector and all algorithms"""
+        self.min_profit_threshold = min_profit_threshold
+        self.max_hops = max_hops
+        self.base_amount = base_amount
+        for algorithm in (self.bellman_ford, self.triangle_arbitrage, self.two_hop_arbitrage,
+                          self.hop_bounded, self.minimum_mean_cycle, self.floyd_warshall,
+                          self.branch_and_bound):
+            algorithm.min_profit_threshold = min_profit_threshold
+            algorithm.max_hops = max_hops
+            algorithm.base_amount = base_amount
+        self.strategy_selector.max_hops = max_hops
+
+    def _detect_with_deadline(self, csr_graph: CSRGraph, source_token: str, deadline_ms: float,
+                              max_results: Optional[int] = None) -> List[ArbitrageOpportunity]:
+        """
+        Anytime detection: cheapest, highest-yield stages first, stop at the deadline
+
+        A stage is skipped when the cost model predicts it would not finish in
+        the remaining time, a running stage is not interrupted.
+        """
+        search_started = time.perf_counter()
+        deadline = search_started + deadline_ms / 1000.0
+        stats = GraphStats.from_graph(csr_graph)
+        # (name, run, algorithm name in the cost model)
+        stages = [
+            ("Hot cycles", lambda: self._rescore_hot_cycles(csr_graph), None),
+            ("Two-hop arbitrage", lambda: self.two_hop_arbitrage.detect_opportunities(csr_graph, source_token),
+             "Two-hop arbitrage"),
+            ("Triangle arbitrage", lambda: self.triangle_arbitrage.detect_opportunities(csr_graph, source_token),
+             "Triangle arbitrage"),
+            ("Bellman-Ford", lambda: self.bellman_ford.detect_opportunities(
+                csr_graph, source_token, use_virtual_source=True), "Bellman-Ford"),
+            ("Hop-bounded search", lambda: self.hop_bounded.detect_opportunities(csr_graph, source_token),
+             "Hop-bounded search"),
+        ]
+
+        print(f"\nRunning anytime detection with a {deadline_ms:.1f} ms deadline...")
+        self.last_timings = {}
+        opportunities = []
+        completed = 0
+        for name, run, cost_name in stages:
+            remaining = deadline - time.perf_counter()
+            predicted = self.strategy_selector.predict(cost_name, stats) if cost_name else 0.0
+            if remaining <= 0 or predicted > remaining:
+                print(f"Skipping {name}: predicted {predicted * 1000:.1f} ms, "
+                      f"{max(remaining, 0.0) * 1000:.1f} ms left")
+                continue
+            started = time.perf_counter()
+            stage_opportunities = run()
+            elapsed = time.perf_counter() - started
+            if cost_name:
+                self.strategy_selector.observe(cost_name, stats, elapsed)
+            self.last_timings[name] = elapsed
+            print(f"{name} found {len(stage_opportunities)} opportunities")
+            opportunities.extend(stage_opportunities)
+            completed += 1
+        self.last_timings['total'] = time.perf_counter() - search_started
+        self._print_timings()
+
+        completeness = completed / len(stages)
+        opportunities = self._deduplicate_and_rank(opportunities, max_results)
+        for opp in opportunities:
+            opp.search_completeness = completeness
+        print(f"Search completeness: {completeness:.0%}")
+        return opportunities
+
+    def _rescore_hot_cycles(self, csr_graph: CSRGraph) -> List[ArbitrageOpportunity]:
+        """Score the cached hot cycles of at most max_hops hops on the current quotes"""
+        hot_opportunities = self.hot_cycle_cache.rescore(
+            csr_graph, self.min_profit_threshold, self.base_amount, self.max_hops)
+        print(f"Hot cycles: {len(hot_opportunities)} of {len(self.hot_cycle_cache)} cached cycles profitable")
+        return hot_opportunities
+
+    def _algorithm_tasks(self, bellman_ford_virtual_source: bool) -> List[Tuple]:
+        """(name, description, algorithm, extra detect_opportunities arguments) of every algorithm"""
+        return [
+            # Method 1: Bellman-Ford negative cycle detection
+            ("Bellman-Ford", "Bellman-Ford negative cycle detection", self.bellman_ford,
+             {'use_virtual_source': bellman_ford_virtual_source}),
+            # Method 2: Triangle arbitrage detection
+            ("Triangle arbitrage", "triangle arbitrage detection", self.triangle_arbitrage, {}),
+            # Method 3: Two-hop arbitrage detection
+            ("Two-hop arbitrage", "two-hop arbitrage detection", self.two_hop_arbitrage, {}),
+            # Method 4: Hop-bounded cycle search
+            ("Hop-bounded search", "hop-bounded cycle search", self.hop_bounded, {}),
+            # Method 5: Minimum mean cycle (best weight per hop)
+            ("Minimum mean cycle", "minimum mean cycle detection", self.minimum_mean_cycle, {}),
+            # Method 6: All-pairs Floyd-Warshall negative cycle detection
+            ("Floyd-Warshall", "Floyd-Warshall all-pairs detection", self.floyd_warshall, {}),
+        ]
+
+    def _partition_components(self, csr_graph: CSRGraph,
+                              source_token: str) -> List[Tuple[CSRGraph, Optional[str]]]:
+        """
+        Strongly connected components that can hold a cycle (at least 2 tokens)
+
+        Returns:
+            (component subgraph, source token) pairs, largest component first. Components
+            without source_token get None, their algorithms pick their own start
+        """
+        labels = csr_graph.strongly_connected_components()
+        sizes = np.bincount(labels)
+        kept = [label for label in np.argsort(-sizes, kind='stable').tolist() if sizes[label] >= 2]
+
+        components = []
+        for label in kept:
+            component = csr_graph.subgraph(np.flatnonzero(labels == label))
+            components.append((component,
+                               source_token if source_token in component.node_index else None))
+
+        kept_tokens = sum(component.number_of_nodes() for component, _ in components)
+        print(f"SCC partition: {len(sizes)} components, searching {len(components)} "
+              f"({kept_tokens} tokens), dropped {csr_graph.number_of_nodes() - kept_tokens} tokens")
+        return components
+
+    def _run_sequential(self, components: List[Tuple[CSRGraph, Optional[str]]], tasks: List[Tuple],
+                        ranker: TopNOpportunityRanker) -> Dict[str, float]:
+        """
+        Run the algorithms one after another in this process, results go into ranker
+
+        Returns:
+            algorithm name -> wall time (s)
+        """
+        timings = {name: 0.0 for name, _, _, _ in tasks}
+        for index, (graph, source_token) in enumerate(components):
+            if len(components) > 1:
+                print(f"\nComponent {index + 1}/{len(components)}: {graph.number_of_nodes()} tokens")
+            for name, description, algorithm, kwargs in tasks:
+                print(f"\nRunning {description}...")
+                started = time.perf_counter()
+                # a full ranker cannot take anything below its floor, the algorithm prunes with it
+                floor = ranker.floor()
+                threshold = algorithm.min_profit_threshold
+                if floor is not None and floor > threshold:
+                    algorithm.min_profit_threshold = floor
+                try:
+                    algorithm_opportunities = algorithm.detect_opportunities(graph, source_token, **kwargs)
+                finally:
+                    algorithm.min_profit_threshold = threshold
+                ranker.extend(algorithm_opportunities)
+                timings[name] += time.perf_counter() - started
+                print(f"{name} found {len(algorithm_opportunities)} opportunities")
+        return timings
+
+    def _run_parallel(self, components: List[Tuple[CSRGraph, Optional[str]]], tasks: List[Tuple],
+                      ranker: TopNOpportunityRanker) -> Dict[str, float]:
+        """
+        Run every (component, algorithm) pair concurrently in the process pool
+
+        Each graph is copied once into shared memory, each task only pickles
+        the small shared memory handle and the algorithm settings. Results go
+        into ranker in submission order.
+
+        Returns:
+            algorithm name -> summed worker wall time (s)
+        """
+        executor = self._get_executor()
+        timings = {name: 0.0 for name, _, _, _ in tasks}
+        found = {name: 0 for name, _, _, _ in tasks}
+        with ExitStack() as shared_graphs:
+            print(f"\nRunning {len(tasks)} algorithms on {len(components)} graph(s) in parallel...")
+            futures = []
+            for graph, source_token in components:
+                handle = shared_graphs.enter_context(SharedCSRGraph(graph)).handle
+                for name, _, algorithm, kwargs in tasks:
+                    futures.append((name, executor.submit(
+                        _run_algorithm_task, handle, algorithm, source_token, kwargs)))
+
+            for name, future in futures:
+                try:
+                    algorithm_opportunities, elapsed = future.result()
+                except Exception as e:
+                    print(f" {name} failed in worker process: {e}")
+                    continue
+                ranker.extend(algorithm_opportunities)
+                timings[name] += elapsed
+                found[name] += len(algorithm_opportunities)
+
+        for name, count in found.items():
+            print(f"{name} found {count} opportunities")
+        return timings
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Process pool, created on first parallel run and reused afterwards"""
+        if self._executor is None:
+            # fork keeps the algorithm modules importable in the workers (no re-import of the scripts)
+            context = multiprocessing.get_context(
+                'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def close(self):
+        """Shut down the worker processes of the parallel mode"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _print_timings(self):
+        """Per-algorithm wall time of the last run"""
+        if not self.last_timings:
+            return
+        print("\nAlgorithm timings:")
+        for name, elapsed in self.last_timings.items():
+            print(f"   {name}: {elapsed * 1000:.1f} ms")
+
+    async def detect_arbitrage_stream(self, edge_stream: AsyncIterator[EdgePairs],
+                                      builder: Optional[TokenGraphBuilder] = None,
+                                      batch_size: int = 100,
+                                      **detect_kwargs) -> AsyncIterator[List[ArbitrageOpportunity]]:
+        """
+        Run detection incrementally while edges are still arriving
+
+        Args:
+            edge_stream: Async iterator of EdgePairs (e.g. stream_edge_pairs)
+            builder: Graph builder consuming the stream, a new one is created if None
+            batch_size: Number of new edges between two detection passes
+            **detect_kwargs: Forwarded to detect_arbitrage (algorithm switches, source_token),
+                with adaptive=True the size of each batch is passed as changed_edges
+
+        Yields:
+            List[ArbitrageOpportunity]: Opportunities found on the partial graph after each batch
+        """
+        if builder is None:
+            builder = TokenGraphBuilder()
+
+        async for partial_graph in builder.build_graph_from_edge_stream(edge_stream, batch_size):
+            tick_kwargs = dict(detect_kwargs)
+            if tick_kwargs.get('adaptive'):
+                tick_kwargs.setdefault('changed_edges', len(builder.last_changed_edges))
+            yield self.detect_arbitrage(partial_graph, **tick_kwargs)
+
+    def _select_best_source_token(self, graph: CSRGraph) -> str:
         """Select the best starting token (highest degree node)"""
         if graph.number_of_nodes() == 0:
             return None
 
-        # Calculate degree (in-degree + out-degree) for each node
-        degrees = {node: graph.in_degree(node) + graph.out_degree(node)
-                   for node in graph.nodes()}
-
-        # Select the node with the highest degree
-        best_node = max(degrees.keys(), key=lambda x: degrees[x])
+        # Select the node with the highest degree (in-degree + out-degree)
+        best_id = graph.highest_degree_node()
+        best_node = graph.nodes[best_id]
+        degree = int(graph.out_degrees()[best_id] + graph.in_degrees()[best_id])
         print(
-            f"Automatically selected starting token: {best_node[:8]}... (degree: {degrees[best_node]})")
+            f"Automatically selected starting token: {best_node[:8]}... (degree: {degree})")
         return best_node
 
-    def _deduplicate_and_rank(self, opportunities: List[ArbitrageOpportunity]) -> List[ArbitrageOpportunity]:
-        """Deduplicate and rank arbitrage opportunities"""
+    def _deduplicate_and_rank(self, opportunities: List[ArbitrageOpportunity],
+                              max_results: Optional[int] = None) -> List[ArbitrageOpportunity]:
+        """
+        Deduplicate and rank arbitrage opportunities
+
+        Rotations of a cycle share a canonical key, the opposite direction is a
+        different trade and keeps its own. The best max_results are kept (all if None).
+        """
         if not opportunities:
             return []
 
-        # Deduplicate based on path
-        unique_opportunities = {}
-        for opp in opportunities:
-            # Create a standardized key for the path (handle circular paths)
-            # Exclude the last repeated node
-            path_key = tuple(sorted(opp.path[:-1]))
-
-            if path_key not in unique_opportunities:
-                unique_opportunities[path_key] = opp
-            else:
-                # Keep the opportunity with higher profit
-                if opp.profit_ratio > unique_opportunities[path_key].profit_ratio:
-                    unique_opportunities[path_key] = opp
-
-        # Sort by profit ratio
-        sorted_opportunities = sorted(
-            unique_opportunities.values(),
-            key=lambda x: (x.profit_ratio, x.confidence_score),
-            reverse=True
-        )
+        ranker = TopNOpportunityRanker(max_results)
+        ranker.extend(opportunities)
+        sorted_opportunities = ranker.ranked()
 
         print(
             f"Deduplicated to {len(sorted_opportunities)} unique arbitrage opportunities")
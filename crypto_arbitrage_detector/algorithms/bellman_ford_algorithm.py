@@ -3,13 +3,15 @@ Bellman-Ford Arbitrage Detection Algorithm
 多跳的负环检测套利算法, 目前允许4跳
 '''
 import networkx as nx
-import math
+import numpy as np
 import sys
 import os
 # Add project path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
 from utils.data_structures import ArbitrageOpportunity
+from utils.csr_graph import CSRGraph, as_csr_graph
+from utils.opportunity_scoring import create_opportunities
 
 
 class BellmanFordArbitrage:
@@ -20,7 +22,9 @@ class BellmanFordArbitrage:
     def __init__(self, 
                  min_profit_threshold: float = 0.01,
                  max_hops: int = 4,
-                 base_amount: float = 1.0):
+                 base_amount: float = 1.0,
+                 use_virtual_source: bool = False,
+                 warm_start: bool = True):
         """
         Initialize algorithm
         
@@ -28,255 +32,295 @@ class BellmanFordArbitrage:
             min_profit_threshold: Minimum profit threshold (0.01 = 1%)
             max_hops: Maximum allowed hops
             base_amount: Base trading amount (SOL)
+            use_virtual_source: Default detection mode, relax from a zero-weight
+                virtual source linked to every node instead of a single token
+            warm_start: Reuse the distances of the previous converged run when the
+                graph structure is unchanged, see run_warm_relaxation
         """
         self.min_profit_threshold = min_profit_threshold
         self.max_hops = max_hops
         self.base_amount = base_amount
+        self.use_virtual_source = use_virtual_source
         self.algorithm_name = "BellmanFordArbitrage"
+        self.warm_start = warm_start
+        self.last_relaxation_passes = 0
+        self.last_warm_started = False
+        # state of the last converged run: source, structure arrays, weights, distances, predecessors
+        self._warm_state: Optional[Dict] = None
+
+    def __getstate__(self) -> Dict:
+        # warm state is local to this process, parallel tasks are pickled without it
+        state = self.__dict__.copy()
+        state['_warm_state'] = None
+        return state
     
-    def detect_opportunities(self, graph: nx.DiGraph, source_token: str = None) -> List[ArbitrageOpportunity]:
+    def detect_opportunities(self, graph: Union[nx.DiGraph, CSRGraph], source_token: str = None,
+                             use_virtual_source: Optional[bool] = None) -> List[ArbitrageOpportunity]:
         """
         Use Bellman-Ford algorithm to detect negative cycle arbitrage opportunities
+
+        Args:
+            graph: Trading graph, networkx graph or its CSRGraph arrays
+            source_token: Starting token address, automatically selected if None
+            use_virtual_source: Relax from a virtual source connected to every node with
+                zero-weight edges, so one run covers negative cycles anywhere in the graph
+                (source_token is ignored). Defaults to the constructor setting
         """
         opportunities = []
+        csr_graph = as_csr_graph(graph)
+        if use_virtual_source is None:
+            use_virtual_source = self.use_virtual_source
         
-        if not source_token:
-            source_token = self._select_best_source_token(graph)
-        
-        if source_token not in graph.nodes():
-            print(f"Warning: Starting node {source_token} is not in the graph")
-            return opportunities
+        if use_virtual_source:
+            source = None
+        else:
+            if not source_token:
+                source_token = self._select_best_source_token(csr_graph)
+            
+            if source_token not in csr_graph.node_index:
+                print(f"Warning: Starting node {source_token} is not in the graph")
+                return opportunities
+            source = csr_graph.node_index[source_token]
         
         try:
-            # Initialize distance dictionary
-            distances = {node: float('inf') for node in graph.nodes()}
-            distances[source_token] = 0
-            predecessors = {node: None for node in graph.nodes()}
-            
-            # 松弛操作 (|V| - 1 次)
-            for _ in range(graph.number_of_nodes() - 1):
-                for u, v, data in graph.edges(data=True):
-                    # base
-                    base_weight = data.get('weight', 0)
-                    
-                    # slippage and price impact
-                    slippage_bps = data.get('slippage_bps', 0)
-                    price_impact_pct = data.get('price_impact_pct', 0)
-                    
-                    slippage_decimal = slippage_bps / 10000.0
-                    adjusted_weight = base_weight + slippage_decimal + abs(price_impact_pct) / 100.0
-                    
-                    if distances[u] != float('inf') and distances[u] + adjusted_weight < distances[v]:
-                        distances[v] = distances[u] + adjusted_weight
-                        predecessors[v] = u  # 前驱节点记录
-            
-            # 检测负环
-            negative_cycle_nodes = set()
-            for u, v, data in graph.edges(data=True):
-                # 使用相同的权重调整逻辑
-                base_weight = data.get('weight', 0)
-                slippage_bps = data.get('slippage_bps', 0)
-                price_impact_pct = data.get('price_impact_pct', 0)
-                slippage_decimal = slippage_bps / 10000.0
-                adjusted_weight = base_weight + slippage_decimal + abs(price_impact_pct) / 100.0
-                
-                if distances[u] != float('inf') and distances[u] + adjusted_weight < distances[v]:
-                    negative_cycle_nodes.add(v)
+            if self.warm_start:
+                distances, predecessors, negative_cycle_nodes = self.run_warm_relaxation(csr_graph, source)
+            else:
+                distances, predecessors, negative_cycle_nodes = self.run_relaxation(csr_graph, source)
             
-            # 重建负环路径
-            if negative_cycle_nodes:
-                for cycle_node in negative_cycle_nodes:
-                    cycle_path = self._find_actual_negative_cycle(graph, cycle_node)
-                    # len(path) = 5 (节点数量)
-                    if cycle_path and len(cycle_path) <= self.max_hops + 1:
-                        opportunity = self._create_arbitrage_opportunity(graph, cycle_path)
-                        if opportunity:
-                            opportunities.append(opportunity)
+            # 从前驱数组重建负环路径, len(path) = 5 (节点数量)
+            cycle_paths = [cycle_path for cycle_path in
+                           self._extract_negative_cycles(csr_graph, predecessors, negative_cycle_nodes)
+                           if len(cycle_path) <= self.max_hops + 1]
+            opportunities = create_opportunities(
+                csr_graph, cycle_paths, self.min_profit_threshold, self.base_amount)
                                 
         except Exception as e:
             print(f" Bellman-Ford error: {e}")
 
-        return self._filter_profitable_opportunities(opportunities)
+        return opportunities
     
-    def _select_best_source_token(self, graph: nx.DiGraph) -> str:
+    def run_relaxation(self, graph: CSRGraph, source: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized Bellman-Ford relaxation over the CSR edge arrays
+
+        Every pass relaxes all edges at once against the distances of the
+        previous pass, stops as soon as a pass improves nothing.
+
+        Args:
+            graph: CSR graph, adjusted weights are cached per graph version
+            source: Source node ID, None for a virtual super-source with a
+                zero-weight edge to every node (all distances start at 0)
+
+        Returns:
+            distances, predecessor node IDs (-1 if none), node IDs still relaxable after |V|-1 passes
+        """
+        node_count = graph.number_of_nodes()
+        if source is None:
+            distances = np.zeros(node_count)
+        else:
+            distances = np.full(node_count, np.inf)
+            distances[source] = 0.0
+        predecessors = np.full(node_count, -1, dtype=np.int64)
+        self.last_relaxation_passes = 0
+        if graph.number_of_edges() == 0:
+            return distances, predecessors, np.empty(0, dtype=np.int64)
+
+        # edges grouped by target node, so the best candidate per node is one reduceat
+        order = graph.in_edge_order
+        sources = graph.sources[order]
+        targets = graph.indices[order]
+        adjusted_weights = graph.adjusted_weights[order]
+        group_starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+        group_targets = targets[group_starts]
+        group_sizes = np.diff(np.r_[group_starts, len(targets)])
+
+        # 松弛操作 (最多 |V| - 1 次, 收敛即停止)
+        for _ in range(node_count - 1):
+            candidates = distances[sources] + adjusted_weights
+            best = np.minimum.reduceat(candidates, group_starts)
+            improved = best < distances[group_targets]
+            if not improved.any():
+                # converged, no negative cycle reachable from the source
+                return distances, predecessors, np.empty(0, dtype=np.int64)
+            self.last_relaxation_passes += 1
+
+            # predecessor = first edge reaching the minimum of its target group
+            is_best = candidates == np.repeat(best, group_sizes)
+            is_best &= np.repeat(improved, group_sizes)
+            best_edges = np.flatnonzero(is_best)
+            best_targets = targets[best_edges]
+            first = np.r_[True, best_targets[1:] != best_targets[:-1]]
+            best_edges = best_edges[first]
+            distances[targets[best_edges]] = candidates[best_edges]
+            predecessors[targets[best_edges]] = sources[best_edges]  # 前驱节点记录
+
+        negative_cycle_nodes = self._final_relaxation(distances, predecessors, sources, targets, adjusted_weights)
+        return distances, predecessors, negative_cycle_nodes
+
+    def run_warm_relaxation(self, graph: CSRGraph, source: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bellman-Ford warm-started from the previous converged run
+
+        With the same source and graph structure (nodes and edges) as the
+        previous run, its distances stay valid upper bounds as long as no edge
+        of the shortest-path tree got heavier. Only the sources of lighter
+        edges are queued, then improvements spread downstream pass by pass
+        (SPFA-style frontier). Otherwise the relaxation starts cold. State is
+        kept only after runs without negative cycles.
+
+        Returns:
+            Same as run_relaxation
+        """
+        adjusted_weights = graph.adjusted_weights
+        state = self._warm_state
+        self.last_warm_started = False
+        frontier = None
+
+        if (state is not None and state['source'] == (None if source is None else graph.nodes[source])
+                and state['nodes'] == graph.nodes
+                and np.array_equal(state['indptr'], graph.indptr)
+                and np.array_equal(state['indices'], graph.indices)):
+            delta = adjusted_weights - state['weights']
+            heavier = np.flatnonzero(delta > 0)
+            # a heavier tree edge invalidates the distances below it
+            if not (state['predecessors'][graph.indices[heavier]] == graph.sources[heavier]).any():
+                frontier = np.unique(graph.sources[delta < 0])
+
+        if frontier is None:
+            distances, predecessors, negative_cycle_nodes = self.run_relaxation(graph, source)
+        else:
+            self.last_warm_started = True
+            distances, predecessors, negative_cycle_nodes = self._relax_frontier(
+                graph, state['distances'].copy(), state['predecessors'].copy(), frontier)
+
+        if len(negative_cycle_nodes) == 0:
+            self._warm_state = {
+                'source': None if source is None else graph.nodes[source],
+                'nodes': graph.nodes,
+                'indptr': graph.indptr,
+                'indices': graph.indices,
+                'weights': adjusted_weights,
+                'distances': distances.copy(),
+                'predecessors': predecessors.copy(),
+            }
+        else:
+            self._warm_state = None
+        return distances, predecessors, negative_cycle_nodes
+
+    def _relax_frontier(self, graph: CSRGraph, distances: np.ndarray, predecessors: np.ndarray,
+                        frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Relax only the out-edges of nodes improved in the previous pass
+
+        Returns:
+            Same as run_relaxation
+        """
+        adjusted_weights = graph.adjusted_weights
+        self.last_relaxation_passes = 0
+
+        for _ in range(graph.number_of_nodes() - 1):
+            if frontier.size == 0:
+                return distances, predecessors, np.empty(0, dtype=np.int64)
+
+            # out-edge IDs of the frontier nodes (CSR rows)
+            starts = graph.indptr[frontier]
+            counts = graph.indptr[frontier + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(np.r_[0, counts[:-1]]), counts)
+            edge_ids = offsets + np.arange(counts.sum())
+
+            candidates = distances[graph.sources[edge_ids]] + adjusted_weights[edge_ids]
+            targets = graph.indices[edge_ids]
+            improved = candidates < distances[targets]
+            if not improved.any():
+                return distances, predecessors, np.empty(0, dtype=np.int64)
+            self.last_relaxation_passes += 1
+
+            # best candidate per target, first edge on ties as in run_relaxation
+            edge_ids, candidates, targets = edge_ids[improved], candidates[improved], targets[improved]
+            order = np.lexsort((candidates, targets))
+            first = np.r_[True, targets[order][1:] != targets[order][:-1]]
+            best = order[first]
+            distances[targets[best]] = candidates[best]
+            predecessors[targets[best]] = graph.sources[edge_ids[best]]
+            frontier = targets[best]
+
+        negative_cycle_nodes = self._final_relaxation(
+            distances, predecessors, graph.sources, graph.indices, adjusted_weights)
+        return distances, predecessors, negative_cycle_nodes
+
+    def _final_relaxation(self, distances: np.ndarray, predecessors: np.ndarray, sources: np.ndarray,
+                          targets: np.ndarray, adjusted_weights: np.ndarray) -> np.ndarray:
+        """
+        |V|-th pass: find the edges still relaxable and record them as predecessors
+
+        Without the recorded edge the predecessor graph may not close the
+        negative cycle yet, walking back from a flagged node then ends at the
+        source instead of on the cycle.
+
+        Returns:
+            Node IDs still relaxable (on a negative cycle or downstream of one)
+        """
+        # 检测负环: 仍可松弛的边指向负环上或负环下游的节点
+        candidates = distances[sources] + adjusted_weights
+        relaxable = np.flatnonzero(candidates < distances[targets])
+        if relaxable.size == 0:
+            return np.empty(0, dtype=np.int64)
+        # best candidate per target, first edge on ties as in the passes
+        order = relaxable[np.lexsort((candidates[relaxable], targets[relaxable]))]
+        best = order[np.r_[True, targets[order][1:] != targets[order][:-1]]]
+        predecessors[targets[best]] = sources[best]
+        return targets[best]
+
+    def _select_best_source_token(self, graph: CSRGraph) -> str:
         """
         Automatically select the best source token based on node degrees
         """
-        if graph.number_of_nodes() == 0:
+        # indegree 和 outdegree 之和最高的节点
+        best_node = graph.highest_degree_node()
+        if best_node is None:
             return None
-            
-        # indegree 和 outdegree 之和
-        degrees = {node: graph.in_degree(node) + graph.out_degree(node) 
-                  for node in graph.nodes()}
-        
-        # 选择度数最高的节点
-        best_node = max(degrees.keys(), key=lambda x: degrees[x])
-        return best_node
+        return graph.nodes[best_node]
     
-    def _find_actual_negative_cycle(self, graph: nx.DiGraph, start_node: str) -> List[str]:
+    def _extract_negative_cycles(self, graph: CSRGraph, predecessors: np.ndarray,
+                                 flagged_nodes: np.ndarray) -> List[List[int]]:
         """
-        find the actual negative cycle containing the specified node
-        两种策略：
-        1. 从起始节点出发，寻找短环
-        2. 从图中所有节点出发，寻找包含起始节点的环
+        Extract distinct negative cycles by walking back the predecessor array
+
+        Walks back from each flagged node along predecessors (recorded up to the
+        |V|-th pass, so within |V| steps the walk lands on the cycle the node
+        descends from), marking visited nodes with the walk number. Reaching a
+        node of the current walk closes a cycle, reaching a node of an earlier
+        walk (its cycle is collected already) or a node without predecessor
+        stops. Every node is visited at most once, O(|V|) for all flagged nodes.
+
+        Returns:
+            List of closed node ID paths in trading direction, e.g. [a, b, c, a]
         """
-        try:
-            # 简单策略：检查所有从 start_node 开始的短环路径
-            def find_cycles_from_node(current, path, depth):
-                if depth > self.max_hops:
-                    return []
-                
-                cycles = []
-                
-                # 检查是否回到路径中的任一节点形成环
-                for neighbor in graph.successors(current):
-                    new_path = path + [neighbor]
-                    
-                    # 如果邻居在路径中，形成了环
-                    if neighbor in path:
-                        cycle_start_idx = path.index(neighbor)
-                        cycle = path[cycle_start_idx:] + [neighbor]
-                        
-                        # 验证环的权重
-                        total_weight = 0
-                        valid_cycle = True
-                        
-                        for i in range(len(cycle) - 1):
-                            if graph.has_edge(cycle[i], cycle[i + 1]):
-                                edge_data = graph[cycle[i]][cycle[i + 1]]
-                                # 使用调整后的权重计算
-                                base_weight = edge_data.get('weight', 0)
-                                slippage_bps = edge_data.get('slippage_bps', 0)
-                                price_impact_pct = edge_data.get('price_impact_pct', 0)
-                                slippage_decimal = slippage_bps / 10000.0
-                                adjusted_weight = base_weight + slippage_decimal + abs(price_impact_pct) / 100.0
-                                total_weight += adjusted_weight
-                            else:
-                                valid_cycle = False
-                                break
-                        
-                        if valid_cycle and total_weight < -1e-10:  # 有效负环
-                            cycles.append(cycle)
-                    
-                    # 继续深度搜索
-                    elif neighbor not in path and depth < self.max_hops:
-                        cycles.extend(find_cycles_from_node(neighbor, new_path, depth + 1))
-                
-                return cycles
-            
-            # 寻找从 start_node 开始的所有负环
-            cycles = find_cycles_from_node(start_node, [start_node], 0)
-            
-            if cycles:
-                # 返回最短的负环
-                best_cycle = min(cycles, key=len)
-                print(f"   🔍 找到负环: {[node[:8] + '...' for node in best_cycle]}")
-                return best_cycle
-            
-            # 如果没找到，尝试从图中的所有节点开始搜索包含 start_node 的负环
-            for node in graph.nodes():
-                if node != start_node:
-                    cycles = find_cycles_from_node(node, [node], 0)
-                    
-                    # 寻找包含 start_node 的环
-                    for cycle in cycles:
-                        if start_node in cycle:
-                            print(f"   🔍 找到包含目标节点的负环: {[n[:8] + '...' for n in cycle]}")
-                            return cycle
-            
-        except Exception as e:
-            print(f" an error occurs in negative path detection: {e}")
-        
-        return []
-    
-    def _create_arbitrage_opportunity(self, graph: nx.DiGraph, path: List[str]) -> Optional[ArbitrageOpportunity]:
-        """Create arbitrage opportunity object from path
-        考虑滑点值和交易平台费用"""
-        try:
-            if len(path) < 2:
-                return None
-            
-            # Calculate total path weight, fees, slippage, and price impact
-            total_weight = 0.0
-            total_fee = 0.0
-            total_slippage = 0.0
-            total_price_impact = 0.0
-            platform_fees = 0.0
-            
-            for i in range(len(path) - 1):
-                from_token = path[i]
-                to_token = path[i + 1]
-                
-                if not graph.has_edge(from_token, to_token):
-                    return None  # Invalid path
-                
-                edge_data = graph[from_token][to_token]
-                weight = edge_data.get('weight', 0)
-                fee = edge_data.get('total_fee', 0)
-                
-                # 获取滑点和平台费用信息
-                slippage_bps = edge_data.get('slippage_bps', 0)  # basis points
-                platform_fee = edge_data.get('platform_fee', 0)
-                price_impact_pct = edge_data.get('price_impact_pct', 0)
-                
-                # 将滑点从基点转换为小数 (1 bps = 0.0001)
-                slippage_decimal = slippage_bps / 10000.0
-                
-                # 累加各项费用和影响
-                total_weight += weight
-                total_fee += fee
-                total_slippage += slippage_decimal
-                total_price_impact += abs(price_impact_pct)  # 价格影响通常为负值
-                platform_fees += platform_fee
-
-            adjusted_weight = total_weight + total_slippage + (total_price_impact / 100.0)
-            
-            # Calculate profit ratio (negative weight indicates arbitrage opportunity)
-            if total_weight >= 0:
-                return None  # No arbitrage opportunity
+        cycles = []
+        walk_ids = np.full(graph.number_of_nodes(), -1, dtype=np.int64)
+        predecessor_list = predecessors.tolist()
+        adjusted_weights = graph.adjusted_weights
 
-            base_profit_ratio = math.exp(-adjusted_weight) - 1
+        for walk_id, node in enumerate(flagged_nodes.tolist()):
+            while node >= 0 and walk_ids[node] < 0:
+                walk_ids[node] = walk_id
+                node = predecessor_list[node]
+            if node < 0 or walk_ids[node] != walk_id:
+                continue
 
-            total_all_fees = total_fee + platform_fees
+            # node lies on a cycle of the predecessor graph, collect it backwards
+            cycle = [node]
+            current = predecessor_list[node]
+            while current != node:
+                cycle.append(current)
+                current = predecessor_list[current]
+            cycle.append(node)
+            cycle.reverse()
 
-            actual_profit_ratio = base_profit_ratio - (total_all_fees / self.base_amount)
-            
-            # Estimated profit (SOL)
-            estimated_profit = self.base_amount * actual_profit_ratio
+            # 验证环的权重 (使用调整后的权重)
+            edge_ids = graph.path_edge_ids(cycle)
+            if edge_ids is not None and adjusted_weights[edge_ids].sum() < -1e-10:  # 有效负环
+                cycles.append(cycle)
 
-            slippage_risk = min(1.0, total_slippage * 10)  # 滑点风险因子
-            price_impact_risk = min(1.0, total_price_impact / 10)  # 价格影响风险因子
-            
-            # Confidence score calculation
-            if total_all_fees > 0:
-                profit_fee_ratio = max(0, estimated_profit / total_all_fees)
-                base_confidence = min(1.0, profit_fee_ratio / 5)  # 利润费用比
-            else:
-                base_confidence = 0.5
- 
-            confidence_score = base_confidence * (1 - slippage_risk) * (1 - price_impact_risk)
-            confidence_score = max(0.0, min(1.0, confidence_score))
-            
-            # Generate path symbols (for display)
-            path_symbols = [f"{addr[:4]}...{addr[-4:]}" for addr in path]
-            
-            return ArbitrageOpportunity(
-                path=path,
-                path_symbols=path_symbols,
-                profit_ratio=actual_profit_ratio,
-                total_weight=adjusted_weight,
-                total_fee=total_all_fees,
-                hop_count=len(path) - 1,
-                confidence_score=confidence_score,
-                estimated_profit_sol=estimated_profit
-            )
-            
-        except Exception as e:
-            print(f" Failed to create arbitrage opportunity [{self.algorithm_name}]: {e}")
-            return None
-    
-    def _filter_profitable_opportunities(self, opportunities: List[ArbitrageOpportunity]) -> List[ArbitrageOpportunity]:
-        """Filter opportunities that meet profit threshold"""
-        filtered = [opp for opp in opportunities
-                    if opp and opp.profit_ratio >= self.min_profit_threshold]
-        return filtered
\ No newline at end of file
+        return cycles
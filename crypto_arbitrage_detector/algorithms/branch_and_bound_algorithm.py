@@ -0,0 +1,189 @@
+'''
+Branch-and-Bound Top-K Arbitrage Search
+只保留前 K 个最优环, 用剩余跳数的权重下界剪枝
+'''
+import heapq
+import networkx as nx
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import List, Optional, Tuple, Union
+from utils.data_structures import ArbitrageOpportunity
+from utils.csr_graph import CSRGraph, as_csr_graph
+from utils.opportunity_scoring import create_opportunities
+from algorithms.dense_cycle_search import profit_weight_bound
+
+
+class BranchAndBoundArbitrage:
+    """
+    Best-first DFS for the K lightest cycles of 2..max_hops hops
+
+    Every cycle is searched once from its smallest node ID. Successors are
+    tried lightest first, and a partial path is dropped when even the lightest
+    possible completion cannot beat the K-th best cycle found so far:
+
+        path weight + lightest walk of at most the remaining hops back to the start
+
+    so the work grows with K and max_hops rather than with the number of
+    profitable cycles. Cycles are ranked by adjusted weight (profit before fees).
+    """
+
+    def __init__(self,
+                 min_profit_threshold: float = 0.01,
+                 max_hops: int = 4,
+                 base_amount: float = 1.0,
+                 top_k: int = 10):
+        """
+        Initialize algorithm
+
+        Args:
+            min_profit_threshold: Minimum profit threshold (0.01 = 1%)
+            max_hops: Maximum allowed hops
+            base_amount: Base trading amount (SOL)
+            top_k: Default number of cycles to keep
+        """
+        self.min_profit_threshold = min_profit_threshold
+        self.max_hops = max_hops
+        self.base_amount = base_amount
+        self.top_k = top_k
+        self.algorithm_name = "BranchAndBoundArbitrage"
+        self.last_expanded_paths = 0
+        self.last_bounded_starts = 0
+
+    def detect_opportunities(self, graph: Union[nx.DiGraph, CSRGraph], source_token: str = None,
+                             top_k: Optional[int] = None) -> List[ArbitrageOpportunity]:
+        """
+        Detect the top-K arbitrage cycles
+
+        Args:
+            graph: Trading graph, networkx graph or its CSRGraph arrays
+            source_token: Unused, every token is searched
+            top_k: Number of cycles to keep, defaults to the constructor setting
+        """
+        csr_graph = as_csr_graph(graph)
+        if top_k is None:
+            top_k = self.top_k
+
+        print(f"[{self.algorithm_name}] Searching for the top {top_k} cycles up to {self.max_hops} hops...")
+
+        cycle_paths = [path for _, path in self.find_top_cycles(csr_graph, top_k)]
+        filtered_opportunities = create_opportunities(
+            csr_graph, cycle_paths, self.min_profit_threshold, self.base_amount)
+        print(
+            f"[{self.algorithm_name}] Found {len(filtered_opportunities)} top-K opportunities "
+            f"({self.last_expanded_paths} partial paths expanded)")
+
+        return filtered_opportunities
+
+    def find_top_cycles(self, graph: CSRGraph, top_k: int) -> List[Tuple[float, List[int]]]:
+        """
+        K lightest simple cycles below the profit weight bound
+
+        Returns:
+            (adjusted weight, closed node ID path) pairs, lightest first, each
+            path starting at its smallest node ID
+        """
+        self.last_expanded_paths = 0
+        self.last_bounded_starts = 0
+        node_count = graph.number_of_nodes()
+        if top_k <= 0 or node_count < 2 or graph.number_of_edges() == 0 or self.max_hops < 2:
+            return []
+
+        # successors of every node, lightest edge first
+        weights = graph.adjusted_weights
+        order = np.lexsort((weights, graph.sources))
+        adjacency = [[] for _ in range(node_count)]
+        for u, v, w in zip(graph.sources[order].tolist(), graph.indices[order].tolist(),
+                           weights[order].tolist()):
+            adjacency[u].append((w, v))
+
+        weight_bound = profit_weight_bound(self.min_profit_threshold)
+        heap = []  # (-weight, path), the worst kept cycle on top
+
+        def limit() -> float:
+            return -heap[0][0] if len(heap) >= top_k else weight_bound
+
+        def extend(start: int, node: int, path_weight: float, path: List[int], hops_left: int,
+                   to_start: List[List[float]], lightest_return: List[float]):
+            self.last_expanded_paths += 1
+            current_limit = limit()
+            # after this hop at most hops_left - 1 hops lead back to start
+            remaining = hops_left - 1
+            for w, v in adjacency[node]:
+                total = path_weight + w
+                if total + lightest_return[remaining] >= current_limit:
+                    break  # heavier successors cannot do better
+
+                if v == start:
+                    if len(path) >= 2 and total < current_limit:
+                        cycle = (-total, path + [start])
+                        if len(heap) < top_k:
+                            heapq.heappush(heap, cycle)
+                        else:
+                            heapq.heappushpop(heap, cycle)
+                        current_limit = limit()
+                    continue
+
+                if v < start or remaining == 0 or v in path:
+                    continue
+                if total + to_start[remaining][v] >= current_limit:
+                    continue  # 剪枝: 剩余跳数回到起点的下界也无法进入前 K
+
+                path.append(v)
+                extend(start, v, total, path, remaining, to_start, lightest_return)
+                path.pop()
+                current_limit = limit()
+
+        # best-first: starts with the lightest edges in and out fill the heap early
+        out_rows = np.flatnonzero(np.diff(graph.indptr) > 0)
+        lightest_out = np.full(node_count, np.inf)
+        lightest_out[out_rows] = np.minimum.reduceat(weights, graph.indptr[out_rows])
+        lightest_in = np.full(node_count, np.inf)
+        np.minimum.at(lightest_in, graph.indices, weights)
+        for start in np.argsort(lightest_out + lightest_in, kind='stable').tolist():
+            if not np.isfinite(lightest_out[start] + lightest_in[start]):
+                continue
+            bounds = self._return_weight_bounds(graph, start)
+            self.last_bounded_starts += 1
+            # lightest closed walk of at most max_hops hops through start
+            successors = graph.successors(start)
+            row = slice(graph.indptr[start], graph.indptr[start + 1])
+            if (weights[row] + bounds[-1][successors]).min() >= limit():
+                continue
+            to_start = [bound.tolist() for bound in bounds]
+            lightest_return = [min(0.0, min(column)) for column in to_start]
+            extend(start, start, 0.0, [start], self.max_hops, to_start, lightest_return)
+
+        return sorted(((-negative_weight, path) for negative_weight, path in heap),
+                      key=lambda item: item[0])
+
+    def _return_weight_bounds(self, graph: CSRGraph, start: int) -> List[np.ndarray]:
+        """
+        Lower bounds of the remaining weight of a partial path back to start
+
+        bounds[r][v] is the lightest walk of at most r hops from v to start
+        through nodes >= start (r = 0..max_hops - 1), by a hop-limited backward
+        relaxation over the CSR edges: O(max_hops * E), computed only for the
+        starts that are searched. A walk may repeat nodes, so this never
+        overestimates a simple path, and unlike min out-weight x remaining hops
+        it stays tight when single edge weights carry large price ratios.
+        """
+        usable = (graph.sources >= start) & (graph.indices >= start)
+        sources, targets = graph.sources[usable], graph.indices[usable]
+        weights = graph.adjusted_weights[usable]
+        bound = np.full(graph.number_of_nodes(), np.inf)
+        bound[start] = 0.0
+        bounds = [bound]
+        if len(sources) == 0:
+            return bounds * self.max_hops
+
+        # edges stay grouped by source (CSR order), one reduceat per hop
+        group_starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+        group_sources = sources[group_starts]
+        for _ in range(1, self.max_hops):
+            bound = bound.copy()
+            step = np.minimum.reduceat(weights + bounds[-1][targets], group_starts)
+            bound[group_sources] = np.minimum(bound[group_sources], step)
+            bounds.append(bound)
+        return bounds
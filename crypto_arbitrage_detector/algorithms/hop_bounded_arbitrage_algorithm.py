@@ -0,0 +1,154 @@
+'''
+Hop-Bounded Arbitrage Detection Algorithm
+按跳数动态规划 (min-plus 矩阵乘法) 搜索 2..max_hops 跳的最优闭环
+'''
+import heapq
+import networkx as nx
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, List, Optional, Union
+from utils.data_structures import ArbitrageOpportunity
+from utils.csr_graph import CSRGraph, as_csr_graph
+from utils.opportunity_scoring import create_opportunities
+from algorithms.dense_cycle_search import min_plus_product, profit_weight_bound
+
+
+class HopBoundedArbitrage:
+    """
+    Hop-limited cycle search
+
+    D_k[v, s] is the lightest k-hop walk v -> s, D_k = D_(k-1) (min,+) W on the
+    dense adjusted-weight matrix (max_hops - 2 matrix products). The walks are
+    exact lower bounds of the remaining weight of a path with k hops left, a
+    branch-and-bound search over simple paths then returns the lightest
+    simple cycles of every hop count k = 2..max_hops.
+    """
+
+    def __init__(self,
+                 min_profit_threshold: float = 0.01,
+                 max_hops: int = 4,
+                 base_amount: float = 1.0,
+                 cycles_per_length: int = 20):
+        """
+        Initialize algorithm
+
+        Args:
+            min_profit_threshold: Minimum profit threshold (0.01 = 1%)
+            max_hops: Maximum allowed hops, cycles of 2..max_hops hops are searched
+            base_amount: Base trading amount (SOL)
+            cycles_per_length: Number of best distinct cycles kept per hop count
+        """
+        self.min_profit_threshold = min_profit_threshold
+        self.max_hops = max_hops
+        self.base_amount = base_amount
+        self.cycles_per_length = cycles_per_length
+        self.algorithm_name = "HopBoundedArbitrage"
+        self.last_expanded_paths = 0
+
+    def detect_opportunities(self, graph: Union[nx.DiGraph, CSRGraph], source_token: str = None) -> List[ArbitrageOpportunity]:
+        """
+        Detect the best 2..max_hops hop arbitrage cycles
+
+        Args:
+            graph: Trading graph, networkx graph or its CSRGraph arrays
+            source_token: Unused, every token is a start of the search
+        """
+        csr_graph = as_csr_graph(graph)
+
+        print(f"[{self.algorithm_name}] Searching for cycles up to {self.max_hops} hops...")
+
+        cycle_paths = [path for cycles in self.find_cycles_by_length(csr_graph).values()
+                       for path in cycles]
+        filtered_opportunities = create_opportunities(
+            csr_graph, cycle_paths, self.min_profit_threshold, self.base_amount)
+        print(
+            f"[{self.algorithm_name}] Found {len(filtered_opportunities)} hop-bounded arbitrage opportunities")
+
+        return filtered_opportunities
+
+    def find_cycles_by_length(self, graph: CSRGraph) -> Dict[int, List[List[int]]]:
+        """
+        Lightest simple cycles per hop count that can reach the profit threshold
+
+        The lightest closed k-walk through a node may loop around a shorter
+        cycle, so the walks only serve as bounds: a branch-and-bound search
+        over simple paths collects the cycles, see _lightest_cycles.
+
+        Returns:
+            hop count -> up to cycles_per_length distinct node ID cycles, lightest
+            first, each in canonical rotation (smallest node ID first)
+        """
+        cycles_by_length = {}
+        self.last_expanded_paths = 0
+        node_count = graph.number_of_nodes()
+        if node_count < 2 or self.max_hops < 2:
+            return cycles_by_length
+
+        weights = graph.dense_adjusted_weights
+        weight_bound = profit_weight_bound(self.min_profit_threshold)
+
+        # walk_weights[r][v, s]: lightest r-hop walk v -> s
+        walk_weights = [None, weights]
+        for _ in range(2, self.max_hops):
+            product, _ = min_plus_product(walk_weights[-1], weights)
+            walk_weights.append(product)
+
+        for hop_count in range(2, self.max_hops + 1):
+            cycles_by_length[hop_count] = self._lightest_cycles(weights, walk_weights, hop_count, weight_bound)
+
+        return cycles_by_length
+
+    def _lightest_cycles(self, weights: np.ndarray, walk_weights: List[Optional[np.ndarray]],
+                         hop_count: int, weight_bound: float) -> List[List[int]]:
+        """
+        cycles_per_length lightest simple cycles of exactly hop_count hops
+
+        Every cycle is searched once from its smallest node ID s. A path at v
+        with r hops left is extended only while
+
+            path weight + lightest r-hop walk v -> s
+
+        can still beat the cycles_per_length-th best cycle found so far (or the
+        profit weight bound), successors with the lightest bound first.
+        """
+        heap = []  # (-weight, closed path), the worst kept cycle on top
+
+        def limit() -> float:
+            return -heap[0][0] if len(heap) >= self.cycles_per_length else weight_bound
+
+        def extend(path: List[int], path_weight: float):
+            self.last_expanded_paths += 1
+            start, node = path[0], path[-1]
+            # hops left after the next one
+            remaining = hop_count - len(path)
+            if remaining == 0:
+                total = path_weight + weights[node, start]
+                if total < limit():
+                    cycle = (-total, path + [start])
+                    if len(heap) < self.cycles_per_length:
+                        heapq.heappush(heap, cycle)
+                    else:
+                        heapq.heappushpop(heap, cycle)
+                return
+
+            bounds = path_weight + weights[node] + walk_weights[remaining][:, start]
+            bounds[:start + 1] = np.inf  # 只从最小节点开始, 避免重复的旋转
+            bounds[path] = np.inf
+            successors = np.flatnonzero(bounds < limit())
+            for v in successors[np.argsort(bounds[successors], kind='stable')].tolist():
+                if bounds[v] >= limit():
+                    break  # 剪枝: 剩余跳数回到起点的下界也无法进入前 N
+                path.append(v)
+                extend(path, path_weight + weights[node, v])
+                path.pop()
+
+        # best-first: starts with the lightest closed walks fill the heap early
+        closed_walks = (walk_weights[hop_count - 1] + weights.T).min(axis=1)
+        for start in np.argsort(closed_walks, kind='stable').tolist():
+            if closed_walks[start] >= limit():
+                break
+            extend([start], 0.0)
+
+        return [path for _, path in sorted(heap, key=lambda cycle: -cycle[0])]
@@ -0,0 +1,283 @@
+'''
+Incremental Cycle Detector
+维护 边 -> 经过该边的候选环 的索引, 报价更新时只重算受影响的环并从变化的边局部搜索新环
+'''
+import networkx as nx
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.data_structures import ArbitrageOpportunity
+from utils.csr_graph import CSRGraph, EDGE_ATTRIBUTES
+from utils.opportunity_scoring import create_opportunities
+from utils.cycle_utils import canonical_cycle
+from algorithms.dense_cycle_search import profit_weight_bound
+
+Edge = Tuple[str, str]
+Cycle = Tuple[str, ...]
+
+
+def adjusted_edge_weight(data: Dict) -> float:
+    """weight + slippage_bps / 10000 + |price_impact_pct| / 100 of one networkx edge"""
+    return (data.get('weight', 0) + data.get('slippage_bps', 0) / 10000.0
+            + abs(data.get('price_impact_pct', 0)) / 100.0)
+
+
+class IncrementalCycleDetector:
+    """
+    Candidate cycle set maintained under edge updates
+
+    Candidates are the cycles of 2..max_hops hops whose adjusted weight can
+    reach the profit threshold. Every candidate is indexed by its edges. After
+    a quote update only the candidates through changed edges are rescored, and
+    new candidates are searched from the changed edges only: a cycle not
+    touching a changed edge kept its weight. Work per tick depends on the
+    changed edges and their neighbourhood, not on the number of candidates.
+
+    The detector reads the networkx graph that TokenGraphBuilder updates in
+    place (upsert_edges / remove_edges) and keeps its own CSR copy of it.
+    Re-quoted edges are patched into that copy, only added or removed edges
+    rebuild it.
+    """
+
+    def __init__(self,
+                 min_profit_threshold: float = 0.01,
+                 max_hops: int = 4,
+                 base_amount: float = 1.0):
+        """
+        Initialize algorithm
+
+        Args:
+            min_profit_threshold: Minimum profit threshold (0.01 = 1%)
+            max_hops: Maximum allowed hops of a candidate cycle
+            base_amount: Base trading amount (SOL)
+        """
+        self.min_profit_threshold = min_profit_threshold
+        self.max_hops = max_hops
+        self.base_amount = base_amount
+        self.algorithm_name = "IncrementalCycleDetector"
+
+        self.graph: Optional[nx.DiGraph] = None
+        self.cycles: Dict[Cycle, float] = {}                 # candidate -> adjusted weight
+        self.edge_index: Dict[Edge, Set[Cycle]] = {}          # edge -> candidates through it
+        self.last_rescored = 0
+        self.last_expanded_paths = 0
+        self._csr: Optional[CSRGraph] = None   # private copy of graph, patched per tick
+
+    def detect_opportunities(self, graph: nx.DiGraph, source_token: str = None) -> List[ArbitrageOpportunity]:
+        """
+        Rebuild the candidate set on graph and report its opportunities
+
+        Args:
+            graph: Trading graph (networkx), kept for later update() calls
+            source_token: Unused, every edge is searched
+        """
+        print(f"[{self.algorithm_name}] Indexing cycles up to {self.max_hops} hops...")
+        self.reset(graph)
+        opportunities = self.opportunities()
+        print(f"[{self.algorithm_name}] Found {len(opportunities)} arbitrage opportunities "
+              f"({len(self.cycles)} candidate cycles)")
+        return opportunities
+
+    def reset(self, graph: nx.DiGraph):
+        """Full search: every cycle is searched once, from the out-edges of its smallest node ID"""
+        self.graph = graph
+        self.cycles = {}
+        self.edge_index = {}
+        self._csr = CSRGraph.from_networkx(graph)
+        self.last_expanded_paths = 0
+        for u in range(self._csr.number_of_nodes()):
+            successors = self._csr.successors(u)
+            successors = successors[successors > u]
+            if successors.size == 0:
+                continue
+            to_start = self._return_weight_bounds(u, smallest_start=True)
+            for v in successors.tolist():
+                self._search_from_edge(u, v, to_start, smallest_start=True)
+        self.last_rescored = 0
+
+    def update(self, changed_edges: Iterable[Edge],
+               removed_edges: Iterable[Edge] = ()) -> List[ArbitrageOpportunity]:
+        """
+        Apply an edge delta that was already written to the graph
+
+        Args:
+            changed_edges: Added or re-quoted edges (e.g. TokenGraphBuilder.upsert_edges result)
+            removed_edges: Removed edges (e.g. TokenGraphBuilder.remove_edges result)
+
+        Returns:
+            Current opportunities of the candidate set, most profitable first
+        """
+        if self.graph is None:
+            raise ValueError("Detector has no graph, call reset() first")
+
+        removed_edges = list(removed_edges)
+        for edge in removed_edges:
+            for cycle in list(self.edge_index.get(edge, ())):
+                self._drop_cycle(cycle)
+
+        changed_edges = [edge for edge in changed_edges if self.graph.has_edge(*edge)]
+        self._sync_csr(changed_edges, structure_changed=bool(removed_edges))
+
+        # 1) rescore the candidates through changed edges
+        affected = set()
+        for edge in changed_edges:
+            affected.update(self.edge_index.get(edge, ()))
+        weight_bound = profit_weight_bound(self.min_profit_threshold)
+        for cycle in affected:
+            weight = self._cycle_weight(cycle)
+            if weight < weight_bound:
+                self.cycles[cycle] = weight
+            else:
+                self._drop_cycle(cycle)
+        self.last_rescored = len(affected)
+
+        # 2) new candidates can only pass through a changed edge
+        self.last_expanded_paths = 0
+        node_index = self._csr.node_index
+        by_source: Dict[int, List[int]] = {}
+        for u, v in changed_edges:
+            by_source.setdefault(node_index[u], []).append(node_index[v])
+        for u, targets in by_source.items():
+            to_start = self._return_weight_bounds(u)
+            for v in targets:
+                self._search_from_edge(u, v, to_start)
+
+        print(f"[{self.algorithm_name}] {len(changed_edges)} changed edges: rescored {len(affected)} cycles, "
+              f"expanded {self.last_expanded_paths} paths, {len(self.cycles)} candidates")
+        return self.opportunities()
+
+    def opportunities(self) -> List[ArbitrageOpportunity]:
+        """Score the candidates with the shared kernel on the detector's CSR copy"""
+        if not self.cycles:
+            return []
+        node_index = self._csr.node_index
+        paths = [[node_index[token] for token in cycle] + [node_index[cycle[0]]] for cycle in self.cycles]
+        opportunities = create_opportunities(self._csr, paths, self.min_profit_threshold, self.base_amount)
+        opportunities.sort(key=lambda x: (x.profit_ratio, x.confidence_score), reverse=True)
+        return opportunities
+
+    def _sync_csr(self, changed_edges: List[Edge], structure_changed: bool):
+        """Patch re-quoted edges into the CSR copy, rebuild it when edges or tokens were added or removed"""
+        node_index = self._csr.node_index
+        if not structure_changed:
+            structure_changed = (self._csr.number_of_nodes() != self.graph.number_of_nodes()
+                                 or any(u not in node_index or v not in node_index for u, v in changed_edges))
+        if not structure_changed and changed_edges:
+            edge_ids = self._csr.edge_ids([node_index[u] for u, _ in changed_edges],
+                                          [node_index[v] for _, v in changed_edges])
+            structure_changed = bool((edge_ids < 0).any())
+        if structure_changed:
+            self._csr = CSRGraph.from_networkx(self.graph)
+        elif changed_edges:
+            self._csr.update_edges(edge_ids, {
+                attr: np.array([self.graph[u][v].get(attr, 0) for u, v in changed_edges], dtype=np.float64)
+                for attr in EDGE_ATTRIBUTES})
+
+    def _return_weight_bounds(self, start: int, smallest_start: bool = False) -> List[np.ndarray]:
+        """
+        Lower bounds of the remaining weight of a path back to start
+
+        to_start[r][x] is the lightest walk of at most r hops x -> start
+        (r = 0..max_hops - 1), by a hop-limited backward relaxation over the
+        CSR in-edges. Each hop only relaxes the in-edges of the nodes whose
+        bound improved in the previous hop, so the work is O(max_hops * E_local)
+        of the neighbourhood that can reach start. A walk may repeat nodes, so
+        this never overestimates a simple path.
+
+        Args:
+            smallest_start: Only walks through nodes >= start (full search)
+        """
+        graph = self._csr
+        weights = graph.adjusted_weights
+        in_edge_order, in_indptr = graph.in_edge_order, graph.in_indptr
+        bound = np.full(graph.number_of_nodes(), np.inf)
+        bound[start] = 0.0
+        to_start = [bound]
+        frontier = np.array([start], dtype=np.int64)
+        for _ in range(1, self.max_hops):
+            if frontier.size == 0:
+                to_start.append(bound)
+                continue
+            # in-edges of the frontier, gathered from their in_edge_order ranges
+            counts = in_indptr[frontier + 1] - in_indptr[frontier]
+            offsets = np.repeat(in_indptr[frontier] - np.cumsum(counts) + counts, counts)
+            edge_ids = in_edge_order[offsets + np.arange(counts.sum())]
+            sources = graph.sources[edge_ids]
+            if smallest_start:
+                keep = sources >= start
+                edge_ids, sources = edge_ids[keep], sources[keep]
+
+            relaxed = bound.copy()
+            np.minimum.at(relaxed, sources, weights[edge_ids] + bound[graph.indices[edge_ids]])
+            frontier = np.flatnonzero(relaxed < bound)
+            bound = relaxed
+            to_start.append(bound)
+        return to_start
+
+    def _search_from_edge(self, u: int, v: int, to_start: List[np.ndarray], smallest_start: bool = False):
+        """
+        Add every candidate cycle through u -> v (node IDs of the CSR copy)
+
+        Depth-first search along the CSR rows for simple paths v -> ... -> u of
+        at most max_hops - 1 hops. A path at x with r hops left is dropped when
+        its weight plus to_start[r][x] cannot reach the profit bound.
+
+        Args:
+            to_start: _return_weight_bounds(u)
+            smallest_start: Only cycles whose smallest node ID is u (full search)
+        """
+        graph = self._csr
+        weight_bound = profit_weight_bound(self.min_profit_threshold)
+        weights = graph.adjusted_weights
+        indptr, indices, nodes = graph.indptr, graph.indices, graph.nodes
+        first_weight = weights[graph.edge_id(u, v)]
+        if first_weight + to_start[self.max_hops - 1][v] >= weight_bound:
+            return
+
+        # (node, path from u, weight of the path)
+        stack = [(v, [u, v], first_weight)]
+        while stack:
+            node, path, weight = stack.pop()
+            self.last_expanded_paths += 1
+            closing = graph.edge_id(node, u)
+            if closing >= 0 and weight + weights[closing] < weight_bound:
+                self._add_cycle(canonical_cycle([nodes[i] for i in path]), float(weight + weights[closing]))
+
+            # at least one more edge is needed after the next one to close the cycle
+            hops_left = self.max_hops - (len(path) - 1)
+            if hops_left < 2:
+                continue
+            row = slice(indptr[node], indptr[node + 1])
+            targets = indices[row]
+            totals = weight + weights[row]
+            passing = totals + to_start[hops_left - 1][targets] < weight_bound
+            if smallest_start:
+                passing &= targets > u  # 只从最小节点开始, 避免重复搜索
+            for target, total in zip(targets[passing].tolist(), totals[passing].tolist()):
+                if target not in path:
+                    stack.append((target, path + [target], total))
+
+    def _cycle_weight(self, cycle: Cycle) -> float:
+        node_index = self._csr.node_index
+        ids = [node_index[token] for token in cycle]
+        return float(self._csr.adjusted_weights[self._csr.edge_ids(ids, ids[1:] + ids[:1])].sum())
+
+    def _add_cycle(self, cycle: Cycle, weight: float):
+        if cycle not in self.cycles:
+            closed = cycle + (cycle[0],)
+            for edge in zip(closed[:-1], closed[1:]):
+                self.edge_index.setdefault(edge, set()).add(cycle)
+        self.cycles[cycle] = weight
+
+    def _drop_cycle(self, cycle: Cycle):
+        if self.cycles.pop(cycle, None) is None:
+            return
+        closed = cycle + (cycle[0],)
+        for edge in zip(closed[:-1], closed[1:]):
+            cycles = self.edge_index.get(edge)
+            if cycles is not None:
+                cycles.discard(cycle)
+                if not cycles:
+                    del self.edge_index[edge]
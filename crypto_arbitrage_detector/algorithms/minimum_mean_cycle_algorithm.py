@@ -0,0 +1,213 @@
+'''
+Minimum Mean Cycle Arbitrage Detection Algorithm
+Howard 策略迭代求最小平均权重环, 即每跳收益最高的套利环
+'''
+import networkx as nx
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import List, Optional, Tuple, Union
+from utils.data_structures import ArbitrageOpportunity
+from utils.csr_graph import CSRGraph, as_csr_graph
+from utils.opportunity_scoring import create_opportunities
+
+# Values closer than this are treated as equal during policy improvement
+POLICY_TOLERANCE = 1e-12
+
+
+class MinimumMeanCycleArbitrage:
+    """
+    Minimum mean cycle detection with Howard's policy iteration
+
+    A policy picks one out-edge per node, every node then leads into exactly
+    one policy cycle. Each iteration evaluates the mean weight (eta) and the
+    relative values (x) of the policy, then switches nodes to out-edges that
+    reach a lighter cycle or a lower value. At convergence the lightest policy
+    cycle is the minimum mean cycle of the graph, the most profitable per hop.
+    """
+
+    def __init__(self,
+                 min_profit_threshold: float = 0.01,
+                 max_hops: int = 4,
+                 base_amount: float = 1.0,
+                 max_iterations: int = 1000):
+        """
+        Initialize algorithm
+
+        Args:
+            min_profit_threshold: Minimum profit threshold (0.01 = 1%)
+            max_hops: Maximum allowed hops
+            base_amount: Base trading amount (SOL)
+            max_iterations: Upper bound of policy iterations, usually a handful are needed
+        """
+        self.min_profit_threshold = min_profit_threshold
+        self.max_hops = max_hops
+        self.base_amount = base_amount
+        self.max_iterations = max_iterations
+        self.algorithm_name = "MinimumMeanCycleArbitrage"
+        self.last_iterations = 0
+
+    def detect_opportunities(self, graph: Union[nx.DiGraph, CSRGraph], source_token: str = None) -> List[ArbitrageOpportunity]:
+        """
+        Detect the negative cycles with the best weight per hop
+
+        Args:
+            graph: Trading graph, networkx graph or its CSRGraph arrays
+            source_token: Unused, the search covers the whole graph
+        """
+        csr_graph = as_csr_graph(graph)
+
+        print(f"[{self.algorithm_name}] Searching for minimum mean cycles...")
+
+        mean_cycles = self.find_minimum_mean_cycles(csr_graph)
+        if mean_cycles:
+            print(f"[{self.algorithm_name}] Minimum mean weight {mean_cycles[0][0]:.6f} per hop "
+                  f"after {self.last_iterations} policy iterations")
+
+        cycle_paths = [path for mean_weight, path in mean_cycles
+                       if mean_weight < 0 and len(path) <= self.max_hops + 1]
+        filtered_opportunities = create_opportunities(
+            csr_graph, cycle_paths, self.min_profit_threshold, self.base_amount)
+        print(
+            f"[{self.algorithm_name}] Found {len(filtered_opportunities)} minimum mean cycle opportunities")
+
+        return filtered_opportunities
+
+    def find_minimum_mean_cycles(self, graph: CSRGraph) -> List[Tuple[float, List[int]]]:
+        """
+        Run Howard's policy iteration on the adjusted weights
+
+        Returns:
+            (mean weight, closed node ID path) of every cycle of the final
+            policy, lightest first. The first entry is the minimum mean cycle.
+        """
+        self.last_iterations = 0
+        active = self._nodes_with_cycles(graph)
+        edge_mask = active[graph.sources] & active[graph.indices]
+        if not edge_mask.any():
+            return []
+
+        # active edges, still grouped by source as in the CSR arrays
+        sources = graph.sources[edge_mask]
+        targets = graph.indices[edge_mask]
+        weights = graph.adjusted_weights[edge_mask]
+        group_starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+        group_sources = sources[group_starts]
+        group_sizes = np.diff(np.r_[group_starts, len(sources)])
+
+        # initial policy: lightest out-edge of every node
+        policy = np.full(graph.number_of_nodes(), -1, dtype=np.int64)
+        policy_weights = np.zeros(graph.number_of_nodes())
+        self._switch_policy(policy, policy_weights, weights, targets, weights,
+                            group_starts, group_sizes, group_sources,
+                            np.ones(len(group_starts), dtype=bool))
+
+        while True:
+            eta, values, cycles = self._evaluate_policy(policy, policy_weights, group_sources)
+            self.last_iterations += 1
+            if self.last_iterations >= self.max_iterations:
+                break
+
+            # 1) move to successors leading into a lighter policy cycle
+            candidate_eta = eta[targets]
+            best_eta = np.minimum.reduceat(candidate_eta, group_starts)
+            improved = best_eta < eta[group_sources] - POLICY_TOLERANCE
+            if improved.any():
+                tie_break = np.where(candidate_eta == np.repeat(best_eta, group_sizes),
+                                     weights + values[targets], np.inf)
+                self._switch_policy(policy, policy_weights, tie_break, targets, weights,
+                                    group_starts, group_sizes, group_sources, improved)
+                continue
+
+            # 2) same cycle class, move to successors with a lower relative value
+            candidate_values = np.where(np.abs(candidate_eta - eta[sources]) <= POLICY_TOLERANCE,
+                                        weights - eta[sources] + values[targets], np.inf)
+            best_values = np.minimum.reduceat(candidate_values, group_starts)
+            improved = best_values < values[group_sources] - POLICY_TOLERANCE
+            if not improved.any():
+                break
+            self._switch_policy(policy, policy_weights, candidate_values, targets, weights,
+                                group_starts, group_sizes, group_sources, improved)
+
+        cycles.sort(key=lambda item: item[0])
+        return cycles
+
+    @staticmethod
+    def _nodes_with_cycles(graph: CSRGraph) -> np.ndarray:
+        """Mask of nodes left after repeatedly pruning nodes without out-edges (dead ends)"""
+        active = np.ones(graph.number_of_nodes(), dtype=bool)
+        while True:
+            edge_mask = active[graph.sources] & active[graph.indices]
+            has_out_edge = np.bincount(graph.sources[edge_mask], minlength=len(active)) > 0
+            pruned = active & ~has_out_edge
+            if not pruned.any():
+                return active
+            active &= has_out_edge
+
+    @staticmethod
+    def _switch_policy(policy: np.ndarray, policy_weights: np.ndarray, keys: np.ndarray,
+                       targets: np.ndarray, weights: np.ndarray, group_starts: np.ndarray,
+                       group_sizes: np.ndarray, group_sources: np.ndarray, selected: np.ndarray):
+        """Point the selected source groups at their out-edge with the smallest key"""
+        best = np.minimum.reduceat(keys, group_starts)
+        is_best = (keys == np.repeat(best, group_sizes)) & np.repeat(selected, group_sizes)
+        best_edges = np.flatnonzero(is_best)
+        owners = np.repeat(np.arange(len(group_starts)), group_sizes)[best_edges]
+        first = np.r_[True, owners[1:] != owners[:-1]]
+        best_edges, owners = best_edges[first], owners[first]
+        policy[group_sources[owners]] = targets[best_edges]
+        policy_weights[group_sources[owners]] = weights[best_edges]
+
+    @staticmethod
+    def _evaluate_policy(policy: np.ndarray, policy_weights: np.ndarray,
+                         nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[Tuple[float, List[int]]]]:
+        """
+        Mean weight of the cycle every node leads into (eta) and relative values
+        x(v) = w(v, policy(v)) - eta(v) + x(policy(v)), with x = 0 at one node per cycle
+
+        Returns:
+            eta, x, (mean weight, closed path) of every policy cycle
+        """
+        node_count = len(policy)
+        successor = policy.tolist()
+        edge_weight = policy_weights.tolist()
+        eta = [0.0] * node_count
+        values = [0.0] * node_count
+        walk_ids = [-1] * node_count
+        resolved = [False] * node_count
+        cycles = []
+
+        for start in nodes.tolist():
+            if resolved[start]:
+                continue
+            stack = []
+            node = start
+            while not resolved[node] and walk_ids[node] != start:
+                walk_ids[node] = start
+                stack.append(node)
+                node = successor[node]
+
+            if not resolved[node]:
+                # closed a new policy cycle at node
+                cycle = [node]
+                current = successor[node]
+                while current != node:
+                    cycle.append(current)
+                    current = successor[current]
+                mean_weight = sum(edge_weight[v] for v in cycle) / len(cycle)
+                for v in reversed(cycle[1:]):
+                    values[v] = edge_weight[v] - mean_weight + values[successor[v]]
+                for v in cycle:
+                    eta[v] = mean_weight
+                    resolved[v] = True
+                cycles.append((mean_weight, cycle + [node]))
+                stack = stack[:stack.index(node)]
+
+            # tree nodes take the cycle of their successor
+            for v in reversed(stack):
+                eta[v] = eta[successor[v]]
+                values[v] = edge_weight[v] - eta[v] + values[successor[v]]
+                resolved[v] = True
+
+        return np.array(eta), np.array(values), cycles
@@ -0,0 +1,182 @@
+'''
+Adaptive strategy selector
+根据图规模, 变化比例和历史运行时间, 在延迟预算内选择本轮要运行的算法
+'''
+import math
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+from utils.csr_graph import CSRGraph
+from algorithms.dense_cycle_search import DENSE_TRIANGLE_DENSITY
+
+# Seconds per work unit before any run was measured (rough single-core numbers)
+DEFAULT_SECONDS_PER_UNIT = {
+    'Bellman-Ford': 1e-7,         # units: edges x log2(nodes), early-exit passes
+    'Triangle arbitrage': 1e-8,   # units: nodes^3 dense broadcast, 16 x edges^2 / nodes on sparse graphs
+    'Two-hop arbitrage': 2e-8,    # units: nodes^2
+    'Hop-bounded search': 6e-9,   # units: (max_hops - 2) x nodes^3 min-plus products
+    'Minimum mean cycle': 3e-7,   # units: edges, a few policy iterations
+    'Floyd-Warshall': 4e-9,       # units: nodes^3
+}
+
+# Algorithm order of preference, the first one always runs even over budget
+FULL_STRATEGY = ['Bellman-Ford', 'Triangle arbitrage', 'Two-hop arbitrage', 'Hop-bounded search']
+DELTA_STRATEGY = ['Two-hop arbitrage', 'Triangle arbitrage']
+
+
+@dataclass
+class GraphStats:
+    node_count: int
+    edge_count: int
+    density: float                      # edges / (nodes * (nodes - 1))
+    changed_fraction: Optional[float]   # changed edges / edges since the last tick, None if unknown
+
+    @classmethod
+    def from_graph(cls, graph: CSRGraph, changed_edges: Optional[int] = None) -> 'GraphStats':
+        node_count = graph.number_of_nodes()
+        edge_count = graph.number_of_edges()
+        possible_edges = node_count * (node_count - 1)
+        changed_fraction = None
+        if changed_edges is not None:
+            changed_fraction = min(1.0, changed_edges / edge_count) if edge_count else 1.0
+        return cls(node_count, edge_count,
+                   edge_count / possible_edges if possible_edges else 0.0,
+                   changed_fraction)
+
+
+@dataclass
+class StrategyDecision:
+    tick: int
+    stats: GraphStats
+    selected: List[str]
+    skipped: List[str]
+    reason: str
+    budget_seconds: Optional[float]
+    predicted_seconds: Dict[str, float]
+    actual_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class StrategySelector:
+    """
+    Picks the algorithms of a detection tick from a per-algorithm cost model
+
+    Predicted cost = learned seconds per unit x work units of the graph (e.g.
+    nodes^3 for the dense triangle search). A small changed-edge fraction only
+    runs the local two-hop/triangle checks, otherwise the full negative-cycle
+    search. Algorithms are added in order while the predicted total fits the
+    latency budget. Measured times update the cost model (moving average).
+    """
+
+    def __init__(self,
+                 max_hops: int = 4,
+                 small_delta_fraction: float = 0.05,
+                 smoothing: float = 0.3,
+                 history_size: int = 100,
+                 full_strategy: Optional[List[str]] = None,
+                 delta_strategy: Optional[List[str]] = None):
+        """
+        Initialize selector
+
+        Args:
+            max_hops: Maximum hops of the detectors, scales the hop-bounded cost
+            small_delta_fraction: Changed-edge fraction below which only local checks run
+            smoothing: Weight of the newest measurement in the cost model
+            history_size: Number of decisions kept in decision_log
+            full_strategy: Algorithm preference for full ticks
+            delta_strategy: Algorithm preference for small-delta ticks
+        """
+        self.max_hops = max_hops
+        self.small_delta_fraction = small_delta_fraction
+        self.smoothing = smoothing
+        self.full_strategy = list(full_strategy or FULL_STRATEGY)
+        self.delta_strategy = list(delta_strategy or DELTA_STRATEGY)
+        self.seconds_per_unit: Dict[str, float] = dict(DEFAULT_SECONDS_PER_UNIT)
+        self.decision_log: Deque[StrategyDecision] = deque(maxlen=history_size)
+        self._tick = 0
+
+    def work_units(self, algorithm: str, stats: GraphStats) -> float:
+        """Size of the problem for one algorithm, the cost model is linear in it"""
+        nodes, edges = stats.node_count, stats.edge_count
+        if algorithm == 'Bellman-Ford':
+            return edges * math.log2(nodes + 2)
+        if algorithm == 'Two-hop arbitrage':
+            return float(nodes * nodes)
+        if algorithm == 'Triangle arbitrage':
+            if nodes and edges / nodes ** 2 < DENSE_TRIANGLE_DENSITY:
+                return 16.0 * edges * edges / nodes   # CSR enumeration of 2-hop paths
+            return float(nodes ** 3)
+        if algorithm == 'Floyd-Warshall':
+            return float(nodes ** 3)
+        if algorithm == 'Hop-bounded search':
+            return max(1, self.max_hops - 2) * float(nodes ** 3)
+        return float(edges)
+
+    def predict(self, algorithm: str, stats: GraphStats) -> float:
+        """Predicted wall time in seconds"""
+        return self.seconds_per_unit.get(algorithm, 0.0) * self.work_units(algorithm, stats)
+
+    def select(self, stats: GraphStats, latency_budget_ms: Optional[float] = None) -> StrategyDecision:
+        """
+        Choose the algorithms of the next tick
+
+        Args:
+            stats: Statistics of the graph about to be searched
+            latency_budget_ms: Detection budget, None runs the whole strategy
+        """
+        self._tick += 1
+        if stats.changed_fraction is not None and stats.changed_fraction < self.small_delta_fraction:
+            candidates = self.delta_strategy
+            reason = f"small delta ({stats.changed_fraction:.1%} of edges changed): local checks"
+        else:
+            candidates = self.full_strategy
+            reason = ("full negative-cycle search" if stats.changed_fraction is None
+                      else f"large delta ({stats.changed_fraction:.1%} of edges changed): full search")
+
+        budget = latency_budget_ms / 1000.0 if latency_budget_ms is not None else None
+        predicted = {name: self.predict(name, stats) for name in candidates}
+        selected, skipped = [], []
+        total = 0.0
+        for name in candidates:
+            if budget is None or not selected or total + predicted[name] <= budget:
+                selected.append(name)
+                total += predicted[name]
+            else:
+                skipped.append(name)
+        if skipped:
+            reason += f", over budget: {', '.join(skipped)}"
+
+        decision = StrategyDecision(self._tick, stats, selected, skipped, reason, budget, predicted)
+        self.decision_log.append(decision)
+        budget_text = f"{latency_budget_ms:.1f} ms" if latency_budget_ms is not None else "none"
+        print(f"[StrategySelector] tick {decision.tick}: {', '.join(selected)} "
+              f"(predicted {total * 1000:.1f} ms, budget {budget_text}) - {reason}")
+        return decision
+
+    def observe(self, algorithm: str, stats: GraphStats, seconds: float):
+        """Update the cost model with one measured run"""
+        units = self.work_units(algorithm, stats)
+        if units > 0:
+            measured = seconds / units
+            self.seconds_per_unit[algorithm] = ((1 - self.smoothing) * self.seconds_per_unit.get(algorithm, measured)
+                                                + self.smoothing * measured)
+
+    def record(self, decision: StrategyDecision, timings: Dict[str, float]):
+        """
+        Store measured times of a tick and update the cost model
+
+        Args:
+            decision: Decision returned by select for this tick
+            timings: Algorithm name -> wall time in seconds (e.g. detector.last_timings)
+        """
+        for name in decision.selected:
+            if name not in timings:
+                continue
+            decision.actual_seconds[name] = timings[name]
+            self.observe(name, decision.stats, timings[name])
+
+        details = ", ".join(f"{name} {decision.predicted_seconds[name] * 1000:.1f}/{actual * 1000:.1f} ms"
+                            for name, actual in decision.actual_seconds.items())
+        print(f"[StrategySelector] tick {decision.tick} predicted/actual: {details}")
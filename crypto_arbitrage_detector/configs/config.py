@@ -12,5 +12,9 @@ JUPITER_CONFIG = {
         'slippageBps': 50,  # 0.5% slippage
         'onlyDirectRoutes': False,
         'asLegacyTransaction': False
+    },
+    'QUOTE_CACHE': {
+        'max_size': 20000,  # max cached quotes, least recently used evicted first
+        'default_ttl': 2.0  # seconds a cached quote stays valid
     }
 }
\ No newline at end of file
@@ -0,0 +1,289 @@
+'''
+Array-backed token graph for the detection algorithms
+用整数ID + CSR数组表示交易图, 避免算法内层循环里的dict查找
+'''
+import networkx as nx
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# Edge attributes stored as float64 arrays, same names as the networkx edge data
+EDGE_ATTRIBUTES = ('weight', 'price_ratio', 'slippage_bps',
+                   'platform_fee', 'price_impact_pct', 'total_fee')
+
+
+class CSRGraph:
+    """
+    Compact CSR representation of the token swap graph
+
+    Tokens are mapped to integer IDs (position in `nodes`), the out-edges of
+    token i are edges indptr[i]:indptr[i + 1], sorted by target ID.
+    Edge attributes are float64 arrays aligned with `indices`.
+    """
+
+    def __init__(self,
+                 nodes: Sequence[str],
+                 indptr: np.ndarray,
+                 indices: np.ndarray,
+                 edge_arrays: Dict[str, np.ndarray],
+                 version: int = 0):
+        """
+        Initialize from prepared CSR arrays, use from_networkx to convert a graph
+
+        Args:
+            nodes: Token addresses, index is the token ID
+            indptr: Row offsets, length number_of_nodes + 1
+            indices: Target token ID of every edge, sorted within each row
+            edge_arrays: Attribute name -> float64 array aligned with indices
+            version: Graph version the arrays were built from
+        """
+        self.nodes = list(nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        # source ID of every edge, handy for edge-parallel array operations
+        self.sources = np.repeat(np.arange(len(self.nodes), dtype=np.int64),
+                                 np.diff(self.indptr))
+        self.version = version
+        self._adjusted_weights = None
+        self._in_edge_order = None
+        self._in_indptr = None
+        self._dense_adjusted_weights = None
+        self._edge_keys = None
+
+        for attr in EDGE_ATTRIBUTES:
+            values = edge_arrays.get(attr)
+            if values is None:
+                values = np.zeros(len(self.indices), dtype=np.float64)
+            setattr(self, attr, np.asarray(values, dtype=np.float64))
+
+    @property
+    def adjusted_weights(self) -> np.ndarray:
+        """
+        Edge weights including slippage and price impact
+        weight + slippage_bps / 10000 + |price_impact_pct| / 100, computed once per graph version
+        """
+        if self._adjusted_weights is None:
+            self._adjusted_weights = (self.weight + self.slippage_bps / 10000.0
+                                      + np.abs(self.price_impact_pct) / 100.0)
+        return self._adjusted_weights
+
+    @property
+    def dense_adjusted_weights(self) -> np.ndarray:
+        """
+        N x N matrix of adjusted weights, inf where there is no edge (and on the diagonal)
+        Built once per graph version, uses N * N * 8 bytes
+        """
+        if self._dense_adjusted_weights is None:
+            node_count = len(self.nodes)
+            dense = np.full((node_count, node_count), np.inf)
+            dense[self.sources, self.indices] = self.adjusted_weights
+            np.fill_diagonal(dense, np.inf)
+            self._dense_adjusted_weights = dense
+        return self._dense_adjusted_weights
+
+    @property
+    def in_edge_order(self) -> np.ndarray:
+        """Edge IDs sorted by target node (stable), used for per-target reductions"""
+        if self._in_edge_order is None:
+            self._in_edge_order = np.argsort(self.indices, kind='stable')
+        return self._in_edge_order
+
+    @property
+    def in_indptr(self) -> np.ndarray:
+        """Row offsets into in_edge_order: the in-edges of node v are in_edge_order[in_indptr[v]:in_indptr[v + 1]]"""
+        if self._in_indptr is None:
+            self._in_indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+            np.cumsum(self.in_degrees(), out=self._in_indptr[1:])
+        return self._in_indptr
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph, version: int = 0) -> 'CSRGraph':
+        """
+        Build CSR arrays from a networkx graph in one pass over the edges
+
+        Args:
+            graph: Trading graph built by TokenGraphBuilder
+            version: Graph version, used by consumers to cache derived data
+        """
+        if graph is None:
+            raise ValueError("Graph cannot be None")
+
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        edge_count = graph.number_of_edges()
+
+        sources = np.empty(edge_count, dtype=np.int64)
+        targets = np.empty(edge_count, dtype=np.int64)
+        columns = {attr: np.empty(edge_count, dtype=np.float64) for attr in EDGE_ATTRIBUTES}
+
+        for e, (u, v, data) in enumerate(graph.edges(data=True)):
+            sources[e] = node_index[u]
+            targets[e] = node_index[v]
+            for attr in EDGE_ATTRIBUTES:
+                columns[attr][e] = data.get(attr, 0)
+
+        # sort edges by (source, target) so every row is contiguous and searchable
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(nodes)), out=indptr[1:])
+
+        return cls(nodes, indptr, targets[order],
+                   {attr: values[order] for attr, values in columns.items()},
+                   version=version)
+
+    def update_edges(self, edge_ids: np.ndarray, edge_arrays: Dict[str, np.ndarray]):
+        """
+        Overwrite attributes of existing edges in place, e.g. re-quoted pairs
+
+        Cached adjusted weights are patched instead of rebuilt. Only for a graph
+        owned by the caller: consumers that kept arrays of this graph (e.g. the
+        Bellman-Ford warm start) would see them change.
+
+        Args:
+            edge_ids: Positions in the edge arrays, see edge_ids()
+            edge_arrays: Attribute name -> new values aligned with edge_ids
+        """
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        for attr, values in edge_arrays.items():
+            getattr(self, attr)[edge_ids] = values
+        if self._adjusted_weights is not None:
+            self._adjusted_weights[edge_ids] = (self.weight[edge_ids] + self.slippage_bps[edge_ids] / 10000.0
+                                                + np.abs(self.price_impact_pct[edge_ids]) / 100.0)
+        if self._dense_adjusted_weights is not None:
+            self._dense_adjusted_weights[self.sources[edge_ids], self.indices[edge_ids]] = \
+                self.adjusted_weights[edge_ids]
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def successors(self, node_id: int) -> np.ndarray:
+        """Target IDs of the out-edges of node_id"""
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=len(self.nodes))
+
+    def edge_id(self, u: int, v: int) -> int:
+        """Position of edge u -> v in the edge arrays, -1 if the edge does not exist"""
+        start, end = self.indptr[u], self.indptr[u + 1]
+        pos = start + np.searchsorted(self.indices[start:end], v)
+        if pos < end and self.indices[pos] == v:
+            return int(pos)
+        return -1
+
+    def edge_ids(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Vectorized edge_id for arrays of (source, target) pairs, -1 where there is no edge"""
+        if self._edge_keys is None:
+            # rows are sorted by (source, target), so source * N + target is sorted too
+            self._edge_keys = self.sources * len(self.nodes) + self.indices
+        keys = np.asarray(sources, dtype=np.int64) * len(self.nodes) + np.asarray(targets, dtype=np.int64)
+        positions = np.searchsorted(self._edge_keys, keys)
+        found = positions < len(self._edge_keys)
+        found[found] = self._edge_keys[positions[found]] == keys[found]
+        return np.where(found, positions, -1)
+
+    def has_edge(self, u: int, v: int) -> bool:
+        return self.edge_id(u, v) >= 0
+
+    def path_edge_ids(self, path: Sequence[int]) -> Optional[np.ndarray]:
+        """Edge IDs along a node ID path, None if any hop is missing"""
+        edge_ids = np.empty(len(path) - 1, dtype=np.int64)
+        for i in range(len(path) - 1):
+            edge_ids[i] = self.edge_id(path[i], path[i + 1])
+            if edge_ids[i] < 0:
+                return None
+        return edge_ids
+
+    def strongly_connected_components(self) -> np.ndarray:
+        """
+        Component label of every node (iterative Tarjan over the CSR rows)
+        Cycles, and so arbitrage, only exist inside one component
+        """
+        node_count = len(self.nodes)
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        order = [-1] * node_count       # discovery index
+        low = [0] * node_count
+        on_stack = [False] * node_count
+        labels = [-1] * node_count
+        stack = []
+        counter = 0
+        label = 0
+
+        for root in range(node_count):
+            if order[root] >= 0:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, indptr[root])]  # (node, next edge position)
+
+            while work:
+                node, pos = work[-1]
+                if pos < indptr[node + 1]:
+                    work[-1] = (node, pos + 1)
+                    target = indices[pos]
+                    if order[target] < 0:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, indptr[target]))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    # node is the root of a component, pop its members
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        labels[member] = label
+                        if member == node:
+                            break
+                    label += 1
+
+        return np.array(labels, dtype=np.int64)
+
+    def subgraph(self, node_ids: Sequence[int]) -> 'CSRGraph':
+        """Induced subgraph on node_ids, renumbered in ascending ID order, same version"""
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+        new_ids = np.full(len(self.nodes), -1, dtype=np.int64)
+        new_ids[node_ids] = np.arange(len(node_ids))
+        edge_mask = (new_ids[self.sources] >= 0) & (new_ids[self.indices] >= 0)
+
+        # renumbering keeps the order, rows stay sorted by (source, target)
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(new_ids[self.sources[edge_mask]], minlength=len(node_ids)), out=indptr[1:])
+        return CSRGraph([self.nodes[i] for i in node_ids.tolist()],
+                        indptr,
+                        new_ids[self.indices[edge_mask]],
+                        {attr: getattr(self, attr)[edge_mask] for attr in EDGE_ATTRIBUTES},
+                        version=self.version)
+
+    def highest_degree_node(self) -> Optional[int]:
+        """Node ID with the highest in-degree + out-degree"""
+        if not self.nodes:
+            return None
+        return int(np.argmax(self.out_degrees() + self.in_degrees()))
+
+    def to_tokens(self, path: Sequence[int]) -> List[str]:
+        return [self.nodes[i] for i in path]
+
+
+def as_csr_graph(graph) -> CSRGraph:
+    """Return graph as CSRGraph, converting networkx graphs"""
+    if isinstance(graph, nx.DiGraph):
+        return CSRGraph.from_networkx(graph)
+    return graph
@@ -0,0 +1,23 @@
+'''
+Helpers for closed trading paths (cycles)
+环路径的标准化表示, 用于去重
+'''
+from typing import Hashable, Sequence, Tuple
+
+
+def canonical_cycle(path: Sequence[Hashable]) -> Tuple:
+    '''
+    Canonical key of a directed cycle
+
+    The closing node is dropped and the cycle is rotated to start at its
+    smallest node, so A->B->C->A, B->C->A->B and C->A->B->C share a key
+    while the opposite direction A->C->B->A keeps its own.
+
+    Args:
+        path: Closed path (first node repeated at the end) or open node sequence
+    '''
+    nodes = list(path[:-1]) if len(path) > 1 and path[0] == path[-1] else list(path)
+    if not nodes:
+        return ()
+    start = min(range(len(nodes)), key=lambda i: nodes[i])
+    return tuple(nodes[start:] + nodes[:start])
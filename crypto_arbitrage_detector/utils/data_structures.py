@@ -1,7 +1,25 @@
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple
+from dataclasses import MISSING, dataclass, fields, is_dataclass
 
-@dataclass
+
+def _slot_state(self) -> Dict:
+    return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _restore_state(self, state: Dict, properties: Tuple[str, ...] = ()):
+    # also reads pickles written before slots, their state is the instance __dict__:
+    # fields it lacks keep their defaults, attributes that are no field are skipped
+    if is_dataclass(self):
+        for field in fields(self):
+            if field.default is not MISSING:
+                object.__setattr__(self, field.name, field.default)
+    for name, value in state.items():
+        if name in self.__slots__ or name in properties:
+            object.__setattr__(self, name, value)
+
+
+# slots: no per-instance __dict__, these objects are kept in long histories
+@dataclass(slots=True)
 class TokenInfo:
     # Token information fron Jupiter list
     address: str
@@ -18,12 +36,19 @@ class TokenInfo:
     market_cap: float = 0.0
     price_change_24h: float = 0.0
 
+    # Set by VolumeFetcher for the top tokens by volume
+    volume_rank: int = 0
+    creation_date: str = ''
+
     def __post_init__(self):
         if self.tags is None:
             self.tags = []
 
+    __getstate__ = _slot_state
+    __setstate__ = _restore_state
+
 
-@dataclass
+@dataclass(slots=True)
 class EdgePairs:
     from_token: str  # from quote api inputMint
     to_token: str  # from quote api outputMint
@@ -34,18 +59,124 @@ class EdgePairs:
     price_impact_pct: float  # from quote api priceImpactPct
     total_fee: float  # calculated from quote api routePlan
 
+    def freeze(self) -> 'FrozenEdgePairs':
+        return FrozenEdgePairs(self.from_token, self.to_token, self.price_ratio, self.weight,
+                               self.slippage_bps, self.platform_fee, self.price_impact_pct, self.total_fee)
 
-@dataclass
-class ArbitrageOpportunity:
-    path: List[str]
-    path_symbols: List[str]
-    profit_ratio: float
-    total_weight: float
+    __getstate__ = _slot_state
+    __setstate__ = _restore_state
+
+
+# frozen variant: a quote snapshot, updated edges are new objects (dataclasses.replace)
+@dataclass(slots=True, frozen=True)
+class FrozenEdgePairs:
+    from_token: str
+    to_token: str
+    price_ratio: float
+    weight: float
+    slippage_bps: int
+    platform_fee: float
+    price_impact_pct: float
     total_fee: float
-    hop_count: int
-    confidence_score: float  # 置信度分数 (0-1)
-    estimated_profit_sol: float  # 预估利润 (SOL)
 
-    def __post_init__(self):
-        if not self.hop_count:
-            self.hop_count = len(self.path) - 1
+    __getstate__ = _slot_state
+    __setstate__ = _restore_state
+
+
+# repr / eq are written out: the shared token table is neither printed nor compared by identity
+@dataclass(slots=True, init=False, repr=False, eq=False)
+class ArbitrageOpportunity:
+    """
+    Detected arbitrage cycle
+
+    The path is stored as a tuple of integer token IDs plus a token table
+    shared by all opportunities of a graph (CSRGraph.nodes), the token
+    addresses and the display symbols are only built when accessed. Created
+    from a token path (the original signature) it builds its own table.
+    """
+    path_ids: Tuple[int, ...] = ()
+    token_table: Sequence[str] = ()
+    profit_ratio: float = 0.0
+    total_weight: float = 0.0
+    total_fee: float = 0.0
+    hop_count: int = 0
+    confidence_score: float = 0.0  # 置信度分数 (0-1)
+    estimated_profit_sol: float = 0.0  # 预估利润 (SOL)
+    search_completeness: float = 1.0  # share of the planned search finished before the deadline (0-1)
+    explicit_symbols: Optional[List[str]] = None  # display symbols given by the caller
+
+    def __init__(self,
+                 path: Optional[Sequence[str]] = None,
+                 path_symbols: Optional[List[str]] = None,
+                 profit_ratio: float = 0.0,
+                 total_weight: float = 0.0,
+                 total_fee: float = 0.0,
+                 hop_count: int = 0,
+                 confidence_score: float = 0.0,
+                 estimated_profit_sol: float = 0.0,
+                 search_completeness: float = 1.0,
+                 path_ids: Optional[Sequence[int]] = None,
+                 token_table: Optional[Sequence[str]] = None,
+                 explicit_symbols: Optional[List[str]] = None):
+        if path_ids is not None and token_table is not None:
+            self.path_ids = tuple(path_ids)
+            self.token_table = token_table
+        else:
+            self.path = path if path is not None else []
+        # explicit symbols are kept, otherwise derived from the path on access
+        self.path_symbols = path_symbols if path_symbols is not None else explicit_symbols
+        self.profit_ratio = profit_ratio
+        self.total_weight = total_weight
+        self.total_fee = total_fee
+        self.hop_count = hop_count or len(self.path_ids) - 1
+        self.confidence_score = confidence_score
+        self.estimated_profit_sol = estimated_profit_sol
+        self.search_completeness = search_completeness
+
+    @property
+    def path(self) -> List[str]:
+        """Token addresses of the cycle, first token repeated at the end"""
+        table = self.token_table
+        return [table[i] for i in self.path_ids]
+
+    @path.setter
+    def path(self, tokens: Sequence[str]):
+        table = list(dict.fromkeys(tokens))
+        positions = {token: i for i, token in enumerate(table)}
+        self.token_table = table
+        self.path_ids = tuple(positions[token] for token in tokens)
+
+    @property
+    def path_symbols(self) -> List[str]:
+        """Shortened addresses for display"""
+        if self.explicit_symbols is not None:
+            return list(self.explicit_symbols)
+        return [f"{addr[:4]}...{addr[-4:]}" for addr in self.path]
+
+    @path_symbols.setter
+    def path_symbols(self, symbols: Optional[List[str]]):
+        self.explicit_symbols = list(symbols) if symbols is not None else None
+
+    def _values(self) -> Tuple:
+        return (self.path, self.path_symbols, self.profit_ratio, self.total_weight, self.total_fee,
+                self.hop_count, self.confidence_score, self.estimated_profit_sol, self.search_completeness)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # mutable, like the previous dataclass
+
+    __getstate__ = _slot_state
+
+    def __setstate__(self, state: Dict):
+        # pickles written before slots store path / path_symbols
+        _restore_state(self, state, properties=('path', 'path_symbols'))
+
+    def __repr__(self) -> str:
+        return (f"ArbitrageOpportunity(path={self.path!r}, profit_ratio={self.profit_ratio!r}, "
+                f"total_weight={self.total_weight!r}, total_fee={self.total_fee!r}, "
+                f"hop_count={self.hop_count!r}, confidence_score={self.confidence_score!r}, "
+                f"estimated_profit_sol={self.estimated_profit_sol!r}, "
+                f"search_completeness={self.search_completeness!r})")
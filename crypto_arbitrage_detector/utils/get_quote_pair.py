@@ -3,12 +3,15 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import asyncio
 import aiohttp
-from typing import List, Dict
+from typing import List, Dict, Optional, AsyncIterator
 from dataclasses import dataclass, field
 from crypto_arbitrage_detector.utils.data_structures import TokenInfo, EdgePairs
+from crypto_arbitrage_detector.utils.quote_scheduler import QuoteScheduler
+from crypto_arbitrage_detector.utils.quote_cache import QuoteCache
 from crypto_arbitrage_detector.configs import strategy_config
 
 import math
+import time
 
 # quote api
 JUPITER_QUOTE_API = "https://quote-api.jup.ag/v6/quote"
@@ -18,8 +21,16 @@ async def fetch_quote(
         session: aiohttp.ClientSession, 
         input_mint: str, 
         output_mint: str, 
-        #semaphore: asyncio.Semaphore, 
-        amount: int = strategy_config.DEFAULT_TX_AMOUNT) -> Dict:
+        amount: int = strategy_config.DEFAULT_TX_AMOUNT,
+        scheduler: Optional[QuoteScheduler] = None,
+        cache: Optional[QuoteCache] = None,
+        max_age: Optional[float] = None) -> Dict:
+    # serve from cache when the quote is fresh enough for the caller
+    if cache is not None:
+        cached_quote = cache.get(input_mint, output_mint, amount, max_age)
+        if cached_quote is not None:
+            return cached_quote
+
     params = {
         "inputMint": input_mint,
         "outputMint": output_mint,
@@ -35,32 +46,50 @@ async def fetch_quote(
         "Referer": "https://jup.ag/"
     }
 
-    #async with semaphore:
-    try:
-        async with session.get(
-            JUPITER_QUOTE_API, 
-            params=params, 
-            headers=headers, 
-            #proxy=strategy_config.PROXY_URL, 
-            #timeout=15
-            #ssl=False
-            ) as resp:
-            #print(f"[DEBUG] Request URL: {resp.url}")
-            if resp.status == 200:
-                quote_data = await resp.json()
-                #print(f"[DEBUG] Response Data: {quote_data}")
-                return quote_data
-            else:
-                print(f"Non-200 response: {resp.status} | {input_mint} {output_mint}")
-                return {}
-        
-    except Exception as e:
-        print(f"Error fetching quote: {e}")
-        return {}
+    retries = 0
+    while True:
+        if scheduler:
+            await scheduler.acquire()
+        status = None
+        start = time.monotonic()
+        try:
+            async with session.get(
+                JUPITER_QUOTE_API, 
+                params=params, 
+                headers=headers, 
+                #proxy=strategy_config.PROXY_URL, 
+                #timeout=15
+                #ssl=False
+                ) as resp:
+                #print(f"[DEBUG] Request URL: {resp.url}")
+                status = resp.status
+                if resp.status == 200:
+                    quote_data = await resp.json()
+                    #print(f"[DEBUG] Response Data: {quote_data}")
+                    if cache is not None and quote_data:
+                        cache.put(input_mint, output_mint, amount, quote_data)
+                    return quote_data
+                # throttled requests are retried once the scheduler has backed off
+                if resp.status != 429 or not scheduler or retries >= scheduler.max_retries:
+                    print(f"Non-200 response: {resp.status} | {input_mint} {output_mint}")
+                    return {}
+
+        except Exception as e:
+            print(f"Error fetching quote: {e}")
+            return {}
+        finally:
+            if scheduler:
+                await scheduler.release(status, time.monotonic() - start)
+        retries += 1
 
 # Function to request data from Jupiter API for edge pairs
-async def get_edge_pairs(token_list: List[TokenInfo]) -> List[EdgePairs]:
-    #semaphore = asyncio.Semaphore(5)
+async def get_edge_pairs(token_list: List[TokenInfo],
+                         scheduler: Optional[QuoteScheduler] = None,
+                         cache: Optional[QuoteCache] = None,
+                         max_age: Optional[float] = None) -> List[EdgePairs]:
+    # requests are paced by the scheduler, created from JUPITER_CONFIG['RATE_LIMIT'] if not given
+    if scheduler is None:
+        scheduler = QuoteScheduler()
     edge_pairs = []
     # create all requests for each token pair
     async with aiohttp.ClientSession() as session:
@@ -71,67 +100,154 @@ async def get_edge_pairs(token_list: List[TokenInfo]) -> List[EdgePairs]:
                     tasks.append(fetch_quote(
                         session, 
                         token_in.address, 
-                        token_out.address 
-                        #semaphore
+                        token_out.address,
+                        scheduler=scheduler,
+                        cache=cache,
+                        max_age=max_age
                         ))
 
-    # execute all requests concurrently
+    # execute all requests, concurrency and rate are limited by the scheduler
         responses = await asyncio.gather(*tasks)
+    scheduler.print_stats()
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"Quote cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['evictions']} evictions")
     
     # generate a price map in order to calculate the total_fee in SOL
     price_map =generate_price_map_from_responses(responses)
 
     # process the responses and create EdgePairs
     for data in responses:
-        if "outAmount" in data:
-            try:
-                out_amount = float(data["outAmount"])
-                in_amount = float(data["inAmount"])
-                price_ratio = out_amount / in_amount
-                weight = -math.log(price_ratio)
-
-                # Calculate total fee in SOL
-                total_fee_sol = 0.0
-                for route in data.get("routePlan", []):
-                    # route can be empty, so we need to check it
-                    if not route:
-                        continue
-                    # swap_info can be empty, so we need to check it
-                    swap_info = route.get("swapInfo", {})
-                    if not swap_info:
-                        continue
-                    fee_str = swap_info.get("feeAmount")
-                    fee_mint = swap_info.get("feeMint")
-                    if fee_str and fee_mint:
-                        fee = float(fee_str)
-                        price_in_sol = price_map.get(fee_mint, 0.0)
-                        total_fee_sol += fee * price_in_sol
-              
-                # Handle platform fee if return null
-                platform_fee_info = data.get("platformFee"),
-                if isinstance(platform_fee_info, dict):
-                    platform_fee = float(platform_fee_info.get("amount", 0))
-                else:
-                    platform_fee = 0.0
-
-                # Create EdgePairs object
-                edge = EdgePairs(
-                    from_token=data["inputMint"],
-                    to_token=data["outputMint"],
-                    price_ratio=price_ratio,
-                    weight=weight,
-                    slippage_bps=data.get("slippageBps", 0),
-                    platform_fee=platform_fee if platform_fee is not None else 0.0,
-                    price_impact_pct=float(data.get("priceImpactPct", 0.0)),
-                    total_fee=total_fee_sol
-                )
-                edge_pairs.append(edge)
-            except Exception as e:
-                print(f"Error processing response: {e}")
-                continue
+        edge = build_edge_pair_from_response(data, price_map)
+        if edge:
+            edge_pairs.append(edge)
     return edge_pairs
 
 
+# Async generator yielding EdgePairs as soon as their quote arrives
+async def stream_edge_pairs(token_list: List[TokenInfo],
+                            scheduler: Optional[QuoteScheduler] = None,
+                            cache: Optional[QuoteCache] = None,
+                            max_age: Optional[float] = None,
+                            max_in_flight: Optional[int] = None) -> AsyncIterator[EdgePairs]:
+    """
+    Streaming variant of get_edge_pairs
+
+    SOL legs are fetched first since the fee price map only depends on them,
+    the remaining pairs are then streamed with at most max_in_flight pending
+    requests, so memory is bounded by the window instead of N*(N-1).
+
+    Args:
+        token_list: Tokens to quote against each other
+        scheduler: Request scheduler, created from JUPITER_CONFIG['RATE_LIMIT'] if None
+        cache: Optional quote cache
+        max_age: Caller freshness tolerance for cached quotes
+        max_in_flight: Maximum pending quote requests, defaults to twice the scheduler's max concurrency
+    """
+    if scheduler is None:
+        scheduler = QuoteScheduler()
+    if max_in_flight is None:
+        max_in_flight = scheduler.max_concurrency * 2
+
+    # only the 2 * (N - 1) SOL legs are materialized, the other pairs are generated on demand
+    sol_pairs = [(token_in.address, token_out.address)
+                 for token_in in token_list for token_out in token_list
+                 if token_in.address != token_out.address
+                 and strategy_config.SOL_MINT in (token_in.address, token_out.address)]
+    other_pairs = ((token_in.address, token_out.address)
+                   for token_in in token_list for token_out in token_list
+                   if token_in.address != token_out.address
+                   and strategy_config.SOL_MINT not in (token_in.address, token_out.address))
+
+    async with aiohttp.ClientSession() as session:
+        # Phase 1: SOL legs build the price map used for fees in SOL
+        sol_responses = await asyncio.gather(*[
+            fetch_quote(session, input_mint, output_mint,
+                        scheduler=scheduler, cache=cache, max_age=max_age)
+            for input_mint, output_mint in sol_pairs])
+        price_map = generate_price_map_from_responses(sol_responses)
+        for data in sol_responses:
+            edge = build_edge_pair_from_response(data, price_map)
+            if edge:
+                yield edge
+        del sol_responses
+
+        # Phase 2: all other pairs with a bounded window of pending requests
+        pending = set()
+        try:
+            while True:
+                for input_mint, output_mint in other_pairs:
+                    pending.add(asyncio.ensure_future(fetch_quote(
+                        session, input_mint, output_mint,
+                        scheduler=scheduler, cache=cache, max_age=max_age)))
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    edge = build_edge_pair_from_response(task.result(), price_map)
+                    if edge:
+                        yield edge
+        finally:
+            # consumer stopped early, drop the requests still in flight
+            for task in pending:
+                task.cancel()
+
+    scheduler.print_stats()
+
+
+# Helper Function to create EdgePairs from a single quote response, returns None if invalid
+def build_edge_pair_from_response(data: Dict, price_map: Dict[str, float]) -> Optional[EdgePairs]:
+    if "outAmount" not in data:
+        return None
+    try:
+        out_amount = float(data["outAmount"])
+        in_amount = float(data["inAmount"])
+        price_ratio = out_amount / in_amount
+        weight = -math.log(price_ratio)
+
+        # Calculate total fee in SOL
+        total_fee_sol = 0.0
+        for route in data.get("routePlan", []):
+            # route can be empty, so we need to check it
+            if not route:
+                continue
+            # swap_info can be empty, so we need to check it
+            swap_info = route.get("swapInfo", {})
+            if not swap_info:
+                continue
+            fee_str = swap_info.get("feeAmount")
+            fee_mint = swap_info.get("feeMint")
+            if fee_str and fee_mint:
+                fee = float(fee_str)
+                price_in_sol = price_map.get(fee_mint, 0.0)
+                total_fee_sol += fee * price_in_sol
+
+        # Handle platform fee if return null
+        platform_fee_info = data.get("platformFee"),
+        if isinstance(platform_fee_info, dict):
+            platform_fee = float(platform_fee_info.get("amount", 0))
+        else:
+            platform_fee = 0.0
+
+        # Create EdgePairs object
+        return EdgePairs(
+            from_token=data["inputMint"],
+            to_token=data["outputMint"],
+            price_ratio=price_ratio,
+            weight=weight,
+            slippage_bps=data.get("slippageBps", 0),
+            platform_fee=platform_fee if platform_fee is not None else 0.0,
+            price_impact_pct=float(data.get("priceImpactPct", 0.0)),
+            total_fee=total_fee_sol
+        )
+    except Exception as e:
+        print(f"Error processing response: {e}")
+        return None
+
+
 # Helper Function to generate a price map from sol to other tokens to count the price of each token in terms of SOL
 def generate_price_map_from_responses(responses: List[Dict]) -> Dict[str, float]:
     price_map = {strategy_config.SOL_MINT: 1.0}
@@ -158,14 +274,17 @@ def generate_price_map_from_responses(responses: List[Dict]) -> Dict[str, float]
 
 
 # Legacy synchronous function for backward compatibility
-def get_quote_pair(input_mint, output_mint, amount=strategy_config.DEFAULT_TX_AMOUNT, input_symbol=None, output_symbol=None):
+def get_quote_pair(input_mint, output_mint, amount=strategy_config.DEFAULT_TX_AMOUNT, input_symbol=None, output_symbol=None,
+                   cache: Optional[QuoteCache] = None, max_age: Optional[float] = None):
     """
     Synchronous wrapper for the async fetch_quote function
     For backward compatibility with existing code
+    Pass a shared QuoteCache to reuse quotes across calls
     """
     async def _get_quote():
         async with aiohttp.ClientSession() as session:
-            quote = await fetch_quote(session, input_mint, output_mint, amount)
+            quote = await fetch_quote(session, input_mint, output_mint, amount,
+                                      cache=cache, max_age=max_age)
             if quote and 'inAmount' in quote and 'outAmount' in quote:
                 in_amount = int(quote['inAmount'])
                 out_amount = int(quote['outAmount'])
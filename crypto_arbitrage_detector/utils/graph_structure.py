@@ -2,10 +2,11 @@
 从nova的list建静态图, 处理边的验证和错误处理, 提供下一步的接口
 '''
 import networkx as nx
-from typing import List
+from typing import List, Tuple, AsyncIterator
 from datetime import datetime
 
-from crypto_arbitrage_detector.utils.data_structures import EdgePairs
+from crypto_arbitrage_detector.utils.data_structures import EdgePairs, FrozenEdgePairs
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
 
 
 class TokenGraphBuilder:
@@ -14,6 +15,9 @@ class TokenGraphBuilder:
 
     Features:
     - Build graph from EdgePairs list
+    - Build graph incrementally from an async EdgePairs stream
+    - In-place edge upsert/remove with a graph version counter
+    - Cached CSR array view for the detection algorithms
     - Data validation and error handling
     - Graph visualization and statistics
     - Detailed edge information display
@@ -25,6 +29,10 @@ class TokenGraphBuilder:
         '''
         self.graph = None
         self.build_history = []
+        # bumped on every change of self.graph, consumers cache derived data per version
+        self.graph_version = 0
+        self.last_changed_edges: List[Tuple[str, str]] = []
+        self._csr_graph = None
         print("^ ^ TokenGraphBuilder initialized successfully")
 
     def build_graph_from_edge_lists(self, edges: List[EdgePairs]) -> nx.DiGraph:
@@ -47,78 +55,11 @@ class TokenGraphBuilder:
         G = nx.DiGraph()
 
         for i, edge in enumerate(edges):
-            try:
-                # Validate edge is a EdgePairs object
-                if not isinstance(edge, EdgePairs):
-                    raise TypeError(
-                        f"Edge at index {i} is not an EdgePairs object, got {type(edge)}")
-
-                # validate fields
-                required_attrs = ['from_token', 'to_token', 'weight', 'price_ratio',
-                                  'slippage_bps', 'platform_fee', 'price_impact_pct', 'total_fee']
-
-                for attr in required_attrs:
-                    if not hasattr(edge, attr):
-                        raise AttributeError(
-                            f"Edge at index {i} is missing required attribute '{attr}'")
-
-                    value = getattr(edge, attr)
-                    if value is None:
-                        raise ValueError(
-                            f"Edge at index {i} has None value for attribute '{attr}'")
-
-                # token address cannot be empty strings
-                if not edge.from_token or not edge.to_token:
-                    raise ValueError(
-                        f"Edge at index {i} has empty token address(es)")
-
-                # Validate numeric attributes
-                numeric_attrs = ['price_ratio',
-                                 'platform_fee', 'price_impact_pct']
-                for attr in numeric_attrs:
-                    value = getattr(edge, attr)
-                    if not isinstance(value, (int, float)):
-                        raise ValueError(
-                            f"Edge at index {i} has invalid {attr}: {value} (must be a number)")
-                    if value < 0:
-                        raise ValueError(
-                            f"Edge at index {i} has invalid {attr}: {value} (must be non-negative)")
-
-                # weight must be a number
-                if not isinstance(edge.weight, (int, float)):
-                    raise ValueError(
-                        f"Edge at index {i} has invalid weight: {edge.weight} (must be a number)")
-
-                # 浮点值，total fee验证
-                if not isinstance(edge.slippage_bps, int) or edge.slippage_bps < 0:
-                    raise ValueError(
-                        f"Edge at index {i} has invalid slippage_bps: {edge.slippage_bps} (must be non-negative integer)")
-
-                if not isinstance(edge.total_fee, (int, float)) or edge.total_fee < 0:
-                    raise ValueError(
-                        f"Edge at index {i} has invalid total_fee: {edge.total_fee} (must be non-negative number)")
-
-                # can add edge to graph
-                G.add_edge(
-                    edge.from_token,
-                    edge.to_token,
-                    weight=edge.weight,
-                    price_ratio=edge.price_ratio,
-                    slippage_bps=edge.slippage_bps,
-                    platform_fee=edge.platform_fee,
-                    price_impact_pct=edge.price_impact_pct,
-                    total_fee=edge.total_fee
-                )
-
-            except (AttributeError, ValueError, TypeError) as e:
-                raise ValueError(
-                    f"Error processing edge at index {i}: {str(e)}")
-            except Exception as e:
-                raise RuntimeError(
-                    f"Unexpected error processing edge at index {i}: {str(e)}")
+            self._add_validated_edge(G, edge, i)
 
         # Save built graph and history
         self.graph = G
+        self._bump_version(list(G.edges()))
         self.build_history.append({
             'timestamp': datetime.now(),  # Record build time
             'edges_count': len(edges),
@@ -130,6 +71,199 @@ class TokenGraphBuilder:
             f"- Graph built successfully: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
         return G
 
+    async def build_graph_from_edge_stream(self, edge_stream: AsyncIterator[EdgePairs],
+                                           batch_size: int = 100) -> AsyncIterator[nx.DiGraph]:
+        '''
+        Build graph incrementally from an async stream of EdgePairs (e.g. stream_edge_pairs)
+        Args:
+            edge_stream: Async iterator yielding EdgePairs objects
+            batch_size: Number of edges added between two yielded snapshots
+        Yields:
+            nx.DiGraph: The partially built graph after each batch, detection can run on it
+        '''
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        G = nx.DiGraph()
+        self.graph = G
+        edges_count = 0
+        batch = []
+
+        async for edge in edge_stream:
+            self._add_validated_edge(G, edge, edges_count)
+            edges_count += 1
+            batch.append((edge.from_token, edge.to_token))
+            if len(batch) >= batch_size:
+                self._bump_version(batch)
+                batch = []
+                yield G
+
+        self.build_history.append({
+            'timestamp': datetime.now(),
+            'edges_count': edges_count,
+            'nodes_count': G.number_of_nodes(),
+            'graph_edges_count': G.number_of_edges()
+        })
+        print(
+            f"- Graph streamed successfully: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+        if batch or edges_count == 0:
+            self._bump_version(batch)
+            yield G
+
+    def upsert_edges(self, edges: List[EdgePairs]) -> List[Tuple[str, str]]:
+        '''
+        Insert or update edges of the current graph in place
+        Only the given edges are validated, edges whose attributes did not change are skipped
+        Args:
+            edges: List of EdgePairs objects with new quotes
+        Returns:
+            List[Tuple[str, str]]: (from_token, to_token) of edges that were added or changed
+        '''
+        if edges is None:
+            raise ValueError("Edges list cannot be None")
+
+        if self.graph is None:
+            self.graph = nx.DiGraph()
+
+        # validate the whole delta first so a bad edge leaves the graph untouched
+        for i, edge in enumerate(edges):
+            self._validate_edge(edge, i)
+
+        changed = []
+        for edge in edges:
+            attributes = self._edge_attributes(edge)
+            u, v = edge.from_token, edge.to_token
+            if self.graph.has_edge(u, v) and self.graph[u][v] == attributes:
+                continue
+            self.graph.add_edge(u, v, **attributes)
+            changed.append((u, v))
+
+        if changed:
+            self._bump_version(changed)
+        return changed
+
+    def remove_edges(self, edge_keys: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        '''
+        Remove edges from the current graph in place, tokens stay in the graph
+        Args:
+            edge_keys: List of (from_token, to_token) tuples, missing edges are ignored
+        Returns:
+            List[Tuple[str, str]]: Edges that were actually removed
+        '''
+        if self.graph is None:
+            return []
+
+        removed = []
+        for u, v in edge_keys:
+            if self.graph.has_edge(u, v):
+                self.graph.remove_edge(u, v)
+                removed.append((u, v))
+
+        if removed:
+            self._bump_version(removed)
+        return removed
+
+    def to_csr_graph(self) -> CSRGraph:
+        '''
+        Array-backed view of the current graph for the detection algorithms
+        Built once per graph version and reused until the graph changes
+        Returns:
+            CSRGraph: CSR arrays of the current graph
+        '''
+        if self.graph is None:
+            raise ValueError("Graph has not been built yet")
+
+        if self._csr_graph is None or self._csr_graph.version != self.graph_version:
+            self._csr_graph = CSRGraph.from_networkx(self.graph, version=self.graph_version)
+        return self._csr_graph
+
+    def _bump_version(self, changed_edges: List[Tuple[str, str]]):
+        self.graph_version += 1
+        self.last_changed_edges = changed_edges
+
+    def _add_validated_edge(self, G: nx.DiGraph, edge: EdgePairs, i: int):
+        '''
+        Validate a single EdgePairs object and add it to the graph
+        Args:
+            G: Graph to add the edge to
+            edge: EdgePairs object
+            i: Index of the edge, used in error messages
+        '''
+        self._validate_edge(edge, i)
+        G.add_edge(edge.from_token, edge.to_token, **self._edge_attributes(edge))
+
+    @staticmethod
+    def _edge_attributes(edge: EdgePairs) -> dict:
+        return {
+            'weight': edge.weight,
+            'price_ratio': edge.price_ratio,
+            'slippage_bps': edge.slippage_bps,
+            'platform_fee': edge.platform_fee,
+            'price_impact_pct': edge.price_impact_pct,
+            'total_fee': edge.total_fee
+        }
+
+    def _validate_edge(self, edge: EdgePairs, i: int):
+        '''
+        Validate a single EdgePairs object, raises ValueError/RuntimeError if invalid
+        '''
+        try:
+            # Validate edge is a EdgePairs object
+            if not isinstance(edge, (EdgePairs, FrozenEdgePairs)):
+                raise TypeError(
+                    f"Edge at index {i} is not an EdgePairs object, got {type(edge)}")
+
+            # validate fields
+            required_attrs = ['from_token', 'to_token', 'weight', 'price_ratio',
+                              'slippage_bps', 'platform_fee', 'price_impact_pct', 'total_fee']
+
+            for attr in required_attrs:
+                if not hasattr(edge, attr):
+                    raise AttributeError(
+                        f"Edge at index {i} is missing required attribute '{attr}'")
+
+                value = getattr(edge, attr)
+                if value is None:
+                    raise ValueError(
+                        f"Edge at index {i} has None value for attribute '{attr}'")
+
+            # token address cannot be empty strings
+            if not edge.from_token or not edge.to_token:
+                raise ValueError(
+                    f"Edge at index {i} has empty token address(es)")
+
+            # Validate numeric attributes
+            numeric_attrs = ['price_ratio',
+                             'platform_fee', 'price_impact_pct']
+            for attr in numeric_attrs:
+                value = getattr(edge, attr)
+                if not isinstance(value, (int, float)):
+                    raise ValueError(
+                        f"Edge at index {i} has invalid {attr}: {value} (must be a number)")
+                if value < 0:
+                    raise ValueError(
+                        f"Edge at index {i} has invalid {attr}: {value} (must be non-negative)")
+
+            # weight must be a number
+            if not isinstance(edge.weight, (int, float)):
+                raise ValueError(
+                    f"Edge at index {i} has invalid weight: {edge.weight} (must be a number)")
+
+            # 浮点值，total fee验证
+            if not isinstance(edge.slippage_bps, int) or edge.slippage_bps < 0:
+                raise ValueError(
+                    f"Edge at index {i} has invalid slippage_bps: {edge.slippage_bps} (must be non-negative integer)")
+
+            if not isinstance(edge.total_fee, (int, float)) or edge.total_fee < 0:
+                raise ValueError(
+                    f"Edge at index {i} has invalid total_fee: {edge.total_fee} (must be non-negative number)")
+
+        except (AttributeError, ValueError, TypeError) as e:
+            raise ValueError(
+                f"Error processing edge at index {i}: {str(e)}")
+        except Exception as e:
+            raise RuntimeError(
+                f"Unexpected error processing edge at index {i}: {str(e)}")
 
 # Backward compatible function interface
 def build_graph_from_edge_lists(edges: List[EdgePairs]) -> nx.DiGraph:
@@ -0,0 +1,132 @@
+'''
+Hot cycle cache
+最近盈利或接近盈利的环, 每个tick先用新报价重算, 按热度衰减淘汰
+'''
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
+from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+from crypto_arbitrage_detector.utils.data_structures import ArbitrageOpportunity
+from crypto_arbitrage_detector.utils.opportunity_scoring import create_opportunities, score_paths
+
+
+class HotCycleCache:
+    """
+    Recently profitable cycles, rescored on every tick before any search
+
+    Every entry has a heat in (0, 1]. A tick multiplies all heats by `decay`,
+    a cycle that is profitable or within near_threshold_bps of the threshold
+    on the new quotes is reset to 1. Entries colder than min_heat are evicted,
+    the coldest (then least profitable) go first when the cache is full.
+    """
+
+    def __init__(self,
+                 max_size: int = 256,
+                 near_threshold_bps: float = 20.0,
+                 decay: float = 0.8,
+                 min_heat: float = 0.1):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of cached cycles
+            near_threshold_bps: Cycles this close below the profit threshold stay hot
+            decay: Heat factor per tick without a profitable rescore
+            min_heat: Entries below this heat are evicted (decay 0.8, min_heat 0.1: about 10 ticks)
+        """
+        self.max_size = max_size
+        self.near_threshold_bps = near_threshold_bps
+        self.decay = decay
+        self.min_heat = min_heat
+        # canonical token cycle -> [heat, closed token path, last profit ratio]
+        self._entries: Dict[Tuple[str, ...], List] = {}
+        self.ticks = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: Sequence[str]) -> bool:
+        return canonical_cycle(path) in self._entries
+
+    def paths(self) -> List[List[str]]:
+        """Closed token paths of the cached cycles, hottest first"""
+        entries = sorted(self._entries.values(), key=lambda entry: entry[0], reverse=True)
+        return [list(path) for _, path, _ in entries]
+
+    def rescore(self, graph: CSRGraph, min_profit_threshold: float,
+                base_amount: float = 1.0, max_hops: Optional[int] = None) -> List[ArbitrageOpportunity]:
+        """
+        Start a tick: decay, rescore every cached cycle on graph, evict cold entries
+
+        Cycles whose tokens or edges are missing from graph, or with more than
+        max_hops hops, only decay.
+
+        Returns:
+            Opportunities of the cached cycles that reach min_profit_threshold
+        """
+        self.ticks += 1
+        for entry in self._entries.values():
+            entry[0] *= self.decay
+
+        node_index = graph.node_index
+        by_length: Dict[int, List[Tuple[Tuple[str, ...], List[int]]]] = {}
+        for key, (_, path, _) in self._entries.items():
+            if max_hops is not None and len(path) - 1 > max_hops:
+                continue
+            if all(token in node_index for token in path):
+                by_length.setdefault(len(path), []).append((key, [node_index[token] for token in path]))
+
+        near_bound = min_profit_threshold - self.near_threshold_bps / 10000.0
+        profitable_paths = []
+        for candidates in by_length.values():
+            scores = score_paths(graph, np.array([path for _, path in candidates]), base_amount)
+            profit_ratio = np.where(scores['valid'], scores['profit_ratio'], -np.inf)
+            for row, (key, path) in enumerate(candidates):
+                entry = self._entries[key]
+                entry[2] = float(profit_ratio[row])
+                if entry[2] < near_bound:
+                    continue
+                entry[0] = 1.0
+                if entry[2] >= min_profit_threshold:
+                    profitable_paths.append(path)
+
+        self._evict()
+        opportunities = create_opportunities(graph, profitable_paths, min_profit_threshold, base_amount)
+        self.hits += len(opportunities)
+        return opportunities
+
+    def update(self, opportunities: List[ArbitrageOpportunity]):
+        """Add or refresh the cycles found by this tick's search"""
+        for opp in opportunities:
+            key = canonical_cycle(opp.path)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [1.0, list(opp.path), opp.profit_ratio]
+            else:
+                entry[0], entry[2] = 1.0, opp.profit_ratio
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+
+    def copy(self) -> 'HotCycleCache':
+        """Independent cache with the same settings, entries and counters"""
+        cache = HotCycleCache(self.max_size, self.near_threshold_bps, self.decay, self.min_heat)
+        cache._entries = {key: list(entry) for key, entry in self._entries.items()}
+        cache.ticks, cache.hits, cache.evictions = self.ticks, self.hits, self.evictions
+        return cache
+
+    def _evict(self):
+        """Drop entries below min_heat, then the coldest ones above max_size"""
+        cold = [key for key, (heat, _, _) in self._entries.items() if heat < self.min_heat]
+        if len(self._entries) - len(cold) > self.max_size:
+            cold_keys = set(cold)
+            remaining = sorted((key for key in self._entries if key not in cold_keys),
+                               key=lambda key: (self._entries[key][0], self._entries[key][2]))
+            cold.extend(remaining[:len(remaining) - self.max_size])
+        for key in cold:
+            del self._entries[key]
+        self.evictions += len(cold)
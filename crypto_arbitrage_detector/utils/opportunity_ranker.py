@@ -0,0 +1,102 @@
+'''
+Streaming top-N opportunity ranking
+有界最小堆, 边接收边去重, 只保留 (profit_ratio, confidence_score) 最好的 N 个机会
+'''
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+from crypto_arbitrage_detector.utils.data_structures import ArbitrageOpportunity
+
+
+class TopNOpportunityRanker:
+    """
+    Best opportunities of a stream, deduplicated by canonical cycle
+
+    A duplicate cycle replaces the kept one only with a higher profit ratio.
+    With a capacity, the worst kept opportunity sits at the top of a min-heap
+    and is dropped when a better one arrives, memory stays O(capacity).
+    Ties keep the opportunity that arrived first, like a stable sort (an
+    evicted cycle that comes back counts as a new arrival).
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize ranker
+
+        Args:
+            capacity: Number of opportunities kept, None keeps all
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        # canonical cycle -> (profit_ratio, confidence_score, arrival number, opportunity)
+        self._kept: Dict[Tuple, Tuple[float, float, int, ArbitrageOpportunity]] = {}
+        # (profit_ratio, confidence_score, -arrival number, canonical cycle), may hold replaced entries
+        self._heap: List[Tuple[float, float, int, Tuple]] = []
+        self._arrivals = 0
+        self.pushed = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._kept)
+
+    def push(self, opportunity: ArbitrageOpportunity) -> bool:
+        """Offer one opportunity, returns True if it is kept"""
+        self.pushed += 1
+        key = canonical_cycle(opportunity.path)
+        current = self._kept.get(key)
+        if current is not None:
+            if opportunity.profit_ratio <= current[0]:
+                self.rejected += 1
+                return False
+            arrival = current[2]
+        else:
+            arrival = self._arrivals
+            if self.is_full() and (opportunity.profit_ratio, opportunity.confidence_score, -arrival) <= self._worst()[:3]:
+                self.rejected += 1
+                return False
+            self._arrivals += 1
+
+        entry = (opportunity.profit_ratio, opportunity.confidence_score, arrival, opportunity)
+        self._kept[key] = entry
+        heapq.heappush(self._heap, (entry[0], entry[1], -arrival, key))
+        if self.capacity is not None and len(self._kept) > self.capacity:
+            _, _, _, worst_key = self._worst()
+            heapq.heappop(self._heap)
+            del self._kept[worst_key]
+        if len(self._heap) > 2 * len(self._kept) + 16:
+            self._rebuild_heap()
+        return True
+
+    def extend(self, opportunities: Iterable[ArbitrageOpportunity]) -> int:
+        """Offer a batch, returns the number kept"""
+        return sum(self.push(opportunity) for opportunity in opportunities)
+
+    def is_full(self) -> bool:
+        return self.capacity is not None and len(self._kept) >= self.capacity
+
+    def floor(self) -> Optional[float]:
+        """Profit ratio a new opportunity has to reach to be kept, None while not full"""
+        if not self.is_full():
+            return None
+        return self._worst()[0]
+
+    def ranked(self) -> List[ArbitrageOpportunity]:
+        """Kept opportunities, best first"""
+        entries = sorted(self._kept.values(), key=lambda entry: (-entry[0], -entry[1], entry[2]))
+        return [entry[3] for entry in entries]
+
+    def _worst(self) -> Tuple[float, float, int, Tuple]:
+        """Heap top after dropping replaced entries"""
+        while True:
+            profit_ratio, confidence_score, negative_arrival, key = self._heap[0]
+            kept = self._kept.get(key)
+            if kept is not None and kept[:3] == (profit_ratio, confidence_score, -negative_arrival):
+                return self._heap[0]
+            heapq.heappop(self._heap)
+
+    def _rebuild_heap(self):
+        self._heap = [(profit_ratio, confidence_score, -arrival, key)
+                      for key, (profit_ratio, confidence_score, arrival, _) in self._kept.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,117 @@
+'''
+Batched opportunity scoring shared by all detection algorithms
+一次性对一批候选环计算调整后权重, 费用, 利润率和置信度
+'''
+import numpy as np
+from typing import Dict, List, Sequence, Union
+
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
+from crypto_arbitrage_detector.utils.data_structures import ArbitrageOpportunity
+
+PathBatch = Union[np.ndarray, Sequence[Sequence[int]]]
+
+
+def score_paths(graph: CSRGraph, paths: np.ndarray, base_amount: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Score closed paths of equal length at once
+
+    adjusted weight = sum(weight + slippage_bps / 10000 + |price_impact_pct| / 100)
+    profit ratio    = exp(-adjusted weight) - 1 - (total_fee + platform_fee) / base_amount
+    confidence      = min(1, profit / fees / 5) (0.5 without fees), reduced by the
+                      slippage risk min(1, 10 * slippage) and the price impact risk
+                      min(1, impact / 10)
+
+    Args:
+        graph: CSR graph the node IDs refer to
+        paths: M x L array of node IDs, first node repeated at the end
+        base_amount: Base trading amount (SOL)
+
+    Returns:
+        Arrays of length M: valid (every hop is an edge), adjusted_weight,
+        total_fee, profit_ratio, estimated_profit, confidence_score
+    """
+    paths = np.asarray(paths, dtype=np.int64)
+    edge_ids = graph.edge_ids(paths[:, :-1], paths[:, 1:])
+    valid = (edge_ids >= 0).all(axis=1)
+    # missing hops read edge 0 and are masked by valid
+    edge_ids = np.where(edge_ids >= 0, edge_ids, 0)
+
+    adjusted_weight = graph.adjusted_weights[edge_ids].sum(axis=1)
+    # 将滑点从基点转换为小数 (1 bps = 0.0001)
+    total_slippage = graph.slippage_bps[edge_ids].sum(axis=1) / 10000.0
+    total_price_impact = np.abs(graph.price_impact_pct[edge_ids]).sum(axis=1)  # 价格影响通常为负值
+    total_all_fees = graph.total_fee[edge_ids].sum(axis=1) + graph.platform_fee[edge_ids].sum(axis=1)
+
+    profit_ratio = np.expm1(-adjusted_weight) - total_all_fees / base_amount
+    estimated_profit = base_amount * profit_ratio
+
+    slippage_risk = np.minimum(1.0, total_slippage * 10)
+    price_impact_risk = np.minimum(1.0, total_price_impact / 10)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fee_confidence = np.minimum(1.0, np.maximum(0.0, estimated_profit / total_all_fees) / 5)
+    base_confidence = np.where(total_all_fees > 0, fee_confidence, 0.5)
+    confidence_score = np.clip(base_confidence * (1 - slippage_risk) * (1 - price_impact_risk), 0.0, 1.0)
+
+    return {
+        'valid': valid,
+        'adjusted_weight': adjusted_weight,
+        'total_fee': total_all_fees,
+        'profit_ratio': profit_ratio,
+        'estimated_profit': estimated_profit,
+        'confidence_score': confidence_score
+    }
+
+
+def create_opportunities(graph: CSRGraph, paths: PathBatch, min_profit_threshold: float,
+                         base_amount: float = 1.0) -> List[ArbitrageOpportunity]:
+    """
+    Score candidate paths and build opportunities for the profitable ones
+
+    A path survives if every hop exists, its adjusted weight is negative and
+    its profit ratio reaches min_profit_threshold. Only survivors are turned
+    into ArbitrageOpportunity objects.
+
+    Args:
+        graph: CSR graph the node IDs refer to
+        paths: M x L node ID array, or a list of closed paths of any length
+        min_profit_threshold: Minimum profit threshold (0.01 = 1%)
+        base_amount: Base trading amount (SOL)
+
+    Returns:
+        Opportunities in the order of the input paths
+    """
+    if isinstance(paths, np.ndarray):
+        batches = [(np.arange(len(paths)), paths)] if paths.size else []
+    else:
+        # equal-length paths are scored together
+        by_length: Dict[int, List[int]] = {}
+        for i, path in enumerate(paths):
+            if len(path) >= 2:
+                by_length.setdefault(len(path), []).append(i)
+        batches = [(np.array(positions), np.array([paths[i] for i in positions]))
+                   for positions in by_length.values()]
+
+    survivors = []
+    for positions, batch in batches:
+        scores = score_paths(graph, batch, base_amount)
+        keep = np.flatnonzero(scores['valid']
+                              & (scores['adjusted_weight'] < 0)
+                              & (scores['profit_ratio'] >= min_profit_threshold))
+        for row in keep.tolist():
+            survivors.append((positions[row], batch[row], {name: values[row] for name, values in scores.items()}))
+    survivors.sort(key=lambda item: item[0])
+
+    opportunities = []
+    for _, path, scores in survivors:
+        # token IDs + the graph's token list, addresses and symbols are built on access
+        opportunities.append(ArbitrageOpportunity(
+            path_ids=path.tolist(),
+            token_table=graph.nodes,
+            profit_ratio=float(scores['profit_ratio']),
+            total_weight=float(scores['adjusted_weight']),
+            total_fee=float(scores['total_fee']),
+            hop_count=len(path) - 1,
+            confidence_score=float(scores['confidence_score']),
+            estimated_profit_sol=float(scores['estimated_profit'])
+        ))
+    return opportunities
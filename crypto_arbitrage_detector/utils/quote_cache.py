@@ -0,0 +1,106 @@
+'''
+TTL + LRU cache for Jupiter quotes
+按 (inputMint, outputMint, amount) 缓存报价, 避免重复请求
+'''
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from crypto_arbitrage_detector.configs.config import JUPITER_CONFIG
+
+QuoteKey = Tuple[str, str, int]
+
+
+class QuoteCache:
+    """
+    Bounded quote cache with per-entry TTL and LRU eviction
+
+    Features:
+    - Entries expire after their TTL (default or per-pair override)
+    - Callers can ask for a stricter freshness via max_age
+    - Least recently used entries are evicted when the cache is full
+    - Hit/miss/eviction counters
+    """
+
+    def __init__(self, max_size: Optional[int] = None, default_ttl: Optional[float] = None):
+        """
+        Initialize cache, unset values fall back to JUPITER_CONFIG['QUOTE_CACHE']
+
+        Args:
+            max_size: Maximum number of cached quotes
+            default_ttl: Seconds a quote stays valid unless a pair TTL is set
+        """
+        cache_config = JUPITER_CONFIG['QUOTE_CACHE']
+        self.max_size = max_size or cache_config['max_size']
+        self.default_ttl = default_ttl if default_ttl is not None else cache_config['default_ttl']
+        self.pair_ttls: Dict[Tuple[str, str], float] = {}
+        # key -> (stored_at, ttl, quote), ordered from least to most recently used
+        self._entries: "OrderedDict[QuoteKey, Tuple[float, float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def set_pair_ttl(self, input_mint: str, output_mint: str, ttl: float):
+        """Override the TTL of one trading pair, e.g. longer for slow-moving long-tail pairs"""
+        self.pair_ttls[(input_mint, output_mint)] = ttl
+
+    def get(self, input_mint: str, output_mint: str, amount: int,
+            max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Return cached quote if it is fresh enough, otherwise None
+
+        Args:
+            max_age: Caller freshness tolerance in seconds, the entry TTL still applies
+        """
+        key = (input_mint, output_mint, amount)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, ttl, quote = entry
+        age = time.monotonic() - stored_at
+        if age > ttl:
+            # expired entries are dropped, a fresher quote will replace them
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if max_age is not None and age > max_age:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return quote
+
+    def put(self, input_mint: str, output_mint: str, amount: int, quote: Dict,
+            ttl: Optional[float] = None):
+        """Store quote, evicting the least recently used entries if full"""
+        if ttl is None:
+            ttl = self.pair_ttls.get((input_mint, output_mint), self.default_ttl)
+        key = (input_mint, output_mint, amount)
+        self._entries[key] = (time.monotonic(), ttl, quote)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Snapshot of cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,227 @@
+'''
+Rate-limited scheduler for Jupiter quote requests
+令牌桶限速 + 根据429和延迟自适应调整并发
+'''
+import asyncio
+import time
+from typing import Dict, Optional
+
+from crypto_arbitrage_detector.configs.config import JUPITER_CONFIG
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate
+
+    Tokens refill continuously at `rate` per second up to `capacity`,
+    every request consumes one token.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        # no tokens accumulate while paused
+        refill_from = max(self._last_refill, self._paused_until)
+        if now > refill_from:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - refill_from) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        # waiters queue on the lock so tokens are handed out in order
+        async with self._lock:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def set_rate(self, rate: float):
+        self._refill()
+        self.rate = rate
+
+    def pause(self, seconds: float):
+        """Drop the stored burst and hand out no token for the next `seconds`"""
+        self._refill()
+        self.tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class QuoteScheduler:
+    """
+    Adaptive quote request scheduler
+
+    Features:
+    - Token bucket enforcing JUPITER_CONFIG['RATE_LIMIT']
+    - AIMD concurrency control: halve on 429, shrink on slow responses,
+      grow by one after a window of fast successful responses
+    - Exponential pause of all requests after a 429, so retries do not
+      hit the throttle back-to-back with the stored burst
+    - Cooldown after throttling before the rate is raised again
+    - Achieved requests/sec reporting
+    """
+
+    def __init__(self,
+                 requests_per_second: Optional[float] = None,
+                 burst_limit: Optional[int] = None,
+                 cooldown_period: Optional[float] = None,
+                 initial_concurrency: Optional[int] = None,
+                 min_concurrency: int = 1,
+                 latency_target: float = 1.0,
+                 max_retries: int = 3,
+                 throttle_backoff: float = 0.5):
+        """
+        Initialize scheduler, unset limits fall back to JUPITER_CONFIG['RATE_LIMIT']
+
+        Args:
+            requests_per_second: Upper bound of the request rate
+            burst_limit: Token bucket capacity and maximum concurrency
+            cooldown_period: Seconds after a 429 during which rate and concurrency are not raised
+            initial_concurrency: Starting number of in-flight requests
+            min_concurrency: Lower bound of in-flight requests
+            latency_target: Response time (seconds) above which concurrency is reduced
+            max_retries: Retries of a throttled (429) request
+            throttle_backoff: Seconds no request is sent after a 429, doubled for every
+                further 429 before a success (at most cooldown_period when it is set)
+        """
+        rate_limit = JUPITER_CONFIG['RATE_LIMIT']
+        self.max_rate = requests_per_second or rate_limit['requests_per_second']
+        self.burst_limit = burst_limit or rate_limit['burst_limit']
+        self.cooldown_period = (cooldown_period if cooldown_period is not None
+                                else rate_limit['cooldown_period'])
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, self.burst_limit)
+        self.concurrency = initial_concurrency or max(
+            self.min_concurrency, self.max_concurrency // 5)
+        self.concurrency = min(self.concurrency, self.max_concurrency)
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.throttle_backoff = throttle_backoff
+
+        self.bucket = TokenBucket(self.max_rate, self.burst_limit)
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._success_streak = 0
+        self._throttle_streak = 0
+        self._cooldown_until = 0.0
+
+        self.stats_counter = {
+            'requests': 0,
+            'successes': 0,
+            'throttled': 0,
+            'errors': 0,
+            'total_latency': 0.0
+        }
+        self._started_at = None
+        self._finished_at = None
+
+    async def acquire(self):
+        """Wait for a free concurrency slot and a rate token"""
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._in_flight < self.concurrency)
+            self._in_flight += 1
+        await self.bucket.acquire()
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+
+    async def release(self, status: Optional[int], latency: float):
+        """
+        Release a slot and adapt rate/concurrency to the response
+
+        Args:
+            status: HTTP status of the response, None if the request failed
+            latency: Response time in seconds
+        """
+        self.record_response(status, latency)
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def record_response(self, status: Optional[int], latency: float):
+        """Update counters and apply the AIMD policy"""
+        now = time.monotonic()
+        self._finished_at = now
+        self.stats_counter['requests'] += 1
+        self.stats_counter['total_latency'] += latency
+
+        if status == 429:
+            self.stats_counter['throttled'] += 1
+            self._success_streak = 0
+            # multiplicative decrease of concurrency and rate
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self.bucket.set_rate(max(1.0, self.bucket.rate / 2))
+            # 暂停发送: 清空令牌桶, 指数退避
+            backoff = self.throttle_backoff * 2 ** self._throttle_streak
+            if self.cooldown_period > 0:
+                backoff = min(backoff, self.cooldown_period)
+            self.bucket.pause(backoff)
+            self._throttle_streak += 1
+            self._cooldown_until = now + self.cooldown_period
+            return
+
+        if status != 200:
+            self.stats_counter['errors'] += 1
+            self._success_streak = 0
+            return
+
+        self.stats_counter['successes'] += 1
+        self._throttle_streak = 0
+        if latency > self.latency_target:
+            self._success_streak = 0
+            self.concurrency = max(self.min_concurrency, self.concurrency - 1)
+            return
+
+        self._success_streak += 1
+        if now < self._cooldown_until:
+            return
+        # additive increase after a full window of fast responses
+        if self._success_streak >= self.concurrency:
+            self._success_streak = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            if self.bucket.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate * 1.5))
+
+    def achieved_rps(self) -> float:
+        """Requests completed per second since the first request"""
+        if self._started_at is None or self._finished_at is None:
+            return 0.0
+        elapsed = self._finished_at - self._started_at
+        if elapsed <= 0:
+            return float(self.stats_counter['requests'])
+        return self.stats_counter['requests'] / elapsed
+
+    def stats(self) -> Dict:
+        """Snapshot of scheduler counters and current limits"""
+        requests = self.stats_counter['requests']
+        return {
+            'requests': requests,
+            'successes': self.stats_counter['successes'],
+            'throttled': self.stats_counter['throttled'],
+            'errors': self.stats_counter['errors'],
+            'avg_latency': (self.stats_counter['total_latency'] / requests
+                            if requests else 0.0),
+            'achieved_rps': self.achieved_rps(),
+            'concurrency': self.concurrency,
+            'rate_limit': self.bucket.rate
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"Quote scheduler: {stats['requests']} requests, "
+              f"{stats['throttled']} throttled, {stats['errors']} errors, "
+              f"{stats['achieved_rps']:.1f} req/s "
+              f"(concurrency {stats['concurrency']}, rate limit {stats['rate_limit']:.0f}/s)")
@@ -0,0 +1,101 @@
+'''
+CSR graph in shared memory for worker processes
+图数组放进共享内存, 子进程只读挂载, 不必为每个任务序列化整张图
+'''
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph, EDGE_ATTRIBUTES
+
+# Worker side: the graph attached last, reused while the same handle comes in
+_attached: Dict[str, object] = {'key': None, 'graph': None, 'blocks': []}
+
+
+class SharedCSRGraph:
+    """
+    Owner of shared memory copies of the CSR arrays
+
+    The small picklable `handle` is all a task needs, workers map the
+    blocks with attach_csr_graph. The owner unlinks the blocks on close().
+    """
+
+    def __init__(self, graph: CSRGraph):
+        """Copy node names, indptr, indices and edge attributes into shared memory"""
+        arrays = {
+            'nodes': np.array(graph.nodes, dtype=str) if graph.nodes else np.empty(0, dtype='<U1'),
+            'indptr': graph.indptr,
+            'indices': graph.indices,
+        }
+        for attr in EDGE_ATTRIBUTES:
+            arrays[attr] = getattr(graph, attr)
+
+        self._blocks = []
+        specs: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        try:
+            for name, values in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                self._blocks.append(block)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+                specs[name] = (block.name, values.shape, values.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+        self.handle = {'version': graph.version, 'arrays': specs}
+
+    def close(self):
+        """Release and unlink the shared blocks, attached workers keep their mapping until they drop it"""
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedCSRGraph':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def attach_csr_graph(handle: Dict) -> CSRGraph:
+    """
+    CSRGraph over the shared blocks of handle, read-only, no copy of the arrays
+
+    The graph is cached per process, tasks on the same handle attach once.
+    """
+    key = handle['arrays']['indices'][0]
+    if _attached['key'] == key:
+        return _attached['graph']
+    _release_attached()
+
+    blocks, views = [], {}
+    for name, (block_name, shape, dtype) in handle['arrays'].items():
+        # pool workers share the owner's resource tracker, so attaching does not
+        # take over the cleanup of the block
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        views[name] = view
+
+    graph = CSRGraph(views['nodes'].tolist(), views['indptr'], views['indices'],
+                     {attr: views[attr] for attr in EDGE_ATTRIBUTES},
+                     version=handle['version'])
+    _attached.update(key=key, graph=graph, blocks=blocks)
+    return graph
+
+
+def _release_attached():
+    """Drop the previous graph and close its blocks"""
+    blocks = _attached['blocks']
+    _attached.update(key=None, graph=None, blocks=[])
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass  # arrays still referenced somewhere, the mapping goes with them
+
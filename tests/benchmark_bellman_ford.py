@@ -0,0 +1,65 @@
+'''
+Bellman-Ford benchmark: vectorized relaxation vs the previous per-edge Python loop
+Run: python tests/benchmark_bellman_ford.py
+'''
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.bellman_ford_algorithm import BellmanFordArbitrage
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def legacy_relaxation_pass(graph, distances, predecessors):
+    '''One pass of the previous loop: per-edge dict reads and adjusted weight recomputation'''
+    for u, v, data in graph:
+        base_weight = data.get('weight', 0)
+        slippage_bps = data.get('slippage_bps', 0)
+        price_impact_pct = data.get('price_impact_pct', 0)
+        slippage_decimal = slippage_bps / 10000.0
+        adjusted_weight = base_weight + slippage_decimal + abs(price_impact_pct) / 100.0
+        if distances[u] != float('inf') and distances[u] + adjusted_weight < distances[v]:
+            distances[v] = distances[u] + adjusted_weight
+            predecessors[v] = u
+
+
+def benchmark(n_tokens, out_degree, noise, legacy_passes):
+    csr = make_synthetic_csr_graph(n_tokens, out_degree=out_degree, noise=noise, seed=n_tokens)
+    edge_list = [(int(u), int(v), {'weight': float(w), 'slippage_bps': float(s), 'price_impact_pct': float(p)})
+                 for u, v, w, s, p in zip(csr.sources, csr.indices, csr.weight,
+                                          csr.slippage_bps, csr.price_impact_pct)]
+
+    # previous implementation always runs |V|-1 passes, time a few and extrapolate
+    distances = {node: float('inf') for node in range(n_tokens)}
+    distances[0] = 0
+    predecessors = {node: None for node in range(n_tokens)}
+    passes = min(legacy_passes, n_tokens - 1)
+    start = time.perf_counter()
+    for _ in range(passes):
+        legacy_relaxation_pass(edge_list, distances, predecessors)
+    legacy_time = (time.perf_counter() - start) / passes * (n_tokens - 1)
+
+    detector = BellmanFordArbitrage()
+    start = time.perf_counter()
+    _, _, negative_nodes = detector.run_relaxation(csr, 0)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"{n_tokens:6d} tokens {csr.number_of_edges():9d} edges noise={noise:<5} | "
+          f"legacy {legacy_time:10.3f}s (extrapolated) | vectorized {vectorized_time:8.4f}s "
+          f"({detector.last_relaxation_passes} passes, {len(negative_nodes)} flagged) | "
+          f"speedup {legacy_time / vectorized_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--out-degree", type=int, default=50)
+    parser.add_argument("--legacy-passes", type=int, default=3)
+    args = parser.parse_args()
+
+    for noise in (0.0, 0.01):
+        for size in args.sizes:
+            benchmark(size, args.out_degree, noise, args.legacy_passes)
@@ -0,0 +1,110 @@
+'''
+Memory benchmark: slotted data structures vs the previous plain dataclasses
+Run: python tests/benchmark_memory.py
+'''
+import sys
+import os
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.data_structures import ArbitrageOpportunity, EdgePairs
+
+
+@dataclass
+class LegacyEdgePairs:
+    '''EdgePairs before slots (per-instance __dict__)'''
+    from_token: str
+    to_token: str
+    price_ratio: float
+    weight: float
+    slippage_bps: int
+    platform_fee: float
+    price_impact_pct: float
+    total_fee: float
+
+
+@dataclass
+class LegacyArbitrageOpportunity:
+    '''ArbitrageOpportunity before slots, token path and symbols built eagerly'''
+    path: List[str]
+    path_symbols: List[str]
+    profit_ratio: float
+    total_weight: float
+    total_fee: float
+    hop_count: int
+    confidence_score: float
+    estimated_profit_sol: float
+
+
+def measure(build):
+    '''Bytes allocated by build() and still held by its result'''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def benchmark_edges(edge_count, tokens, rng):
+    sources = rng.integers(0, len(tokens), edge_count).tolist()
+    targets = rng.integers(0, len(tokens), edge_count).tolist()
+    weights = rng.normal(0.0, 1.0, edge_count).tolist()
+
+    def build(cls):
+        return lambda: [cls(tokens[u], tokens[v], 1.0, w, 5, 0.0, 0.01, 0.0001)
+                        for u, v, w in zip(sources, targets, weights)]
+
+    legacy = measure(build(LegacyEdgePairs))
+    slotted = measure(build(EdgePairs))
+    print(f"{edge_count:9d} edges         | legacy {legacy / 2**20:8.1f} MB | slotted {slotted / 2**20:8.1f} MB | "
+          f"{legacy / slotted:4.1f}x smaller")
+
+
+def benchmark_opportunities(count, tokens, rng):
+    hops = rng.integers(2, 5, count).tolist()
+    paths = [rng.choice(len(tokens), hop, replace=False).tolist() for hop in hops]
+    # distinct float objects per opportunity, as the scoring kernel produces
+    scores = rng.uniform(0.0, 0.1, (count, 5)).tolist()
+
+    def build_legacy():
+        opportunities = []
+        for path, (profit, weight, fee, confidence, estimated) in zip(paths, scores):
+            token_path = [tokens[i] for i in path + path[:1]]
+            opportunities.append(LegacyArbitrageOpportunity(
+                token_path, [f"{addr[:4]}...{addr[-4:]}" for addr in token_path],
+                profit, weight, fee, len(path), confidence, estimated))
+        return opportunities
+
+    def build_slotted():
+        return [ArbitrageOpportunity(path_ids=path + path[:1], token_table=tokens,
+                                     profit_ratio=profit, total_weight=weight, total_fee=fee,
+                                     hop_count=len(path), confidence_score=confidence,
+                                     estimated_profit_sol=estimated)
+                for path, (profit, weight, fee, confidence, estimated) in zip(paths, scores)]
+
+    legacy = measure(build_legacy)
+    slotted = measure(build_slotted)
+    print(f"{count:9d} opportunities | legacy {legacy / 2**20:8.1f} MB | slotted {slotted / 2**20:8.1f} MB | "
+          f"{legacy / slotted:4.1f}x smaller")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--opportunities", type=int, default=100_000)
+    parser.add_argument("--tokens", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # 44-character base58-like addresses, shared by all objects like the graph's token list
+    tokens = [f"{i:06d}" + "So11111111111111111111111111111111111112"[:38] for i in range(args.tokens)]
+    benchmark_edges(args.edges, tokens, rng)
+    benchmark_opportunities(args.opportunities, tokens, rng)
@@ -0,0 +1,204 @@
+'''
+Bellman-Ford engine tests
+'''
+import sys
+import os
+
+import networkx as nx
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.bellman_ford_algorithm import BellmanFordArbitrage
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _reference_graph(csr):
+    graph = nx.DiGraph()
+    for u, v, w in zip(csr.sources, csr.indices, csr.adjusted_weights):
+        graph.add_edge(int(u), int(v), weight=float(w))
+    return graph
+
+
+def test_vectorized_distances_match_reference():
+    csr = make_synthetic_csr_graph(60, out_degree=8, noise=0.0, seed=3)
+    detector = BellmanFordArbitrage()
+    distances, predecessors, negative_nodes = detector.run_relaxation(csr, 0)
+
+    expected = nx.single_source_bellman_ford_path_length(_reference_graph(csr), 0)
+    assert len(negative_nodes) == 0
+    for node, distance in expected.items():
+        assert np.isclose(distances[node], distance)
+    # predecessor edges are tight
+    for node in range(1, csr.number_of_nodes()):
+        if predecessors[node] >= 0:
+            e = csr.edge_id(predecessors[node], node)
+            assert np.isclose(distances[predecessors[node]] + csr.adjusted_weights[e], distances[node])
+
+
+def test_relaxation_stops_early_when_converged():
+    csr = make_synthetic_csr_graph(200, out_degree=20, noise=0.0, seed=4)
+    detector = BellmanFordArbitrage()
+    detector.run_relaxation(csr, 0)
+    assert detector.last_relaxation_passes < csr.number_of_nodes() - 1
+
+
+def test_relaxation_flags_negative_cycles():
+    csr = make_synthetic_csr_graph(40, out_degree=10, noise=0.02, seed=5)
+    detector = BellmanFordArbitrage()
+    _, _, negative_nodes = detector.run_relaxation(csr, 0)
+    assert len(negative_nodes) > 0
+    assert nx.negative_edge_cycle(_reference_graph(csr))
+
+
+def test_adjusted_weights_cached_per_graph():
+    csr = make_synthetic_csr_graph(10, seed=6)
+    assert csr.adjusted_weights is csr.adjusted_weights
+
+
+def test_virtual_source_finds_cycles_unreachable_from_source():
+    from crypto_arbitrage_detector.utils.data_structures import EdgePairs
+    from crypto_arbitrage_detector.utils.graph_structure import build_graph_from_edge_lists
+    import math
+
+    def edge(a, b, ratio):
+        return EdgePairs(a, b, ratio, -math.log(ratio), 0, 0.0, 0.0, 0.0)
+
+    # HUB has the highest degree but cannot reach the X <-> Y arbitrage
+    edges = [edge("HUB", f"T{i}", 1.0) for i in range(4)] + \
+            [edge(f"T{i}", "HUB", 0.99) for i in range(4)] + \
+            [edge("X", "Y", 1.1), edge("Y", "X", 1.0), edge("X", "HUB", 0.9)]
+    graph = build_graph_from_edge_lists(edges)
+
+    detector = BellmanFordArbitrage(min_profit_threshold=0.01)
+    assert detector.detect_opportunities(graph) == []
+    found = detector.detect_opportunities(graph, use_virtual_source=True)
+    assert len(found) == 1
+    assert set(found[0].path) == {"X", "Y"}
+
+
+def test_virtual_source_reports_distinct_cycles():
+    csr = make_synthetic_csr_graph(12, noise=0.02, seed=7)
+    detector = BellmanFordArbitrage(min_profit_threshold=0.0, max_hops=4)
+    found = detector.detect_opportunities(csr, use_virtual_source=True)
+    from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+    keys = [canonical_cycle(o.path) for o in found]
+    assert len(found) > 0
+    assert len(keys) == len(set(keys))
+
+
+def test_predecessor_cycles_are_distinct_and_negative():
+    from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+    csr = make_synthetic_csr_graph(300, out_degree=30, noise=0.02, seed=8)
+    detector = BellmanFordArbitrage()
+    _, predecessors, flagged = detector.run_relaxation(csr, None)
+    assert len(flagged) > 100
+
+    cycles = detector._extract_negative_cycles(csr, predecessors, flagged)
+    assert cycles
+    keys = [canonical_cycle(cycle) for cycle in cycles]
+    assert len(keys) == len(set(keys))
+    for cycle in cycles:
+        assert cycle[0] == cycle[-1]
+        assert csr.adjusted_weights[csr.path_edge_ids(cycle)].sum() < 0
+
+
+def _requoted(csr, rng, scale, version):
+    '''Same structure, small weight moves on a few edges'''
+    from crypto_arbitrage_detector.utils.csr_graph import CSRGraph, EDGE_ATTRIBUTES
+    columns = {attr: getattr(csr, attr).copy() for attr in EDGE_ATTRIBUTES}
+    picked = rng.choice(csr.number_of_edges(), 10, replace=False)
+    columns['weight'][picked] += rng.normal(0.0, scale, len(picked))
+    return CSRGraph(csr.nodes, csr.indptr, csr.indices, columns, version=version)
+
+
+def test_warm_start_matches_cold_start():
+    csr = make_synthetic_csr_graph(150, out_degree=15, noise=0.0, seed=9)
+    detector = BellmanFordArbitrage()
+    detector.run_warm_relaxation(csr, 0)
+    cold_passes = detector.last_relaxation_passes
+    assert not detector.last_warm_started
+
+    rng = np.random.default_rng(10)
+    warm_ticks = 0
+    for version in range(1, 8):
+        csr = _requoted(csr, rng, 0.0005, version)
+        distances, predecessors, negative_nodes = detector.run_warm_relaxation(csr, 0)
+        expected, _, expected_negative = BellmanFordArbitrage().run_relaxation(csr, 0)
+        assert len(negative_nodes) == len(expected_negative) == 0
+        assert np.allclose(distances, expected)
+        if detector.last_warm_started:
+            warm_ticks += 1
+            assert detector.last_relaxation_passes < cold_passes
+    assert warm_ticks > 0
+
+
+def test_warm_start_falls_back_on_heavier_tree_edge():
+    csr = make_synthetic_csr_graph(60, out_degree=8, noise=0.0, seed=11)
+    detector = BellmanFordArbitrage()
+    _, predecessors, _ = detector.run_warm_relaxation(csr, 0)
+
+    from crypto_arbitrage_detector.utils.csr_graph import CSRGraph, EDGE_ATTRIBUTES
+    columns = {attr: getattr(csr, attr).copy() for attr in EDGE_ATTRIBUTES}
+    node = int(np.flatnonzero(predecessors >= 0)[0])
+    columns['weight'][csr.edge_id(int(predecessors[node]), node)] += 0.5
+    heavier = CSRGraph(csr.nodes, csr.indptr, csr.indices, columns, version=1)
+
+    distances, _, _ = detector.run_warm_relaxation(heavier, 0)
+    assert not detector.last_warm_started
+    assert np.allclose(distances, BellmanFordArbitrage().run_relaxation(heavier, 0)[0])
+
+    # unchanged graph converges without a pass
+    detector.run_warm_relaxation(heavier, 0)
+    assert detector.last_warm_started and detector.last_relaxation_passes == 0
+
+
+def _random_csr(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(3, 8))
+    pairs = [(i, j) for i in range(n) for j in range(n) if i != j and rng.random() < 0.5]
+    sources = np.array([i for i, _ in pairs], dtype=np.int64)
+    targets = np.array([j for _, j in pairs], dtype=np.int64)
+    m = len(pairs)
+    weight = rng.normal(0.0, 1.0, m)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return CSRGraph([f"T{i}" for i in range(n)], indptr, targets, {
+        'weight': weight, 'price_ratio': np.exp(-weight), 'slippage_bps': np.zeros(m),
+        'platform_fee': np.zeros(m), 'price_impact_pct': np.zeros(m), 'total_fee': np.zeros(m)})
+
+
+def test_every_detected_negative_cycle_is_extracted():
+    detector = BellmanFordArbitrage(max_hops=10)
+    checked = 0
+    for seed in range(600):
+        csr = _random_csr(seed)
+        if csr.number_of_edges() == 0 or not nx.negative_edge_cycle(_reference_graph(csr)):
+            continue
+        checked += 1
+        for source in (None, 0):
+            _, predecessors, negative_nodes = detector.run_relaxation(csr, source)
+            if source is None:
+                assert len(negative_nodes) > 0
+            cycles = detector._extract_negative_cycles(csr, predecessors, negative_nodes)
+            assert bool(cycles) == (len(negative_nodes) > 0), (seed, source)
+            for cycle in cycles:
+                assert csr.adjusted_weights[csr.path_edge_ids(cycle)].sum() < 0
+    assert checked > 100
+
+
+def test_pickle_drops_warm_state():
+    import pickle
+    detector = BellmanFordArbitrage()
+    empty_size = len(pickle.dumps(detector))
+    detector.run_warm_relaxation(make_synthetic_csr_graph(300, out_degree=15, noise=0.0, seed=12), 0)
+    assert detector._warm_state is not None
+
+    # parallel tasks pickle the algorithm, the warm state stays in this process
+    payload = pickle.dumps(detector)
+    assert len(payload) < 2 * empty_size
+    restored = pickle.loads(payload)
+    assert restored._warm_state is None
+    assert restored.warm_start == detector.warm_start
+    assert detector._warm_state is not None
@@ -0,0 +1,77 @@
+'''
+Branch-and-bound top-K cycle search tests
+'''
+import sys
+import os
+import itertools
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.branch_and_bound_algorithm import BranchAndBoundArbitrage
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _brute_force_weights(csr, max_hops, bound):
+    weights = []
+    for length in range(2, max_hops + 1):
+        for path in itertools.permutations(range(csr.number_of_nodes()), length):
+            if path[0] != min(path):
+                continue
+            edge_ids = csr.path_edge_ids(list(path) + [path[0]])
+            if edge_ids is not None:
+                weight = csr.adjusted_weights[edge_ids].sum()
+                if weight < bound:
+                    weights.append(weight)
+    return sorted(weights)
+
+
+def test_top_k_matches_brute_force():
+    csr = make_synthetic_csr_graph(9, out_degree=5, noise=0.02, seed=51)
+    detector = BranchAndBoundArbitrage(min_profit_threshold=0.0, max_hops=4)
+    expected = _brute_force_weights(csr, 4, 0.0)
+
+    for top_k in (1, 5, 20, 10_000):
+        found = detector.find_top_cycles(csr, top_k)
+        assert np.allclose([w for w, _ in found], expected[:top_k])
+        for weight, path in found:
+            assert path[0] == min(path) and path[0] == path[-1]
+            assert np.isclose(csr.adjusted_weights[csr.path_edge_ids(path)].sum(), weight)
+
+
+def test_pruning_scales_with_k():
+    csr = make_synthetic_csr_graph(60, noise=0.01, seed=52)
+    detector = BranchAndBoundArbitrage(min_profit_threshold=0.0, max_hops=4)
+    detector.find_top_cycles(csr, 5)
+    few = detector.last_expanded_paths
+    detector.find_top_cycles(csr, 5000)
+    assert few < detector.last_expanded_paths
+
+
+def test_integrated_top_k():
+    from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+    csr = make_synthetic_csr_graph(30, noise=0.02, seed=53)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.0)
+    found = detector.detect_arbitrage(csr, top_k=5)
+    assert 0 < len(found) <= 5
+
+
+def test_return_bounds_match_walk_enumeration():
+    csr = make_synthetic_csr_graph(7, out_degree=4, noise=0.02, seed=54)
+    detector = BranchAndBoundArbitrage(min_profit_threshold=0.0, max_hops=4)
+    weights = csr.adjusted_weights
+    for start in range(csr.number_of_nodes()):
+        bounds = detector._return_weight_bounds(csr, start)
+        assert len(bounds) == detector.max_hops
+        # lightest walk of at most r hops v -> start through nodes >= start
+        expected = np.full((detector.max_hops, csr.number_of_nodes()), np.inf)
+        expected[:, start] = 0.0
+        walks = [[v] for v in range(start, csr.number_of_nodes())]
+        for hops in range(1, detector.max_hops):
+            walks = [walk + [v] for walk in walks for v in csr.successors(walk[-1]).tolist() if v >= start]
+            for walk in walks:
+                if walk[-1] == start:
+                    weight = weights[csr.path_edge_ids(walk)].sum()
+                    expected[hops:, walk[0]] = np.minimum(expected[hops:, walk[0]], weight)
+        assert np.allclose(np.array(bounds), expected)
@@ -0,0 +1,78 @@
+'''
+CSR graph backend tests
+'''
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.graph_structure import TokenGraphBuilder
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
+from crypto_arbitrage_detector.algorithms.bellman_ford_algorithm import BellmanFordArbitrage
+from crypto_arbitrage_detector.algorithms.triangle_arbitrage_algorithm import TriangleArbitrage
+from crypto_arbitrage_detector.algorithms.two_hop_arbitrage_algorithm import TwoHopArbitrage
+from tests.arbitrage_test_data import arbitrage_test_edges
+
+
+def _build():
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(arbitrage_test_edges)
+    return builder, graph
+
+
+def test_csr_matches_networkx_graph():
+    _, graph = _build()
+    csr = CSRGraph.from_networkx(graph)
+    assert csr.number_of_nodes() == graph.number_of_nodes()
+    assert csr.number_of_edges() == graph.number_of_edges()
+    for u, v, data in graph.edges(data=True):
+        e = csr.edge_id(csr.node_index[u], csr.node_index[v])
+        assert e >= 0
+        assert csr.sources[e] == csr.node_index[u]
+        assert csr.weight[e] == data['weight']
+        assert csr.slippage_bps[e] == data['slippage_bps']
+        assert csr.total_fee[e] == data['total_fee']
+    # rows are sorted by target
+    for i in range(csr.number_of_nodes()):
+        row = csr.successors(i)
+        assert np.all(np.diff(row) > 0)
+    assert csr.edge_id(csr.node_index['BTC'], csr.node_index['USDT']) == -1
+
+
+def test_builder_caches_csr_per_version():
+    builder, _ = _build()
+    csr = builder.to_csr_graph()
+    assert builder.to_csr_graph() is csr
+    edge = arbitrage_test_edges[0]
+    builder.remove_edges([(edge.from_token, edge.to_token)])
+    updated = builder.to_csr_graph()
+    assert updated is not csr
+    assert updated.version == builder.graph_version
+    assert updated.number_of_edges() == csr.number_of_edges() - 1
+
+
+def test_update_edges_patches_cached_weights():
+    _, graph = _build()
+    csr = CSRGraph.from_networkx(graph)
+    adjusted, dense = csr.adjusted_weights, csr.dense_adjusted_weights
+    edge_ids = np.array([0, 3])
+    csr.update_edges(edge_ids, {'weight': np.array([-1.0, 2.0]), 'slippage_bps': np.array([50.0, 0.0])})
+
+    fresh = CSRGraph(csr.nodes, csr.indptr, csr.indices,
+                     {attr: getattr(csr, attr) for attr in ('weight', 'price_ratio', 'slippage_bps',
+                                                            'platform_fee', 'price_impact_pct', 'total_fee')})
+    assert csr.adjusted_weights is adjusted and csr.dense_adjusted_weights is dense
+    assert np.array_equal(adjusted, fresh.adjusted_weights)
+    assert np.array_equal(dense, fresh.dense_adjusted_weights)
+
+
+def test_detectors_accept_csr_graph():
+    builder, graph = _build()
+    csr = builder.to_csr_graph()
+    for detector in (BellmanFordArbitrage(0.005), TriangleArbitrage(0.005), TwoHopArbitrage(0.005)):
+        from_nx = detector.detect_opportunities(graph)
+        from_csr = detector.detect_opportunities(csr)
+        assert sorted(o.path for o in from_nx) == sorted(o.path for o in from_csr)
+        assert all(isinstance(token, str) for o in from_csr for token in o.path)
@@ -0,0 +1,132 @@
+'''
+Slotted data structure tests
+'''
+import sys
+import os
+import pickle
+from dataclasses import FrozenInstanceError, asdict, is_dataclass, replace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.data_structures import (
+    ArbitrageOpportunity, EdgePairs, FrozenEdgePairs, TokenInfo)
+from crypto_arbitrage_detector.utils.opportunity_scoring import create_opportunities
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def test_no_instance_dict():
+    edge = EdgePairs("A", "B", 1.0, 0.0, 0, 0.0, 0.0, 0.0)
+    token = TokenInfo("A", "A", "Token A", 9, "", None)
+    opportunity = ArbitrageOpportunity(["A", "B", "A"], ["A", "B", "A"], 0.01, -0.01, 0.0, 0, 0.5, 0.01)
+    for value in (edge, token, opportunity):
+        assert not hasattr(value, '__dict__')
+    assert token.tags == []
+
+
+def test_edge_pairs_mutable_with_frozen_variant():
+    edge = EdgePairs("A", "B", 1.0, 0.0, 0, 0.0, 0.0, 0.0)
+    edge.weight = 0.25
+    assert edge.weight == 0.25
+
+    frozen = edge.freeze()
+    assert asdict(frozen) == asdict(edge)
+    assert not hasattr(frozen, '__dict__')
+    with pytest.raises(FrozenInstanceError):
+        frozen.weight = 1.0
+    assert replace(frozen, weight=0.5).weight == 0.5
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+    assert hash(frozen) == hash(edge.freeze())
+
+
+def test_opportunity_is_a_dataclass():
+    graph = make_synthetic_csr_graph(8, noise=0.03, seed=152)
+    opportunity = create_opportunities(graph, [[i, j, i] for i in range(8) for j in range(i + 1, 8)], 0.0)[0]
+    assert is_dataclass(opportunity)
+
+    updated = replace(opportunity, profit_ratio=0.5)
+    assert updated.profit_ratio == 0.5 and updated.path == opportunity.path
+    assert updated.token_table is graph.nodes
+
+    values = asdict(opportunity)
+    assert values['path_ids'] == opportunity.path_ids
+    assert values['hop_count'] == 2 and values['explicit_symbols'] is None
+
+    labelled = ArbitrageOpportunity(["SOL", "USDC", "SOL"], ["S", "U", "S"], 0.02, -0.02, 0.0, 0, 0.5, 0.02)
+    assert replace(labelled, search_completeness=0.5).path_symbols == ["S", "U", "S"]
+
+
+def test_opportunity_keeps_token_path_signature():
+    opportunity = ArbitrageOpportunity(["SOL", "USDC", "SOL"], ["S", "U", "S"], 0.02, -0.02, 0.0, 0, 0.5, 0.02)
+    assert opportunity.path == ["SOL", "USDC", "SOL"]
+    assert opportunity.path_symbols == ["S", "U", "S"]
+    assert opportunity.hop_count == 2
+    assert opportunity.path_ids == (0, 1, 0)
+
+    opportunity.search_completeness = 0.5
+    copy = pickle.loads(pickle.dumps(opportunity))
+    assert copy == opportunity and copy.search_completeness == 0.5
+
+
+def test_scored_opportunities_share_the_token_table():
+    graph = make_synthetic_csr_graph(8, noise=0.03, seed=151)
+    opportunities = create_opportunities(graph, [[i, j, i] for i in range(8) for j in range(i + 1, 8)], 0.0)
+    assert opportunities
+    for opportunity in opportunities:
+        assert opportunity.token_table is graph.nodes
+        assert opportunity.path == graph.to_tokens(opportunity.path_ids)
+        assert opportunity.path_symbols == [f"{t[:4]}...{t[-4:]}" for t in opportunity.path]
+
+    # one copy of the table travels with a pickled batch
+    restored = pickle.loads(pickle.dumps(opportunities))
+    assert restored == opportunities
+    assert all(opp.token_table is restored[0].token_table for opp in restored)
+
+
+def test_pickle_round_trip_and_legacy_state():
+    token = TokenInfo("A", "A", "Token A", 9, "", ["verified"], volume_24h=5.0)
+    edge = EdgePairs("A", "B", 1.0, 0.0, 0, 0.0, 0.0, 0.0)
+    opportunity = ArbitrageOpportunity(path_ids=[0, 1, 0], token_table=["A", "B"], profit_ratio=0.02)
+    for value in (token, edge, opportunity):
+        assert pickle.loads(pickle.dumps(value)) == value
+
+    # pickles written before slots carry the instance __dict__ as state
+    legacy_token = TokenInfo.__new__(TokenInfo)
+    legacy_token.__setstate__(dict(address="A", symbol="A", name="Token A", decimals=9, logoURI="",
+                                   tags=["verified"], volume_24h=5.0, liquidity=0.0, price_usd=0.0,
+                                   market_cap=0.0, price_change_24h=0.0))
+    assert legacy_token == token
+
+    legacy_edge = EdgePairs.__new__(EdgePairs)
+    legacy_edge.__setstate__(dict(from_token="A", to_token="B", price_ratio=1.0, weight=0.0, slippage_bps=0,
+                                  platform_fee=0.0, price_impact_pct=0.0, total_fee=0.0))
+    assert legacy_edge == edge
+
+    legacy_opportunity = ArbitrageOpportunity.__new__(ArbitrageOpportunity)
+    legacy_opportunity.__setstate__(dict(path=["A", "B", "A"], path_symbols=opportunity.path_symbols, profit_ratio=0.02,
+                                         total_weight=0.0, total_fee=0.0, hop_count=2, confidence_score=0.0,
+                                         estimated_profit_sol=0.0))
+    assert legacy_opportunity == opportunity
+    assert legacy_opportunity.search_completeness == 1.0
+
+
+def test_loads_enriched_tokens_pickle():
+    # written by VolumeFetcher before TokenInfo had slots
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'enriched_tokens.pkl')
+    with open(path, 'rb') as f:
+        tokens = pickle.load(f)
+    assert tokens and all(isinstance(token, TokenInfo) for token in tokens)
+    assert tokens[0].symbol == 'SOL'
+    assert all(token.volume_rank > 0 and token.creation_date for token in tokens)
+
+    # VolumeFetcher enriches existing objects in place
+    token = TokenInfo("A", "A", "Token A", 9, "", None)
+    token.volume_rank, token.creation_date = 3, '2024-08-14 22:21:34'
+    assert pickle.loads(pickle.dumps(token)) == token
+
+    # attributes that are no field are skipped, missing fields keep their defaults
+    legacy = TokenInfo.__new__(TokenInfo)
+    legacy.__setstate__(dict(address="A", symbol="A", name="Token A", decimals=9, logoURI="", tags=[],
+                             volume_24h=5.0, removed_attribute=1))
+    assert legacy == TokenInfo("A", "A", "Token A", 9, "", [], volume_24h=5.0)
@@ -0,0 +1,48 @@
+'''
+Deadline-bounded anytime detection tests
+'''
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def test_generous_deadline_runs_every_stage():
+    graph = make_synthetic_csr_graph(25, noise=0.02, seed=101)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001)
+
+    opportunities = detector.detect_arbitrage(graph, deadline_ms=60_000)
+    assert opportunities
+    assert all(opp.search_completeness == 1.0 for opp in opportunities)
+    assert {'Hot cycles', 'Two-hop arbitrage', 'Triangle arbitrage',
+            'Bellman-Ford', 'Hop-bounded search'} <= set(detector.last_timings)
+
+    # every full-run cycle is also found by the anytime search
+    reference = detector.detect_arbitrage(graph, enable_bellman_ford=False, enable_hop_bounded=True)
+    anytime_paths = {tuple(opp.path) for opp in opportunities}
+    assert {tuple(opp.path) for opp in reference} <= anytime_paths
+
+
+def test_tight_deadline_falls_back_to_hot_cycles():
+    graph = make_synthetic_csr_graph(25, noise=0.02, seed=102)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001)
+    full = detector.detect_arbitrage(graph)
+    cached = detector.hot_cycle_cache.max_size
+    assert len(full) > cached and len(detector.hot_cycle_cache) == cached
+
+    opportunities = detector.detect_arbitrage(graph, deadline_ms=0.0)
+    assert set(detector.last_timings) == {'total'}
+    assert opportunities == []
+
+    # an unaffordable cost model leaves only the cached cycles
+    for name in detector.strategy_selector.seconds_per_unit:
+        detector.strategy_selector.seconds_per_unit[name] = 1e3
+    opportunities = detector.detect_arbitrage(graph, deadline_ms=1_000)
+    assert 'Hot cycles' in detector.last_timings
+    assert 'Two-hop arbitrage' not in detector.last_timings
+    # the cache kept the most profitable cycles
+    assert [opp.path for opp in opportunities] == [opp.path for opp in full[:cached]]
+    assert all(opp.search_completeness == 0.2 for opp in opportunities)
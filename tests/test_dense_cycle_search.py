@@ -0,0 +1,99 @@
+'''
+Dense matrix two-hop and triangle search tests
+'''
+import sys
+import os
+import itertools
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.dense_cycle_search import (
+    find_two_hop_cycles, find_triangle_cycles, find_triangle_cycles_csr, profit_weight_bound)
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _brute_force(csr, length, bound):
+    found = set()
+    for path in itertools.permutations(range(csr.number_of_nodes()), length):
+        if path[0] != min(path):
+            continue  # one canonical rotation per directed cycle
+        edge_ids = csr.path_edge_ids(list(path) + [path[0]])
+        if edge_ids is not None and csr.adjusted_weights[edge_ids].sum() < bound:
+            found.add(path)
+    return found
+
+
+def test_matrix_search_matches_brute_force():
+    csr = make_synthetic_csr_graph(14, out_degree=7, noise=0.02, seed=11)
+    bound = profit_weight_bound(0.0)
+    weights = csr.dense_adjusted_weights
+
+    two_hop = {tuple(row) for row in find_two_hop_cycles(weights, bound).tolist()}
+    triangles = {tuple(row) for row in find_triangle_cycles(weights, bound).tolist()}
+    assert triangles
+    assert two_hop == _brute_force(csr, 2, bound)
+    assert triangles == _brute_force(csr, 3, bound)
+
+
+def test_triangle_chunks_cover_every_row(monkeypatch):
+    from crypto_arbitrage_detector.algorithms import dense_cycle_search
+    csr = make_synthetic_csr_graph(30, noise=0.02, seed=12)
+    bound = profit_weight_bound(0.0)
+    expected = find_triangle_cycles(csr.dense_adjusted_weights, bound)
+
+    monkeypatch.setattr(dense_cycle_search, 'TRIANGLE_CHUNK_CELLS', 30 * 30 * 4)
+    chunked = find_triangle_cycles(csr.dense_adjusted_weights, bound)
+    assert np.array_equal(expected, chunked)
+
+
+def test_profit_weight_bound():
+    assert profit_weight_bound(0.01) < -np.log(1.01) + 1e-9
+    assert profit_weight_bound(-0.5) == 0.0
+
+
+def test_triangle_directions_are_separate_opportunities():
+    from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+    from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+    csr = make_synthetic_csr_graph(12, noise=0.03, seed=13)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.0)
+    found = detector.detect_arbitrage(csr, enable_bellman_ford=False, enable_two_hop=False)
+
+    keys = {canonical_cycle(opp.path) for opp in found}
+    assert len(keys) == len(found)
+    reversed_keys = {canonical_cycle(list(reversed(opp.path))) for opp in found}
+    assert keys & reversed_keys  # some triangles are profitable in both directions
+
+
+def test_csr_triangles_match_matrix_search(monkeypatch):
+    from crypto_arbitrage_detector.algorithms import dense_cycle_search
+    bound = profit_weight_bound(0.0)
+    for out_degree in (3, 8, None):
+        csr = make_synthetic_csr_graph(40, out_degree=out_degree, noise=0.02, seed=13)
+        expected = find_triangle_cycles(csr.dense_adjusted_weights, bound)
+        assert np.array_equal(find_triangle_cycles_csr(csr, bound), expected)
+
+        # chunks of a few first edges, every 2-hop path is still covered once
+        monkeypatch.setattr(dense_cycle_search, 'TRIANGLE_CHUNK_CELLS', 50)
+        assert np.array_equal(find_triangle_cycles_csr(csr, bound), expected)
+        monkeypatch.undo()
+
+
+def test_triangle_detector_uses_csr_engine_on_sparse_graphs(monkeypatch):
+    from crypto_arbitrage_detector.algorithms import triangle_arbitrage_algorithm
+    from crypto_arbitrage_detector.algorithms.triangle_arbitrage_algorithm import TriangleArbitrage
+    sparse = make_synthetic_csr_graph(200, out_degree=6, noise=0.02, seed=14)
+    dense = make_synthetic_csr_graph(20, noise=0.02, seed=15)
+
+    def no_matrix(*args):
+        raise AssertionError("dense engine used on a sparse graph")
+
+    monkeypatch.setattr(triangle_arbitrage_algorithm, 'find_triangle_cycles', no_matrix)
+    found = TriangleArbitrage(min_profit_threshold=0.0).detect_opportunities(sparse)
+    assert found and all(opp.hop_count == 3 for opp in found)
+    assert sparse._dense_adjusted_weights is None
+
+    monkeypatch.undo()
+    assert TriangleArbitrage(min_profit_threshold=0.0).detect_opportunities(dense)
+    assert dense._dense_adjusted_weights is not None
@@ -0,0 +1,107 @@
+'''
+Streaming edge pipeline tests
+'''
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils import get_quote_pair
+from crypto_arbitrage_detector.utils.get_quote_pair import stream_edge_pairs
+from crypto_arbitrage_detector.utils.quote_scheduler import QuoteScheduler
+from crypto_arbitrage_detector.utils.graph_structure import TokenGraphBuilder
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from tests.mock_data import test_tokens
+from tests.arbitrage_test_data import arbitrage_test_edges
+from tests.test_quote_scheduler import FakeSession
+
+
+class FakeClientSession(FakeSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+async def _as_stream(edges):
+    for edge in edges:
+        await asyncio.sleep(0)
+        yield edge
+
+
+def test_stream_edge_pairs_yields_every_pair(monkeypatch):
+    sessions = []
+
+    def make_session(*args, **kwargs):
+        session = FakeClientSession(delay=0.001)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(get_quote_pair.aiohttp, "ClientSession", make_session)
+
+    async def run():
+        scheduler = QuoteScheduler(requests_per_second=10000, burst_limit=50, cooldown_period=0)
+        return [edge async for edge in stream_edge_pairs(test_tokens, scheduler=scheduler,
+                                                          max_in_flight=4)]
+
+    edges = asyncio.run(run())
+    n = len(test_tokens)
+    assert len(edges) == n * (n - 1)
+    assert sessions[0].max_in_flight <= max(4, 2 * (n - 1))
+    # SOL legs are yielded first
+    sol = test_tokens[0].address
+    assert all(sol in (e.from_token, e.to_token) for e in edges[:2 * (n - 1)])
+
+
+def test_stream_requests_pairs_on_demand(monkeypatch):
+    sessions = []
+
+    def make_session(*args, **kwargs):
+        session = FakeClientSession(delay=0.001)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(get_quote_pair.aiohttp, "ClientSession", make_session)
+    n = len(test_tokens)
+
+    async def run():
+        scheduler = QuoteScheduler(requests_per_second=10000, burst_limit=50, cooldown_period=0)
+        stream = stream_edge_pairs(test_tokens, scheduler=scheduler, max_in_flight=2)
+        edges = []
+        async for edge in stream:
+            edges.append(edge)
+            if len(edges) == 2 * (n - 1) + 1:
+                break
+        await stream.aclose()
+        return edges
+
+    asyncio.run(run())
+    # SOL legs, then only the window of pairs taken from the generator
+    assert sessions[0].calls <= 2 * (n - 1) + 3
+
+
+def test_builder_consumes_stream_in_batches():
+    async def run():
+        builder = TokenGraphBuilder()
+        sizes = []
+        async for graph in builder.build_graph_from_edge_stream(_as_stream(arbitrage_test_edges), batch_size=3):
+            sizes.append(graph.number_of_edges())
+        return builder, sizes
+
+    builder, sizes = asyncio.run(run())
+    assert sizes == [3, 6, 9]
+    assert builder.graph.number_of_edges() == len(arbitrage_test_edges)
+    assert builder.build_history[-1]['edges_count'] == len(arbitrage_test_edges)
+
+
+def test_detection_runs_on_partial_graphs():
+    async def run():
+        detector = IntegratedArbitrageDetector(min_profit_threshold=0.005)
+        return [opps async for opps in detector.detect_arbitrage_stream(
+            _as_stream(arbitrage_test_edges), batch_size=5)]
+
+    results = asyncio.run(run())
+    assert len(results) == 2
+    assert len(results[-1]) > 0
@@ -0,0 +1,60 @@
+'''
+TokenGraphBuilder incremental update tests
+'''
+import sys
+import os
+from dataclasses import replace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.graph_structure import TokenGraphBuilder
+from tests.mock_data import static_test_edges
+
+
+def test_upsert_updates_graph_in_place():
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(static_test_edges)
+    version = builder.graph_version
+
+    updated = replace(static_test_edges[0], weight=0.5)
+    new_edge = replace(static_test_edges[0], from_token="SOL", to_token="JUP")
+    changed = builder.upsert_edges([updated, static_test_edges[1], new_edge])
+
+    assert changed == [("SOL", "USDC"), ("SOL", "JUP")]
+    assert builder.graph is graph
+    assert graph["SOL"]["USDC"]["weight"] == 0.5
+    assert graph.has_edge("SOL", "JUP")
+    assert builder.graph_version == version + 1
+    assert builder.last_changed_edges == changed
+    # in-place updates do not add build history entries
+    assert len(builder.build_history) == 1
+
+
+def test_upsert_without_changes_keeps_version():
+    builder = TokenGraphBuilder()
+    builder.build_graph_from_edge_lists(static_test_edges)
+    version = builder.graph_version
+    assert builder.upsert_edges(static_test_edges[:2]) == []
+    assert builder.graph_version == version
+
+
+def test_upsert_validates_only_delta_and_is_atomic():
+    builder = TokenGraphBuilder()
+    builder.build_graph_from_edge_lists(static_test_edges)
+    bad = replace(static_test_edges[1], slippage_bps=-1)
+    with pytest.raises(ValueError):
+        builder.upsert_edges([replace(static_test_edges[0], weight=0.1), bad])
+    assert builder.graph["SOL"]["USDC"]["weight"] == static_test_edges[0].weight
+
+
+def test_remove_edges():
+    builder = TokenGraphBuilder()
+    builder.build_graph_from_edge_lists(static_test_edges)
+    version = builder.graph_version
+    removed = builder.remove_edges([("SOL", "USDC"), ("SOL", "MISSING")])
+    assert removed == [("SOL", "USDC")]
+    assert not builder.graph.has_edge("SOL", "USDC")
+    assert builder.graph.has_node("SOL")
+    assert builder.graph_version == version + 1
@@ -0,0 +1,68 @@
+'''
+Hop-bounded min-plus cycle search tests
+'''
+import sys
+import os
+import itertools
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.dense_cycle_search import min_plus_product, profit_weight_bound
+from crypto_arbitrage_detector.algorithms.hop_bounded_arbitrage_algorithm import HopBoundedArbitrage
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def test_min_plus_product_matches_loops(monkeypatch):
+    from crypto_arbitrage_detector.algorithms import dense_cycle_search
+    monkeypatch.setattr(dense_cycle_search, 'MIN_PLUS_CHUNK_CELLS', 50)
+    rng = np.random.default_rng(0)
+    left, right = rng.normal(size=(7, 5)), rng.normal(size=(5, 6))
+    product, argmin = min_plus_product(left, right)
+    for i in range(7):
+        for j in range(6):
+            sums = left[i] + right[:, j]
+            assert np.isclose(product[i, j], sums.min())
+            assert argmin[i, j] == np.argmin(sums)
+
+
+def test_cycles_are_simple_negative_and_bounded():
+    csr = make_synthetic_csr_graph(15, out_degree=8, noise=0.02, seed=21)
+    detector = HopBoundedArbitrage(min_profit_threshold=0.0, max_hops=5)
+    cycles_by_length = detector.find_cycles_by_length(csr)
+
+    assert sorted(cycles_by_length) == [2, 3, 4, 5]
+    for hop_count, cycles in cycles_by_length.items():
+        assert len(cycles) <= detector.cycles_per_length
+        weights = [csr.adjusted_weights[csr.path_edge_ids(c)].sum() for c in cycles]
+        assert weights == sorted(weights)
+        for cycle in cycles:
+            assert len(cycle) == hop_count + 1
+            assert len(set(cycle[:-1])) == hop_count
+            assert cycle[0] == min(cycle)
+    assert all(cycles_by_length[k] for k in (3, 4, 5))
+
+
+def test_lightest_cycles_match_brute_force():
+    # the lightest closed 4- and 5-walks often loop around a shorter cycle
+    for seed in range(22, 28):
+        csr = make_synthetic_csr_graph(9, noise=0.02, seed=seed)
+        detector = HopBoundedArbitrage(min_profit_threshold=0.0, max_hops=5, cycles_per_length=10)
+        cycles_by_length = detector.find_cycles_by_length(csr)
+        weight_bound = profit_weight_bound(0.0)
+
+        for hop_count in (2, 3, 4, 5):
+            expected = sorted(
+                w for w in (csr.adjusted_weights[csr.path_edge_ids(list(p) + [p[0]])].sum()
+                            for p in itertools.permutations(range(9), hop_count) if p[0] == min(p))
+                if w < weight_bound)[:10]
+            found = [csr.adjusted_weights[csr.path_edge_ids(c)].sum() for c in cycles_by_length[hop_count]]
+            assert np.allclose(found, expected), (seed, hop_count)
+
+
+def test_max_hops_limits_reported_opportunities():
+    csr = make_synthetic_csr_graph(15, out_degree=8, noise=0.02, seed=21)
+    found = HopBoundedArbitrage(min_profit_threshold=0.0, max_hops=3).detect_opportunities(csr)
+    assert found
+    assert max(opp.hop_count for opp in found) <= 3
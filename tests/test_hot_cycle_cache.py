@@ -0,0 +1,116 @@
+'''
+Hot cycle cache tests
+'''
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph, EDGE_ATTRIBUTES
+from crypto_arbitrage_detector.utils.hot_cycle_cache import HotCycleCache
+from crypto_arbitrage_detector.utils.opportunity_scoring import create_opportunities
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _shifted(graph, shift):
+    '''Same graph with every edge weight moved by shift'''
+    columns = {attr: getattr(graph, attr).copy() for attr in EDGE_ATTRIBUTES}
+    columns['weight'] += shift
+    return CSRGraph(graph.nodes, graph.indptr, graph.indices, columns, version=graph.version + 1)
+
+
+def _triangles(graph):
+    n = graph.number_of_nodes()
+    return [[i, j, k, i] for i in range(n) for j in range(i + 1, n) for k in range(i + 1, n) if j != k]
+
+
+def test_rescore_returns_profitable_cached_cycles():
+    graph = make_synthetic_csr_graph(10, noise=0.02, seed=121)
+    found = create_opportunities(graph, _triangles(graph), 0.001)
+    cache = HotCycleCache()
+    cache.update(found)
+    assert len(cache) == len(found)
+
+    rescored = cache.rescore(graph, 0.001)
+    assert sorted(opp.path for opp in rescored) == sorted(opp.path for opp in found)
+    assert cache.hits == len(found)
+
+
+def test_near_threshold_cycles_stay_hot_and_cold_ones_decay():
+    graph = make_synthetic_csr_graph(10, noise=0.02, seed=122)
+    found = create_opportunities(graph, _triangles(graph), 0.001)
+    cache = HotCycleCache(near_threshold_bps=1e6, decay=0.5, min_heat=0.2)
+    cache.update(found)
+
+    # everything much worse: no longer profitable, still within the (huge) near band
+    worse = _shifted(graph, 0.05)
+    assert cache.rescore(worse, 0.001) == []
+    assert len(cache) == len(found)
+
+    strict = HotCycleCache(near_threshold_bps=0.0, decay=0.5, min_heat=0.2)
+    strict.update(found)
+    strict.rescore(worse, 0.001)
+    strict.rescore(worse, 0.001)
+    assert len(strict) == len(found)     # heat 0.25
+    strict.rescore(worse, 0.001)
+    assert len(strict) == 0              # heat 0.125 < min_heat
+    assert strict.evictions == len(found)
+
+
+def test_max_size_keeps_most_profitable():
+    graph = make_synthetic_csr_graph(10, noise=0.02, seed=123)
+    found = create_opportunities(graph, _triangles(graph), 0.001)
+    found.sort(key=lambda opp: opp.profit_ratio, reverse=True)
+    cache = HotCycleCache(max_size=3)
+    cache.update(found)
+    assert len(cache) == 3
+    assert all(opp.path in cache for opp in found[:3])
+
+
+def test_detector_rescores_hot_cycles_first():
+    graph = make_synthetic_csr_graph(20, noise=0.02, seed=124)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001,
+                                           hot_cycle_cache=HotCycleCache(max_size=10_000))
+    first = detector.detect_arbitrage(graph, enable_bellman_ford=False, enable_hop_bounded=True)
+    assert len(detector.hot_cycle_cache) == len(first)
+
+    # two-hop only, the deeper cycles of the first run still come from the cache
+    second = detector.detect_arbitrage(graph, enable_bellman_ford=False, enable_triangle=False,
+                                       use_hot_cycles=True)
+    assert 'Hot cycles' in detector.last_timings
+    assert [opp.path for opp in second] == [opp.path for opp in first]
+
+
+def test_hot_cycles_are_opt_in():
+    graph = make_synthetic_csr_graph(20, noise=0.02, seed=126)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001)
+    first = detector.detect_arbitrage(graph, enable_bellman_ford=False)
+    assert max(opp.hop_count for opp in first) == 3 and len(detector.hot_cycle_cache) > 0
+
+    # the switches decide what is reported, cached triangles stay out
+    two_hop = detector.detect_arbitrage(graph, enable_bellman_ford=False, enable_triangle=False)
+    assert two_hop and all(opp.hop_count == 2 for opp in two_hop)
+    assert 'Hot cycles' not in detector.last_timings
+
+
+def test_hot_cycles_respect_max_hops_and_switches():
+    graph = make_synthetic_csr_graph(12, noise=0.02, seed=125)
+    cache = HotCycleCache(max_size=10_000)
+    deep = IntegratedArbitrageDetector(min_profit_threshold=0.001, max_hops=5, hot_cycle_cache=cache)
+    found = deep.detect_arbitrage(graph, enable_bellman_ford=False, enable_hop_bounded=True)
+    assert max(opp.hop_count for opp in found) > 3
+
+    assert all(len(path) - 1 <= 3 for path in
+               [opp.path for opp in cache.rescore(graph, 0.001, max_hops=3)])
+
+    shallow = IntegratedArbitrageDetector(min_profit_threshold=0.001, max_hops=3, hot_cycle_cache=cache)
+    opportunities = shallow.detect_arbitrage(graph, enable_bellman_ford=False, enable_triangle=False,
+                                             use_hot_cycles=True)
+    assert opportunities
+    assert max(opp.hop_count for opp in opportunities) <= 3
+
+    # no search enabled, no cached cycles either
+    assert shallow.detect_arbitrage(graph, enable_bellman_ford=False, enable_triangle=False,
+                                    enable_two_hop=False, use_hot_cycles=True) == []
+    assert 'Hot cycles' not in shallow.last_timings
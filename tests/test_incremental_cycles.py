@@ -0,0 +1,127 @@
+'''
+Incremental cycle maintenance tests
+'''
+import sys
+import os
+from dataclasses import replace
+from itertools import permutations
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.incremental_cycle_detector import (
+    IncrementalCycleDetector, adjusted_edge_weight)
+from crypto_arbitrage_detector.algorithms.dense_cycle_search import profit_weight_bound
+from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+from crypto_arbitrage_detector.utils.graph_structure import TokenGraphBuilder
+from tests.synthetic_graph import make_synthetic_csr_graph, to_edge_pairs
+
+
+def _brute_force_cycles(graph, max_hops, threshold):
+    '''Canonical cycles of 2..max_hops hops under the profit weight bound'''
+    found = set()
+    for length in range(2, max_hops + 1):
+        for nodes in permutations(graph.nodes(), length):
+            closed = nodes + (nodes[0],)
+            if not all(graph.has_edge(a, b) for a, b in zip(closed[:-1], closed[1:])):
+                continue
+            weight = sum(adjusted_edge_weight(graph[a][b]) for a, b in zip(closed[:-1], closed[1:]))
+            if weight < profit_weight_bound(threshold):
+                found.add(canonical_cycle(nodes))
+    return found
+
+
+def test_reset_matches_brute_force():
+    edges = to_edge_pairs(make_synthetic_csr_graph(8, noise=0.02, seed=111))
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(edges)
+
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    opportunities = detector.detect_opportunities(graph)
+    assert set(detector.cycles) == _brute_force_cycles(graph, 4, 0.001)
+    assert opportunities
+    assert all(opp.profit_ratio >= 0.001 for opp in opportunities)
+    for cycle in detector.cycles:
+        closed = cycle + (cycle[0],)
+        for edge in zip(closed[:-1], closed[1:]):
+            assert cycle in detector.edge_index[edge]
+
+
+def test_return_bounds_prune_complete_graphs():
+    # log price-ratio weights are far from 0, a min edge weight bound prunes nothing here
+    edges = to_edge_pairs(make_synthetic_csr_graph(30, noise=0.01, seed=115))
+    graph = TokenGraphBuilder().build_graph_from_edge_lists(edges)
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    detector.reset(graph)
+    assert detector.cycles
+    assert detector.last_expanded_paths < 2 * len(detector.cycles) + graph.number_of_edges()
+
+
+def test_update_matches_full_rebuild():
+    edges = to_edge_pairs(make_synthetic_csr_graph(8, noise=0.02, seed=112))
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(edges)
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    detector.reset(graph)
+
+    rng = np.random.default_rng(113)
+    for tick in range(5):
+        picked = rng.choice(len(edges), 6, replace=False)
+        delta = [replace(edges[i], weight=edges[i].weight + float(rng.normal(0.0, 0.02)))
+                 for i in picked.tolist()]
+        changed = builder.upsert_edges(delta)
+        removed = builder.remove_edges([(edges[tick].from_token, edges[tick].to_token)])
+        opportunities = detector.update(changed, removed)
+
+        rebuilt = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+        expected = rebuilt.detect_opportunities(graph)
+        assert set(detector.cycles) == set(rebuilt.cycles) == _brute_force_cycles(graph, 4, 0.001)
+        assert [opp.path for opp in opportunities] == [opp.path for opp in expected]
+        assert all(edge in graph.edges for edge in detector.edge_index)
+
+
+def test_update_work_scales_with_delta():
+    edges = to_edge_pairs(make_synthetic_csr_graph(40, out_degree=6, noise=0.01, seed=114))
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(edges)
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    detector.reset(graph)
+    full_work = detector.last_expanded_paths
+
+    changed = builder.upsert_edges([replace(edges[0], weight=edges[0].weight - 0.01)])
+    detector.update(changed)
+    assert 0 < detector.last_expanded_paths < full_work / 20
+
+
+def test_return_bounds_match_walk_enumeration():
+    edges = to_edge_pairs(make_synthetic_csr_graph(7, out_degree=3, noise=0.02, seed=116))
+    graph = TokenGraphBuilder().build_graph_from_edge_lists(edges)
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    detector.reset(graph)
+    csr = detector._csr
+    for start in range(csr.number_of_nodes()):
+        for smallest_start in (False, True):
+            bounds = detector._return_weight_bounds(start, smallest_start)
+            lowest = start if smallest_start else 0
+            expected = np.full((detector.max_hops, csr.number_of_nodes()), np.inf)
+            expected[:, start] = 0.0
+            walks = [[x] for x in range(lowest, csr.number_of_nodes())]
+            for hops in range(1, detector.max_hops):
+                walks = [walk + [x] for walk in walks for x in csr.successors(walk[-1]).tolist() if x >= lowest]
+                for walk in walks:
+                    if walk[-1] == start:
+                        weight = csr.adjusted_weights[csr.path_edge_ids(walk)].sum()
+                        expected[hops:, walk[0]] = np.minimum(expected[hops:, walk[0]], weight)
+            assert np.allclose(np.array(bounds), expected)
+
+
+def test_search_stays_on_csr_rows():
+    edges = to_edge_pairs(make_synthetic_csr_graph(40, out_degree=6, noise=0.01, seed=117))
+    builder = TokenGraphBuilder()
+    graph = builder.build_graph_from_edge_lists(edges)
+    detector = IncrementalCycleDetector(min_profit_threshold=0.001, max_hops=4)
+    detector.reset(graph)
+    detector.update(builder.upsert_edges([replace(edges[0], weight=edges[0].weight - 0.01)]))
+    # no N x N matrix for sparse graphs
+    assert detector._csr._dense_adjusted_weights is None
@@ -0,0 +1,67 @@
+'''
+Howard minimum mean cycle tests
+'''
+import sys
+import os
+
+import networkx as nx
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.minimum_mean_cycle_algorithm import MinimumMeanCycleArbitrage
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _brute_force_minimum_mean(csr):
+    graph = nx.DiGraph()
+    graph.add_edges_from(zip(csr.sources.tolist(), csr.indices.tolist()))
+    best = np.inf
+    for cycle in nx.simple_cycles(graph):
+        edge_ids = csr.path_edge_ids(cycle + [cycle[0]])
+        best = min(best, csr.adjusted_weights[edge_ids].sum() / len(cycle))
+    return best
+
+
+def test_howard_matches_brute_force():
+    for seed in range(5):
+        csr = make_synthetic_csr_graph(8, out_degree=4, noise=0.02, seed=seed)
+        detector = MinimumMeanCycleArbitrage()
+        cycles = detector.find_minimum_mean_cycles(csr)
+
+        mean_weight, path = cycles[0]
+        assert np.isclose(mean_weight, _brute_force_minimum_mean(csr))
+        assert np.isclose(csr.adjusted_weights[csr.path_edge_ids(path)].sum() / (len(path) - 1),
+                          mean_weight)
+
+
+def test_howard_converges_quickly_on_large_graph():
+    csr = make_synthetic_csr_graph(2000, out_degree=20, noise=0.01, seed=31)
+    detector = MinimumMeanCycleArbitrage()
+    cycles = detector.find_minimum_mean_cycles(csr)
+    assert cycles[0][0] < 0
+    assert detector.last_iterations < 50
+
+
+def test_dead_end_nodes_are_ignored():
+    from crypto_arbitrage_detector.utils.data_structures import EdgePairs
+    from crypto_arbitrage_detector.utils.graph_structure import build_graph_from_edge_lists
+    import math
+
+    def edge(a, b, ratio):
+        return EdgePairs(a, b, ratio, -math.log(ratio), 0, 0.0, 0.0, 0.0)
+
+    graph = build_graph_from_edge_lists([
+        edge("A", "B", 1.05), edge("B", "A", 1.0), edge("B", "SINK", 2.0)])
+    found = MinimumMeanCycleArbitrage().detect_opportunities(graph)
+    assert len(found) == 1
+    assert set(found[0].path) == {"A", "B"}
+
+
+def test_registered_with_integrated_detector():
+    from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+    csr = make_synthetic_csr_graph(30, out_degree=6, noise=0.03, seed=32)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.0, max_hops=30)
+    found = detector.detect_arbitrage(csr, enable_bellman_ford=False, enable_triangle=False,
+                                      enable_two_hop=False, enable_min_mean_cycle=True)
+    assert found
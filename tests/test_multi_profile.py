@@ -0,0 +1,61 @@
+'''
+Multi-profile detection tests
+'''
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+PROFILES = [
+    {'min_profit_threshold': 0.02, 'max_hops': 3, 'base_amount': 1.0},    # conservative
+    {'min_profit_threshold': 0.002, 'max_hops': 4, 'base_amount': 5.0},   # aggressive
+    {'max_hops': 2},                                                     # detector defaults otherwise
+]
+
+
+def test_profiles_match_separate_detectors():
+    graph = make_synthetic_csr_graph(25, noise=0.02, seed=131)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.01, max_hops=4, base_amount=1.0)
+    results = detector.detect_arbitrage_multi(graph, PROFILES, bellman_ford_virtual_source=True)
+    assert len(results) == len(PROFILES)
+
+    for profile, opportunities in zip(PROFILES, results):
+        settings = {'min_profit_threshold': 0.01, 'max_hops': 4, 'base_amount': 1.0, **profile}
+        separate = IntegratedArbitrageDetector(**settings).detect_arbitrage(
+            graph, bellman_ford_virtual_source=True)
+        expected = {tuple(opp.path): opp for opp in separate if opp.hop_count <= settings['max_hops']}
+        assert {tuple(opp.path) for opp in opportunities} == set(expected)
+        for opp in opportunities:
+            assert opp.hop_count <= settings['max_hops']
+            assert opp.profit_ratio >= settings['min_profit_threshold']
+            assert abs(opp.estimated_profit_sol - expected[tuple(opp.path)].estimated_profit_sol) < 1e-12
+        assert [opp.profit_ratio for opp in opportunities] == sorted(
+            (opp.profit_ratio for opp in opportunities), reverse=True)
+
+
+def test_settings_restored_after_multi_run():
+    graph = make_synthetic_csr_graph(12, noise=0.02, seed=132)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.01, max_hops=4, base_amount=1.0)
+    detector.detect_arbitrage_multi(graph, PROFILES)
+    assert (detector.min_profit_threshold, detector.max_hops, detector.base_amount) == (0.01, 4, 1.0)
+    assert detector.bellman_ford.min_profit_threshold == 0.01
+    assert detector.triangle_arbitrage.base_amount == 1.0
+    assert detector.detect_arbitrage_multi(graph, []) == []
+
+
+def test_multi_run_leaves_single_profile_calls_unchanged():
+    graph = make_synthetic_csr_graph(15, noise=0.02, seed=133)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.01, max_hops=3, base_amount=1.0)
+    loose_profiles = [{'min_profit_threshold': 0.001, 'max_hops': 5}, {'max_hops': 2}]
+    results = detector.detect_arbitrage_multi(graph, loose_profiles, enable_hop_bounded=True, max_results=5)
+    assert max(opp.hop_count for opp in results[0]) > 3
+    assert all(len(opportunities) <= 5 for opportunities in results)
+    assert len(results[0]) == 5
+    assert len(detector.hot_cycle_cache) == 0
+
+    opportunities = detector.detect_arbitrage(graph, enable_bellman_ford=False, enable_triangle=False)
+    assert opportunities
+    assert all(opp.hop_count <= 3 and opp.profit_ratio >= 0.01 for opp in opportunities)
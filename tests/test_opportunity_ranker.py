@@ -0,0 +1,99 @@
+'''
+Streaming top-N opportunity ranking tests
+'''
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from crypto_arbitrage_detector.utils.cycle_utils import canonical_cycle
+from crypto_arbitrage_detector.utils.data_structures import ArbitrageOpportunity
+from crypto_arbitrage_detector.utils.opportunity_ranker import TopNOpportunityRanker
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def _opportunity(path, profit_ratio, confidence_score=0.5):
+    return ArbitrageOpportunity(path, path, profit_ratio, 0.0, 0.0, 0, confidence_score, profit_ratio)
+
+
+def _reference_rank(opportunities):
+    '''Dict dedupe plus full sort, the ranking before the heap'''
+    unique = {}
+    for opp in opportunities:
+        key = canonical_cycle(opp.path)
+        if key not in unique or opp.profit_ratio > unique[key].profit_ratio:
+            unique[key] = opp
+    return sorted(unique.values(), key=lambda x: (x.profit_ratio, x.confidence_score), reverse=True)
+
+
+def _random_stream(seed, count=2000):
+    rng = np.random.default_rng(seed)
+    tokens = [f"T{i}" for i in range(8)]
+    stream = []
+    for _ in range(count):
+        size = int(rng.integers(2, 5))
+        nodes = list(rng.choice(tokens, size, replace=False))
+        shift = int(rng.integers(size))
+        nodes = nodes[shift:] + nodes[:shift]   # rotations are duplicates
+        # coarse values so ties happen
+        stream.append(_opportunity(nodes + [nodes[0]], float(rng.integers(0, 50)) / 1000,
+                                   float(rng.integers(0, 3)) / 2))
+    return stream
+
+
+@pytest.mark.parametrize("capacity", [None, 1, 10, 100])
+def test_matches_full_sort(capacity):
+    stream = _random_stream(141)
+    ranker = TopNOpportunityRanker(capacity)
+    ranker.extend(stream)
+
+    expected = _reference_rank(stream)
+    if capacity is None:
+        assert ranker.ranked() == expected
+        return
+
+    # an evicted cycle that comes back counts as a new arrival, so only
+    # opportunities tied with others may be ordered differently
+    ranked = ranker.ranked()
+    assert len(ranker._heap) <= 2 * capacity + 16
+    assert [(o.profit_ratio, o.confidence_score) for o in ranked] == \
+        [(o.profit_ratio, o.confidence_score) for o in expected[:capacity]]
+    best = {canonical_cycle(o.path): o.profit_ratio for o in expected}
+    assert all(o.profit_ratio == best[canonical_cycle(o.path)] for o in ranked)
+    assert len({canonical_cycle(o.path) for o in ranked}) == len(ranked)
+
+
+def test_floor_and_duplicates():
+    ranker = TopNOpportunityRanker(2)
+    assert ranker.floor() is None
+    assert ranker.push(_opportunity(['A', 'B', 'A'], 0.01))
+    assert ranker.push(_opportunity(['C', 'D', 'C'], 0.03))
+    assert ranker.floor() == 0.01
+
+    assert not ranker.push(_opportunity(['E', 'F', 'E'], 0.005))       # below the floor
+    assert not ranker.push(_opportunity(['B', 'A', 'B'], 0.01))        # same cycle, not better
+    assert ranker.push(_opportunity(['B', 'A', 'B'], 0.02))            # same cycle, better
+    assert ranker.floor() == 0.02
+    assert ranker.push(_opportunity(['E', 'F', 'E'], 0.05))
+    assert [opp.profit_ratio for opp in ranker.ranked()] == [0.05, 0.03]
+    assert ranker.rejected == 2
+
+    with pytest.raises(ValueError):
+        TopNOpportunityRanker(0)
+
+
+def test_detector_max_results():
+    graph = make_synthetic_csr_graph(25, noise=0.02, seed=142)
+    full = IntegratedArbitrageDetector(min_profit_threshold=0.001).detect_arbitrage(
+        graph, bellman_ford_virtual_source=True, enable_hop_bounded=True)
+
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001)
+    top = detector.detect_arbitrage(graph, bellman_ford_virtual_source=True, enable_hop_bounded=True,
+                                    max_results=15)
+    assert [opp.path for opp in top] == [opp.path for opp in full[:15]]
+    # thresholds raised to the heap floor during the run are restored
+    assert detector.triangle_arbitrage.min_profit_threshold == 0.001
@@ -0,0 +1,62 @@
+'''
+Quote cache tests
+'''
+import sys
+import os
+import time
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.quote_cache import QuoteCache
+from crypto_arbitrage_detector.utils.get_quote_pair import fetch_quote
+from tests.test_quote_scheduler import FakeSession
+
+
+def test_cache_hit_and_miss_counters():
+    cache = QuoteCache(max_size=10, default_ttl=60)
+    assert cache.get("A", "B", 100) is None
+    cache.put("A", "B", 100, {"outAmount": "1"})
+    assert cache.get("A", "B", 100) == {"outAmount": "1"}
+    # amount is part of the key
+    assert cache.get("A", "B", 200) is None
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+
+def test_cache_ttl_and_max_age():
+    cache = QuoteCache(max_size=10, default_ttl=0.05)
+    cache.set_pair_ttl("LONG", "TAIL", 60)
+    cache.put("A", "B", 100, {"outAmount": "1"})
+    cache.put("LONG", "TAIL", 100, {"outAmount": "2"})
+    time.sleep(0.06)
+    assert cache.get("A", "B", 100) is None
+    assert cache.get("LONG", "TAIL", 100) == {"outAmount": "2"}
+    # caller tolerance is stricter than the entry TTL
+    assert cache.get("LONG", "TAIL", 100, max_age=0.01) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cache_lru_eviction():
+    cache = QuoteCache(max_size=2, default_ttl=60)
+    cache.put("A", "B", 1, {"q": 1})
+    cache.put("B", "C", 1, {"q": 2})
+    cache.get("A", "B", 1)
+    cache.put("C", "D", 1, {"q": 3})
+    assert cache.get("B", "C", 1) is None
+    assert cache.get("A", "B", 1) == {"q": 1}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_fetch_quote_uses_cache():
+    async def run():
+        cache = QuoteCache(max_size=10, default_ttl=60)
+        session = FakeSession()
+        first = await fetch_quote(session, "A", "B", 1000, cache=cache)
+        second = await fetch_quote(session, "A", "B", 1000, cache=cache)
+        return session, first, second
+
+    session, first, second = asyncio.run(run())
+    assert first == second
+    assert session.calls == 1
@@ -0,0 +1,134 @@
+'''
+Quote scheduler tests
+Uses a fake aiohttp session, no network access required
+'''
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.utils.quote_scheduler import QuoteScheduler, TokenBucket
+from crypto_arbitrage_detector.utils.get_quote_pair import fetch_quote
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    """Returns queued statuses first, then 200 with an echo of the request"""
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get(self, url, params=None, headers=None):
+        self.calls += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        data = {"inputMint": params["inputMint"], "outputMint": params["outputMint"],
+                "inAmount": str(params["amount"]), "outAmount": str(params["amount"])}
+        session = self
+
+        class _Ctx(FakeResponse):
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await asyncio.sleep(session.delay)
+                return self
+
+            async def __aexit__(self, *args):
+                session.in_flight -= 1
+                return False
+
+        return _Ctx(status, data)
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=100, capacity=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(15):
+            await bucket.acquire()
+        return loop.time() - start
+
+    elapsed = asyncio.run(run())
+    # 5 burst tokens, the remaining 10 arrive at 100/s
+    assert elapsed >= 0.09
+
+
+def test_scheduler_caps_concurrency():
+    async def run():
+        scheduler = QuoteScheduler(requests_per_second=1000, burst_limit=20,
+                                   initial_concurrency=3, cooldown_period=0)
+        session = FakeSession(delay=0.01)
+        await asyncio.gather(*[fetch_quote(session, "A", "B", 1000, scheduler=scheduler)
+                               for _ in range(30)])
+        return scheduler, session
+
+    scheduler, session = asyncio.run(run())
+    assert session.max_in_flight <= 20
+    assert scheduler.stats()['successes'] == 30
+    assert scheduler.achieved_rps() > 0
+
+
+def test_scheduler_backs_off_and_retries_on_429():
+    async def run():
+        scheduler = QuoteScheduler(requests_per_second=1000, burst_limit=16,
+                                   initial_concurrency=8, cooldown_period=60,
+                                   throttle_backoff=0.01)
+        session = FakeSession(statuses=[429])
+        quote = await fetch_quote(session, "A", "B", 1000, scheduler=scheduler)
+        return scheduler, session, quote
+
+    scheduler, session, quote = asyncio.run(run())
+    assert quote["outAmount"] == "1000"
+    assert session.calls == 2
+    stats = scheduler.stats()
+    assert stats['throttled'] == 1
+    assert stats['concurrency'] == 4
+    assert stats['rate_limit'] == 500
+
+
+def test_429_delays_next_acquire():
+    async def run():
+        scheduler = QuoteScheduler(requests_per_second=1000, burst_limit=16,
+                                   initial_concurrency=8, cooldown_period=60,
+                                   throttle_backoff=0.05)
+        session = FakeSession(statuses=[429, 429])
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        quote = await fetch_quote(session, "A", "B", 1000, scheduler=scheduler)
+        return quote, session, loop.time() - start, scheduler
+
+    quote, session, elapsed, scheduler = asyncio.run(run())
+    assert quote["outAmount"] == "1000"
+    assert session.calls == 3
+    # burst tokens were dropped, retries waited 0.05 s then 0.1 s
+    assert elapsed >= 0.15
+    assert scheduler._throttle_streak == 0
+
+
+def test_scheduler_grows_concurrency_on_fast_responses():
+    scheduler = QuoteScheduler(requests_per_second=100, burst_limit=10,
+                               initial_concurrency=2, cooldown_period=0)
+    for _ in range(2):
+        scheduler.record_response(200, 0.01)
+    assert scheduler.concurrency == 3
+    scheduler.record_response(200, 5.0)
+    assert scheduler.concurrency == 2
@@ -0,0 +1,72 @@
+'''
+SCC partitioned detection tests
+'''
+import sys
+import os
+from dataclasses import replace
+
+import networkx as nx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from crypto_arbitrage_detector.utils.csr_graph import CSRGraph
+from crypto_arbitrage_detector.utils.data_structures import EdgePairs
+from crypto_arbitrage_detector.utils.graph_structure import build_graph_from_edge_lists
+from tests.synthetic_graph import make_synthetic_csr_graph, to_edge_pairs
+
+
+def _multi_component_graph():
+    '''Three dense components joined by one-way edges, plus a dangling token'''
+    edges = []
+    for part, (size, seed) in enumerate([(12, 81), (8, 82), (5, 83)]):
+        for edge in to_edge_pairs(make_synthetic_csr_graph(size, noise=0.02, seed=seed)):
+            edges.append(replace(edge, from_token=f"P{part}{edge.from_token}",
+                                 to_token=f"P{part}{edge.to_token}"))
+    edges.append(EdgePairs("P0TOKEN00000", "P1TOKEN00000", 1.0, 0.0, 0, 0.0, 0.0, 0.0))
+    edges.append(EdgePairs("P1TOKEN00001", "P2TOKEN00000", 1.0, 0.0, 0, 0.0, 0.0, 0.0))
+    edges.append(EdgePairs("P2TOKEN00001", "LONELY", 1.0, 0.0, 0, 0.0, 0.0, 0.0))
+    return CSRGraph.from_networkx(build_graph_from_edge_lists(edges))
+
+
+def test_components_match_networkx():
+    csr = _multi_component_graph()
+    labels = csr.strongly_connected_components()
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(csr.number_of_nodes()))
+    graph.add_edges_from(zip(csr.sources.tolist(), csr.indices.tolist()))
+
+    expected = {frozenset(c) for c in nx.strongly_connected_components(graph)}
+    found = {}
+    for node, label in enumerate(labels.tolist()):
+        found.setdefault(label, set()).add(node)
+    assert {frozenset(c) for c in found.values()} == expected
+    assert len(expected) == 4
+
+
+def test_subgraph_keeps_edges_and_attributes():
+    csr = make_synthetic_csr_graph(10, out_degree=4, seed=84)
+    sub = csr.subgraph([7, 2, 5, 3])
+    assert sub.nodes == [csr.nodes[i] for i in (2, 3, 5, 7)]
+    for u in range(4):
+        for v in sub.successors(u).tolist():
+            e = csr.edge_id(csr.node_index[sub.nodes[u]], csr.node_index[sub.nodes[v]])
+            assert e >= 0
+            assert sub.weight[sub.edge_id(u, v)] == csr.weight[e]
+
+
+def test_partitioned_detection_matches_whole_graph():
+    csr = _multi_component_graph()
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.0, max_workers=2)
+    try:
+        whole = detector.detect_arbitrage(csr, enable_bellman_ford=False)
+        partitioned = detector.detect_arbitrage(csr, enable_bellman_ford=False, partition_scc=True)
+        parallel = detector.detect_arbitrage(csr, enable_bellman_ford=False, partition_scc=True,
+                                             parallel=True)
+    finally:
+        detector.close()
+
+    assert whole
+    key = lambda opps: sorted((tuple(o.path), round(o.profit_ratio, 12)) for o in opps)
+    assert key(partitioned) == key(whole)
+    assert key(parallel) == key(whole)
@@ -0,0 +1,73 @@
+'''
+Adaptive strategy selector tests
+'''
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_arbitrage_detector.algorithms.arbitrage_detector_integrated import IntegratedArbitrageDetector
+from crypto_arbitrage_detector.algorithms.strategy_selector import StrategySelector, GraphStats
+from tests.synthetic_graph import make_synthetic_csr_graph
+
+
+def test_graph_stats():
+    graph = make_synthetic_csr_graph(20, noise=0.01, seed=91)
+    stats = GraphStats.from_graph(graph, changed_edges=19)
+    assert stats.node_count == 20
+    assert stats.edge_count == graph.number_of_edges()
+    assert stats.density == graph.number_of_edges() / (20 * 19)
+    assert stats.changed_fraction == 19 / graph.number_of_edges()
+    assert GraphStats.from_graph(graph).changed_fraction is None
+
+
+def test_small_delta_runs_local_checks():
+    selector = StrategySelector()
+    decision = selector.select(GraphStats(100, 9900, 1.0, 0.01))
+    assert decision.selected == ['Two-hop arbitrage', 'Triangle arbitrage']
+
+    decision = selector.select(GraphStats(100, 9900, 1.0, 0.5))
+    assert decision.selected[0] == 'Bellman-Ford'
+    assert 'Hop-bounded search' in decision.selected
+    assert len(selector.decision_log) == 2
+
+
+def test_budget_skips_expensive_algorithms():
+    selector = StrategySelector()
+    stats = GraphStats(300, 300 * 299, 1.0, None)
+    budget_ms = (selector.predict('Bellman-Ford', stats) + selector.predict('Two-hop arbitrage', stats)) * 1000 * 1.01
+    decision = selector.select(stats, latency_budget_ms=budget_ms)
+    assert decision.selected == ['Bellman-Ford', 'Two-hop arbitrage']
+    assert decision.skipped == ['Triangle arbitrage', 'Hop-bounded search']
+
+    # the first algorithm always runs, even over budget
+    decision = selector.select(stats, latency_budget_ms=0.0)
+    assert decision.selected == ['Bellman-Ford']
+
+
+def test_record_updates_cost_model():
+    selector = StrategySelector(smoothing=0.5)
+    stats = GraphStats(100, 9900, 1.0, None)
+    decision = selector.select(stats)
+    before = selector.seconds_per_unit['Triangle arbitrage']
+    measured = 10 * selector.predict('Triangle arbitrage', stats)
+    selector.record(decision, {'Triangle arbitrage': measured, 'total': measured})
+
+    assert decision.actual_seconds == {'Triangle arbitrage': measured}
+    assert abs(selector.seconds_per_unit['Triangle arbitrage'] - 5.5 * before) < 1e-15
+
+
+def test_adaptive_detection_uses_selected_algorithms():
+    graph = make_synthetic_csr_graph(30, noise=0.02, seed=92)
+    detector = IntegratedArbitrageDetector(min_profit_threshold=0.001)
+
+    reference = detector.detect_arbitrage(graph, enable_bellman_ford=False)
+    opportunities = detector.detect_arbitrage(graph, adaptive=True, changed_edges=1)
+    assert set(detector.last_timings) == {'Two-hop arbitrage', 'Triangle arbitrage', 'total'}
+    assert [o.path for o in opportunities] == [o.path for o in reference]
+
+    decision = detector.strategy_selector.decision_log[-1]
+    assert set(decision.actual_seconds) == {'Two-hop arbitrage', 'Triangle arbitrage'}
+
+    detector.detect_arbitrage(graph, adaptive=True)
+    assert 'Bellman-Ford' in detector.last_timings